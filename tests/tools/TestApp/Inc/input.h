@@ -8,5 +8,6 @@
 #define _INPUT_H_
 
 char *parse_json_to_string(const char *file_name);
+double payload_rate(const char *conn_cfg);
 
 #endif /* _INPUT_H_ */
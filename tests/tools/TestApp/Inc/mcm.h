@@ -8,14 +8,34 @@
 #ifndef _MCM_H_
 #define _MCM_H_
 
+#include <stdint.h>
 #include <stdio.h>
 #include "mesh_dp.h"
 
+#define LATENCY_MAGIC 0x4d434c54 /* "MCLT" */
+#define DEFAULT_RATE 25.0         /* buffers per second when the payload sets no rate */
+
+/* Latency mode: stamped by TxApp into the buffer metadata right before the buffer is put */
+typedef struct {
+    uint32_t magic;
+    uint32_t seq;
+    uint64_t tx_ns; /* CLOCK_MONOTONIC */
+} latency_stamp_t;
+
+/* Latency mode: written by RxApp to the latency file for every stamped buffer, little endian */
+typedef struct {
+    uint32_t seq;
+    uint32_t reserved;
+    uint64_t tx_ns; /* CLOCK_MONOTONIC when TxApp put the buffer */
+    uint64_t rx_ns; /* CLOCK_MONOTONIC when RxApp got the buffer */
+} latency_record_t;
+
 int mcm_init_client(MeshConnection **connection, MeshClient *client, const char *cfg);
 int mcm_create_tx_connection(MeshConnection *connection, MeshClient *client, const char *cfg);
 int mcm_create_rx_connection(MeshConnection *connection, MeshClient *client, const char *cfg);
-int mcm_send_video_frames(MeshConnection *connection, const char *filename);
-void read_data_in_loop(MeshConnection *connection, const char *filename);
+int mcm_send_video_frames(MeshConnection *connection, const char *filename, int latency, double rate);
+void read_data_in_loop(MeshConnection *connection, const char *filename, const char *latency_filename);
+uint64_t monotonic_ns();
 int is_root();
 
 #endif /* _MCM_H_ */
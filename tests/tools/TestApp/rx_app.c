@@ -4,6 +4,7 @@
  * SPDX-License-Identifier: BSD-3-Clause
  */
 
+#include <getopt.h>
 #include <stdio.h>
 #include <unistd.h>
 #include <stdlib.h>
@@ -14,20 +15,36 @@
 char *client_cfg;
 char *conn_cfg;
 
+static void usage(const char *name) {
+    fprintf(stderr, "Usage: %s [-l latency_file] <client_cfg.json> <connection_cfg.json> <path_to_output_file>\n"
+                    "  -l  write sequence number, TX and RX timestamps of every stamped buffer to latency_file\n",
+            name);
+    exit(EXIT_FAILURE);
+}
+
 int main(int argc, char *argv[]) {
     if (!is_root()) {
         fprintf(stderr, "This program must be run as root. Exiting.\n");
         exit(EXIT_FAILURE);
     }
-    if (argc != 4) {
-        fprintf(stderr, "Usage: %s <client_cfg.json> <connection_cfg.json> <path_to_output_file>\n",
-                argv[0]);
-        exit(EXIT_FAILURE);
+    char *latency_filename = NULL;
+    int opt;
+    while ((opt = getopt(argc, argv, "l:")) != -1) {
+        switch (opt) {
+        case 'l':
+            latency_filename = optarg;
+            break;
+        default:
+            usage(argv[0]);
+        }
+    }
+    if (argc - optind != 3) {
+        usage(argv[0]);
     }
 
-    char *client_cfg_file = argv[1];
-    char *conn_cfg_file = argv[2];
-    char *out_filename = argv[3];
+    char *client_cfg_file = argv[optind];
+    char *conn_cfg_file = argv[optind + 1];
+    char *out_filename = argv[optind + 2];
 
     MeshConnection *connection = NULL;
     MeshClient *client = NULL;
@@ -53,7 +70,7 @@ int main(int argc, char *argv[]) {
         goto safe_exit;
     }
     LOG("[RX] Waiting for frames...");
-    read_data_in_loop(connection, out_filename);
+    read_data_in_loop(connection, out_filename, latency_filename);
     LOG("[RX] Shuting down connection and client");
     mesh_delete_connection(&connection);
     mesh_delete_client(&client);
@@ -48,3 +48,22 @@ char *parse_json_to_string(const char *file_name) {
     // Return the buffer as a const char*
     return buffer;
 }
+
+/* Buffers per second of the payload of a connection configuration: "fps" of video, 1 / "packetTime" of audio.
+ * Returns 0 when the payload sets neither. */
+double payload_rate(const char *conn_cfg) {
+    const char *value = strstr(conn_cfg, "\"fps\"");
+    if (value && (value = strchr(value, ':')))
+        return strtod(value + 1, NULL);
+
+    value = strstr(conn_cfg, "\"packetTime\"");
+    if (value && (value = strchr(value, ':')) && (value = strchr(value, '"'))) {
+        char *unit;
+        double packet_time = strtod(value + 1, &unit);
+        if (packet_time > 0 && strncmp(unit, "us", 2) == 0)
+            return 1e6 / packet_time;
+        if (packet_time > 0 && strncmp(unit, "ms", 2) == 0)
+            return 1e3 / packet_time;
+    }
+    return 0;
+}
@@ -4,8 +4,10 @@
  * SPDX-License-Identifier: BSD-3-Clause
  */
 
+#include <errno.h>
 #include <stdlib.h>
 #include <string.h>
+#include <time.h>
 #include <unistd.h>
 #include "mcm.h"
 #include "mesh_dp.h"
@@ -13,8 +15,21 @@
 
 /* PRIVATE */
 void buffer_to_file(FILE *file, MeshBuffer *buf);
+int stamp_buffer(MeshBuffer **buf, uint32_t seq);
+void record_latency(FILE *file, MeshBuffer *buf, uint64_t rx_ns);
+void sleep_until(uint64_t deadline_ns);
 
-int mcm_send_video_frames(MeshConnection *connection, const char *filename) {
+uint64_t monotonic_ns() {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000000ull + ts.tv_nsec;
+}
+
+/* Sends the file buffer by buffer, rate buffers per second on absolute deadlines, or as fast as possible
+ * when rate is 0. A buffer put later than a tenth of the interval after its deadline, whether it was late
+ * before the wait or woke up late from it, is a missed deadline;
+ * when a buffer is late by more than a whole interval, the schedule restarts from it instead of bursting. */
+int mcm_send_video_frames(MeshConnection *connection, const char *filename, int latency, double rate) {
     int err = 0;
     MeshBuffer *buf;
     FILE *file = fopen(filename, "rb");
@@ -26,6 +41,9 @@ int mcm_send_video_frames(MeshConnection *connection, const char *filename) {
 
     unsigned int frame_num = 0;
     size_t read_size = 1;
+    uint64_t interval_ns = rate > 0 ? (uint64_t)(1e9 / rate) : 0;
+    uint64_t deadline_ns = 0, first_ns = 0, last_ns = 0, max_late_ns = 0;
+    unsigned int missed = 0;
     while (1) {
 
         /* Ask the mesh to allocate a shared memory buffer for user data */
@@ -39,30 +57,69 @@ int mcm_send_video_frames(MeshConnection *connection, const char *filename) {
             goto close_file;
         }
 
+        /* Wait for the deadline of the frame, then count how late it is, wake-up latency included */
+        uint64_t now_ns = monotonic_ns();
+        if (frame_num == 0) {
+            first_ns = deadline_ns = now_ns;
+        } else if (interval_ns) {
+            if (now_ns < deadline_ns) {
+                sleep_until(deadline_ns);
+                now_ns = monotonic_ns();
+            }
+            uint64_t late_ns = now_ns > deadline_ns ? now_ns - deadline_ns : 0;
+            if (late_ns > max_late_ns)
+                max_late_ns = late_ns;
+            if (late_ns > interval_ns / 10)
+                missed++;
+            if (late_ns > interval_ns)
+                deadline_ns = now_ns;
+        }
+        last_ns = now_ns;
+        deadline_ns += interval_ns;
+
         /* Send the buffer */
         LOG("[TX] Sending frame: %d", ++frame_num);
+        if (latency && stamp_buffer(&buf, frame_num)) {
+            LOG("[TX] Buffer metadata cannot hold a latency stamp, latency mode disabled");
+            latency = 0;
+        }
         err = mesh_put_buffer(&buf);
         if (err) {
             LOG("[TX] Failed to put buffer: %s (%d)", mesh_err2str(err), err);
             goto close_file;
         }
-
-        /* Temporary implementation for pacing */
-        /* TODO: Implement pacing calculation */
-        usleep(40000);
     }
     LOG("[TX] data sent successfully");
 close_file:
+    if (frame_num) {
+        double seconds = (last_ns - first_ns) / 1e9;
+        LOG("[TX] Pacing: %u frames in %.3f s, %.3f fps achieved, target %.3f fps, %u deadlines missed, "
+            "max lateness %.3f ms",
+            frame_num, seconds, seconds > 0 ? (frame_num - 1) / seconds : 0.0, rate, missed, max_late_ns / 1e6);
+    }
     fclose(file);
     return err;
 }
 
-void read_data_in_loop(MeshConnection *connection, const char *filename) {
+void sleep_until(uint64_t deadline_ns) {
+    struct timespec ts = {.tv_sec = deadline_ns / 1000000000ull, .tv_nsec = deadline_ns % 1000000000ull};
+    while (clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &ts, NULL) == EINTR)
+        ;
+}
+
+void read_data_in_loop(MeshConnection *connection, const char *filename, const char *latency_filename) {
     int timeout = MESH_TIMEOUT_INFINITE;
     int frame = 0;
     int err = 0;
+    uint64_t rx_ns = 0;
     MeshBuffer *buf = NULL;
     FILE *out = fopen(filename, "a");
+    FILE *latency = NULL;
+    if (latency_filename) {
+        latency = fopen(latency_filename, "wb");
+        if (latency == NULL)
+            LOG("[RX] Failed to open latency file for writing");
+    }
     while (1) {
 
         /* Set loop's  error*/
@@ -73,6 +130,7 @@ void read_data_in_loop(MeshConnection *connection, const char *filename) {
 
         /* Receive a buffer from the mesh */
         err = mesh_get_buffer_timeout(connection, &buf, timeout);
+        rx_ns = monotonic_ns();
         if (err == MESH_ERR_CONN_CLOSED) {
             LOG("[RX] Connection closed");
             break;
@@ -83,6 +141,8 @@ void read_data_in_loop(MeshConnection *connection, const char *filename) {
             break;
         }
         /* Process the received user data */
+        if (latency)
+            record_latency(latency, buf, rx_ns);
         buffer_to_file(out, buf);
 
         err = mesh_put_buffer(&buf);
@@ -93,9 +153,33 @@ void read_data_in_loop(MeshConnection *connection, const char *filename) {
         LOG("[RX] Frame: %d", ++frame);
     }
     fclose(out);
+    if (latency)
+        fclose(latency);
     LOG("[RX] Done reading the data");
 }
 
+int stamp_buffer(MeshBuffer **buf, uint32_t seq) {
+    latency_stamp_t stamp = {.magic = LATENCY_MAGIC, .seq = seq};
+    int err = mesh_buffer_set_metadata_len(buf, sizeof(stamp));
+    if (err)
+        return err;
+    /* taken last, so the latency covers mesh_put_buffer and the transport only */
+    stamp.tx_ns = monotonic_ns();
+    memcpy((*buf)->metadata_ptr, &stamp, sizeof(stamp));
+    return 0;
+}
+
+void record_latency(FILE *file, MeshBuffer *buf, uint64_t rx_ns) {
+    latency_stamp_t stamp;
+    if (buf->metadata_len < sizeof(stamp))
+        return;
+    memcpy(&stamp, buf->metadata_ptr, sizeof(stamp));
+    if (stamp.magic != LATENCY_MAGIC)
+        return;
+    latency_record_t record = {.seq = stamp.seq, .tx_ns = stamp.tx_ns, .rx_ns = rx_ns};
+    fwrite(&record, sizeof(record), 1, file);
+}
+
 void buffer_to_file(FILE *file, MeshBuffer *buf) {
     if (file == NULL) {
         LOG("[RX] Failed to open file for writing");
@@ -103,6 +187,8 @@ void buffer_to_file(FILE *file, MeshBuffer *buf) {
     }
     // Write the buffer to the file
     fwrite(buf->payload_ptr, buf->payload_len, 1, file);
+    /* the harness stops RxApp as soon as the last frame is reported, so nothing may stay buffered */
+    fflush(file);
     LOG("[RX] Saving buffer data to a file");
 }
 
@@ -30,4 +30,6 @@ void LOG(const char *format, ...) {
     va_end(args);
 
     printf("\n");
+    /* stdout is a pipe under the test harness, which waits for these lines to detect progress */
+    fflush(stdout);
 }
@@ -4,6 +4,7 @@
  * SPDX-License-Identifier: BSD-3-Clause
  */
 
+#include <getopt.h>
 #include <stdio.h>
 #include <string.h>
 #include <stdlib.h>
@@ -16,20 +17,45 @@
 char *client_cfg;
 char *conn_cfg;
 
+static void usage(const char *name) {
+    fprintf(stderr, "Usage: %s [-l] [-r <rate>] <client_cfg.json> <connection_cfg.json> <path_to_input_file>\n"
+                    "  -l         stamp a sequence number and a TX timestamp into the metadata of every buffer\n"
+                    "  -r <rate>  buffers per second, 0 for as fast as possible (default: fps or packetTime of\n"
+                    "             the payload in connection_cfg.json, else 25)\n",
+            name);
+    exit(EXIT_FAILURE);
+}
+
 int main(int argc, char **argv) {
     if (!is_root()) {
         fprintf(stderr, "This program must be run as root. Exiting.\n");
         exit(EXIT_FAILURE);
     }
-    if (argc != 4) {
-        fprintf(stderr, "Usage: %s <client_cfg.json> <connection_cfg.json> <path_to_input_file>\n",
-                argv[0]);
-        exit(EXIT_FAILURE);
+    int latency = 0;
+    double rate = -1;
+    char *end;
+    int opt;
+    while ((opt = getopt(argc, argv, "lr:")) != -1) {
+        switch (opt) {
+        case 'l':
+            latency = 1;
+            break;
+        case 'r':
+            rate = strtod(optarg, &end);
+            if (*end != '\0' || rate < 0)
+                usage(argv[0]);
+            break;
+        default:
+            usage(argv[0]);
+        }
+    }
+    if (argc - optind != 3) {
+        usage(argv[0]);
     }
 
-    char *client_cfg_file = argv[1];
-    char *conn_cfg_file = argv[2];
-    char *video_file = argv[3];
+    char *client_cfg_file = argv[optind];
+    char *conn_cfg_file = argv[optind + 1];
+    char *video_file = argv[optind + 2];
 
     MeshConnection *connection = NULL;
     MeshClient *client = NULL;
@@ -39,6 +65,15 @@ int main(int argc, char **argv) {
     client_cfg = parse_json_to_string(client_cfg_file);
     LOG("[TX] Reading connection configuration...");
     conn_cfg = parse_json_to_string(conn_cfg_file);
+    if (rate < 0) {
+        rate = payload_rate(conn_cfg);
+        if (rate <= 0)
+            rate = DEFAULT_RATE;
+    }
+    if (rate > 0)
+        LOG("[TX] Sending %.3f buffers per second", rate);
+    else
+        LOG("[TX] Sending as fast as possible");
 
     /* Initialize mcm client */
     int err = mesh_create_client_json(&client, client_cfg);
@@ -57,7 +92,7 @@ int main(int argc, char **argv) {
 
     /* Open file and send its contents */
 
-    err = mcm_send_video_frames(connection, video_file);
+    err = mcm_send_video_frames(connection, video_file, latency, rate);
     LOG("[TX] Shuting down connection and client");
     mesh_delete_connection(&connection);
     mesh_delete_client(&client);
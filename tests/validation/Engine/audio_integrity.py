@@ -0,0 +1,214 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Sample-accurate integrity of received PCM audio (ST 2110-30).
+
+The received stream is aligned with the source by FFT cross-correlation and then compared sample by
+sample, so a receiver starting late, dropping or repeating samples is told apart from corrupted audio.
+"""
+
+import logging
+
+import numpy as np
+
+from Engine.integrity import AUDIO_SAMPLE_SIZES
+
+COMPARE_BLOCK = 48_000  # samples compared at once while the stream stays aligned
+SEARCH_WINDOW = 2048  # samples of received audio correlated with the source to find an offset
+MIN_MATCH = 64  # consecutive identical samples needed to accept an offset
+CANDIDATES = 16  # correlation peaks verified per search, besides the lags tied with the strongest one
+TIE_TOLERANCE = 1e-9  # relative difference of normalized correlations still counted as a tie
+VERIFY_BATCH = 256  # candidate offsets verified at once
+SLIP_SAMPLES = 1  # realignments of at most this many samples are clock slips, larger ones drops or repeats
+
+
+def decode_pcm(raw: np.ndarray, audio_format: str, channels: int) -> np.ndarray:
+    """Decodes big-endian signed PCM bytes into an int32 array of shape (samples, channels)."""
+    sample_size = AUDIO_SAMPLE_SIZES[audio_format]
+    raw = raw[: len(raw) // (sample_size * channels) * sample_size * channels]
+    match sample_size:
+        case 1:
+            samples = raw.view(np.int8).astype(np.int32)
+        case 2:
+            samples = raw.view(">i2").astype(np.int32)
+        case 3:
+            b = raw.reshape(-1, 3).astype(np.int32)
+            samples = ((b[:, 0] << 16) | (b[:, 1] << 8) | b[:, 2]) ^ 0x800000
+            samples -= 0x800000  # sign extension of 24-bit values
+    return samples.reshape(-1, channels)
+
+
+class AudioMatchReport:
+    """Result of aligning received samples with source samples; sample numbers count multi-channel samples."""
+
+    def __init__(self, src_samples: int, out_samples: int, sample_rate: int):
+        self.src_samples = src_samples
+        self.out_samples = out_samples
+        self.sample_rate = sample_rate
+        self.start_offset = None  # source sample of the first received sample
+        self.matched = 0
+        self.dropped = []  # (first, end) source sample ranges skipped by the receiver
+        self.repeated = []  # (first, end) source sample ranges received again
+        self.corrupted = []  # (first, end) received sample ranges not found in the source
+        self.offsets = []  # (received sample, source offset) at every realignment
+
+    @property
+    def drift_ppm(self) -> float:
+        """Slope of the source offset over received samples, i.e. receiver clock drift.
+
+        Only clock slips (realignments of at most SLIP_SAMPLES) count; the steps of drops and repeats are
+        removed from the offsets before the fit.
+        """
+        if len(self.offsets) < 2:
+            return 0.0
+        points = [self.offsets[0]]
+        removed = 0
+        for (_, previous), (position, offset) in zip(self.offsets, self.offsets[1:]):
+            if abs(offset - previous) > SLIP_SAMPLES:
+                removed += offset - previous
+            points.append((position, offset - removed))
+        points.append((self.out_samples, points[-1][1]))  # the last offset holds until the end
+        positions, offsets = np.array(points, dtype=np.float64).T
+        if np.ptp(positions) == 0:
+            return 0.0
+        return float(np.polyfit(positions, offsets, 1)[0] * 1e6)
+
+    def summary(self) -> str:
+        offset_ms = (self.start_offset or 0) / self.sample_rate * 1000
+        return (
+            f"start offset {self.start_offset} samples ({offset_ms:.3f} ms), matched {self.matched}/{self.out_samples}, "
+            f"dropped {sum(e - s for s, e in self.dropped)} in {len(self.dropped)} ranges, "
+            f"repeated {sum(e - s for s, e in self.repeated)} in {len(self.repeated)} ranges, "
+            f"corrupted {sum(e - s for s, e in self.corrupted)} in {len(self.corrupted)} ranges, "
+            f"drift {self.drift_ppm:.1f} ppm"
+        )
+
+
+def _match_length(src: np.ndarray, out: np.ndarray, src_pos: int, out_pos: int, limit: int) -> int:
+    """Returns how many samples match from the given positions, up to limit."""
+    length = min(limit, len(out) - out_pos, len(src) - src_pos)
+    if length <= 0 or src_pos < 0:
+        return 0
+    differ = np.flatnonzero(np.any(src[src_pos : src_pos + length] != out[out_pos : out_pos + length], axis=1))
+    return int(differ[0]) if len(differ) else length
+
+
+def _match_lengths(src: np.ndarray, out: np.ndarray, pos: int, offsets: np.ndarray, limit: int) -> np.ndarray:
+    """Returns how many samples match from pos for every source offset, up to limit, VERIFY_BATCH offsets at once."""
+    length = min(limit, len(out) - pos)
+    lengths = np.zeros(len(offsets), dtype=np.int64)
+    received = out[pos : pos + length]
+    for first in range(0, len(offsets), VERIFY_BATCH):
+        batch = offsets[first : first + VERIFY_BATCH]
+        starts = pos + batch
+        usable = np.minimum(len(src) - starts, length)  # shorter where the source ends
+        index = np.minimum(starts[:, None] + np.arange(length), len(src) - 1)
+        differ = np.any(src[np.maximum(index, 0)] != received, axis=2) | (np.arange(length) >= usable[:, None])
+        lengths[first : first + len(batch)] = np.where(differ.any(axis=1), differ.argmax(axis=1), length)
+        lengths[first : first + len(batch)][starts < 0] = 0
+    return lengths
+
+
+def _find_offset(src: np.ndarray, mono: np.ndarray, out: np.ndarray, pos: int, around: int, radius: int) -> int:
+    """Finds the source offset of received samples at pos by cross-correlation; returns None if not found.
+
+    The expected offset (around, else 0) is kept when it still matches a whole search window. Otherwise the
+    strongest correlation peaks, together with every lag tied with the strongest one (a periodic signal has one
+    per period) and the expected offset, are verified against the received samples; the longest match wins,
+    the lag nearest to the expected offset on a tie.
+    """
+    expected = around or 0
+    wanted = min(SEARCH_WINDOW, len(out) - pos)
+    if _match_length(src, out, pos + expected, pos, SEARCH_WINDOW) >= wanted:
+        return expected
+
+    window = out[pos : pos + SEARCH_WINDOW].sum(axis=1, dtype=np.float64)
+    if around is None:
+        first, last = 0, len(src)
+    else:
+        first, last = max(0, pos + around - radius), min(len(src), pos + around + radius + len(window))
+    segment = mono[first:last]
+    if len(segment) < len(window):
+        return None
+
+    size = 1 << (len(segment) + len(window) - 1).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(segment, size) * np.conj(np.fft.rfft(window, size)), size)
+    # normalized by the energy of every source window, an exact match is always the highest peak
+    energy = np.cumsum(np.concatenate(([0.0], segment**2)))
+    lags = corr[: len(segment) - len(window) + 1] / np.sqrt(energy[len(window) :] - energy[: -len(window)] + 1.0)
+    peaks = np.argpartition(lags, -min(CANDIDATES, len(lags)))[-CANDIDATES:]
+    top = lags[peaks].max()
+    tied = np.flatnonzero(lags >= top - TIE_TOLERANCE * abs(top))
+    candidates = np.union1d(peaks, tied) + first - pos
+
+    candidates = sorted(candidates.tolist() + [expected], key=lambda offset: abs(offset - expected))
+    lengths = _match_lengths(src, out, pos, np.array(candidates), SEARCH_WINDOW)
+    best = int(np.argmax(lengths))  # the first of the longest, i.e. the nearest to the expected offset
+    return candidates[best] if lengths[best] >= min(MIN_MATCH, len(out) - pos) else None
+
+
+def match_audio(src: np.ndarray, out: np.ndarray, sample_rate: int) -> AudioMatchReport:
+    """Aligns (samples, channels) arrays; out[i] is expected to equal src[i + offset]."""
+    report = AudioMatchReport(len(src), len(out), sample_rate)
+    mono = src.sum(axis=1, dtype=np.float64)
+    offset = None
+    pos = 0
+    while pos < len(out):
+        if offset is not None:
+            length = _match_length(src, out, pos + offset, pos, COMPARE_BLOCK)
+            report.matched += length
+            pos += length
+            if length == COMPARE_BLOCK or pos >= len(out):
+                continue
+
+        new_offset = None
+        if offset is not None:
+            # slips and short drops first, so a periodic signal is not searched for a whole second every time
+            new_offset = _find_offset(src, mono, out, pos, offset, SEARCH_WINDOW)
+            if new_offset is None:
+                new_offset = _find_offset(src, mono, out, pos, offset, sample_rate)
+        if new_offset is None:
+            new_offset = _find_offset(src, mono, out, pos, None, 0)
+        if new_offset is None:
+            end = min(pos + MIN_MATCH, len(out))
+            if offset is not None:
+                # the damage ends where samples match at the current offset again
+                length = min(COMPARE_BLOCK, len(out) - pos, len(src) - pos - offset)
+                equal = np.flatnonzero(np.all(src[pos + offset : pos + offset + length] == out[pos : pos + length], axis=1))
+                if len(equal) and equal[0] > 0:
+                    end = pos + int(equal[0])
+            if report.corrupted and report.corrupted[-1][1] == pos:
+                report.corrupted[-1] = (report.corrupted[-1][0], end)
+            else:
+                report.corrupted.append((pos, end))
+            pos = end
+            continue
+
+        if offset is None:
+            if report.start_offset is None:
+                report.start_offset = new_offset
+        elif new_offset > offset:
+            report.dropped.append((pos + offset, pos + new_offset))
+        elif new_offset < offset:
+            report.repeated.append((pos + new_offset, pos + offset))
+        report.offsets.append((pos, new_offset))
+        offset = new_offset
+    return report
+
+
+def check_st30p_sample_integrity(
+    src_url: str, out_url: str, audio_format: str, channels: int, sample_rate: int, expected_sample_percentage: int = 80
+) -> bool:
+    src = decode_pcm(np.fromfile(src_url, dtype=np.uint8), audio_format, channels)
+    out = decode_pcm(np.fromfile(out_url, dtype=np.uint8), audio_format, channels)
+    report = match_audio(src, out, sample_rate)
+    logging.debug(f"Audio matching: {report.summary()}")
+    for first, end in report.dropped:
+        logging.debug(f"Source samples {first}-{end - 1} were not received")
+    for first, end in report.corrupted:
+        logging.debug(f"Received samples {first}-{end - 1} are invalid")
+
+    if not len(src) or report.matched / len(src) * 100.00 < expected_sample_percentage:
+        logging.warning(f"Received only {report.matched} of {len(src)} samples! Expected: {expected_sample_percentage:.2f}%")
+    return not report.corrupted
@@ -0,0 +1,212 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Throughput measurement of media_proxy for the benchmarks suite.
+
+A trial is one RX/TX transfer: the rate comes from the arrival times of the "[RX] Frame: N" lines counted
+by the RxApp process log, and the CPU time of media_proxy is sampled around the transfer. Cases run several
+trials; medians are compared against stored baselines and all trials are written out as JSON.
+
+Usage: python -m Engine.benchmark <results.json> [--baselines benchmarks/baselines.json]
+stores the medians of a results file as the new baselines.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+
+import psutil
+
+from Engine.execute import log_fail, log_info
+from Engine.integrity import AUDIO_SAMPLE_SIZES
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "baselines.json")
+TOLERANCE = 0.1  # relative regression allowed against a baseline
+METRICS = {"fps": "higher", "gbps": "higher", "cpu_s_per_gbit": "lower"}
+
+
+def audio_buffer_size(media_info: dict, packet_time_ms: float = 1) -> int:
+    """Bytes of one audio buffer: a packet time of samples of all channels."""
+    samples = int(media_info["sampleRate"] * packet_time_ms / 1000)
+    return AUDIO_SAMPLE_SIZES[media_info["audioFormat"]] * media_info["channels"] * samples
+
+
+class ProxyCpu:
+    """CPU time used by a process and its children between start() and stop()."""
+
+    def __init__(self, pid: int):
+        self.process = psutil.Process(pid)
+        self.start_seconds = 0.0
+        self.seconds = 0.0
+
+    def _cpu_seconds(self) -> float:
+        try:
+            times = self.process.cpu_times()
+        except psutil.NoSuchProcess:
+            logging.warning(f"Process {self.process.pid} ended during the trial, its CPU time is not measured")
+            return self.start_seconds
+        return times.user + times.system + times.children_user + times.children_system
+
+    def start(self) -> None:
+        self.start_seconds = self._cpu_seconds()
+
+    def stop(self) -> float:
+        self.seconds = self._cpu_seconds() - self.start_seconds
+        return self.seconds
+
+
+class Trial:
+    """Frames received in one transfer, their arrival span and the proxy CPU time spent on it."""
+
+    def __init__(self, frames: int, seconds: float, frame_size: int, cpu_seconds: float):
+        self.frames = frames
+        self.seconds = seconds
+        self.frame_size = frame_size
+        self.cpu_seconds = cpu_seconds
+
+    @classmethod
+    def from_rx(cls, rx, frame_size: int, cpu_seconds: float) -> "Trial":
+        """Builds a trial from the frame counter of a finished RxApp."""
+        times = rx.log.counters["rx_frame"].times
+        seconds = times[-1] - times[0] if len(times) > 1 else 0.0
+        return cls(len(times), seconds, frame_size, cpu_seconds)
+
+    @property
+    def fps(self) -> float:
+        # frames after the first one, over the time from the first to the last
+        return (self.frames - 1) / self.seconds if self.seconds else 0.0
+
+    @property
+    def gbps(self) -> float:
+        return self.fps * self.frame_size * 8 / 1e9
+
+    @property
+    def cpu_s_per_gbit(self) -> float:
+        gbits = self.frames * self.frame_size * 8 / 1e9
+        return self.cpu_seconds / gbits if gbits else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "frames": self.frames,
+            "seconds": round(self.seconds, 6),
+            "frame_size": self.frame_size,
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "fps": round(self.fps, 3),
+            "gbps": round(self.gbps, 6),
+            "cpu_s_per_gbit": round(self.cpu_s_per_gbit, 6),
+        }
+
+
+class BenchmarkCase:
+    """Trials of one connection type, resolution and pixel format."""
+
+    def __init__(self, name: str, parameters: dict):
+        self.name = name
+        self.parameters = parameters
+        self.trials = []
+
+    def add(self, trial: Trial) -> None:
+        logging.info(
+            f"{self.name} trial {len(self.trials) + 1}: {trial.frames} frames, {trial.fps:.2f} fps, "
+            f"{trial.gbps:.3f} Gbit/s, {trial.cpu_s_per_gbit:.3f} proxy CPU s/Gbit"
+        )
+        self.trials.append(trial)
+
+    def median(self, metric: str) -> float:
+        values = [getattr(trial, metric) for trial in self.trials if trial.frames > 1]
+        return statistics.median(values) if values else 0.0
+
+    def regressions(self, baseline: dict, tolerance: float = TOLERANCE) -> list:
+        """Returns descriptions of medians worse than the baseline by more than the tolerance."""
+        found = []
+        tolerance = baseline.get("tolerance", tolerance)
+        for metric, better in METRICS.items():
+            if metric not in baseline:
+                continue
+            value, reference = self.median(metric), baseline[metric]
+            if better == "higher" and value < reference * (1 - tolerance):
+                found.append(f"{metric} {value:.3f} < baseline {reference:.3f}")
+            elif better == "lower" and value > reference * (1 + tolerance):
+                found.append(f"{metric} {value:.3f} > baseline {reference:.3f}")
+        return found
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "parameters": self.parameters,
+            "median": {metric: round(self.median(metric), 6) for metric in METRICS},
+            "trials": [trial.to_dict() for trial in self.trials],
+        }
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    """Returns {case name: {metric: value}}; cases missing from the file are only reported."""
+    try:
+        with open(path) as f:
+            return json.load(f)["cases"]
+    except FileNotFoundError:
+        logging.debug(f"No benchmark baselines in {path}")
+        return {}
+
+
+def write_results(path: str, cases: list) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"cases": [case.to_dict() for case in cases]}, f, indent=2)
+    logging.info(f"Benchmark results of {len(cases)} cases written to {path}")
+
+
+def run_trials(case: BenchmarkCase, trials: int, proxy_pid: int, frame_size: int, transfer) -> None:
+    """Runs transfer() trials times; transfer returns the finished RxApp."""
+    for _ in range(trials):
+        cpu = ProxyCpu(proxy_pid)
+        cpu.start()
+        rx = transfer()
+        case.add(Trial.from_rx(rx, frame_size, cpu.stop()))
+
+
+def check_baseline(case: BenchmarkCase, baselines: dict) -> bool:
+    medians = case.to_dict()["median"]
+    baseline = baselines.get(case.name)
+    if baseline is None:
+        # nothing to gate on: regressions of this case go unnoticed until a baseline is recorded
+        logging.warning(f"{case.name} has no baseline, regression check skipped")
+        log_info(f"{case.name} medians: {medians}")
+        return True
+    regressions = case.regressions(baseline)
+    for regression in regressions:
+        log_fail(f"{case.name} regressed: {regression}")
+    if not regressions:
+        log_info(f"{case.name} within baseline, medians: {medians}")
+    return not regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stores the medians of benchmark results as baselines.")
+    parser.add_argument("results", help="results file written by the benchmarks suite")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="baselines file (default benchmarks/baselines.json)")
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        results = json.load(f)["cases"]
+    try:
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {"cases": {}}
+    for case in results:
+        if "median" not in case:
+            continue  # latency cases have no baselines
+        baseline = baselines["cases"].setdefault(case["name"], {})
+        baseline.update(case["median"])
+        print(f"{case['name']}: {case['median']}")
+    with open(args.baselines, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -90,6 +90,10 @@ class St2110_20(St2110):
         return base_dict
 
 
+class St2110_22(St2110_20):
+    transport = TransportType.ST22
+
+
 class St2110_30(St2110):
     transport = TransportType.ST30
 
@@ -2,4 +2,13 @@
 # Copyright 2024-2025 Intel Corporation
 # Media Communications Mesh
 
+import os
+
 LOG_FOLDER = "logs"
+DIGEST_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcm-validation", "digests.sqlite")
+DIGEST_CACHE_MAX_ENTRIES = 512
+
+MEDIA_PROXY_SDK_PORT = 8002
+MESH_AGENT_PROXY_API_PORT = 50051
+MESH_AGENT_CONTROL_API_PORT = 8100
+STARTUP_TIMEOUT = 10  # seconds for a process to become ready
@@ -0,0 +1,119 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Persistent per-frame digest cache for the source media library.
+
+Usage: python -m Engine.digest_cache [--media /mnt/media] [--cache PATH]
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+from .const import DIGEST_CACHE_MAX_ENTRIES, DIGEST_CACHE_PATH
+
+
+class DigestCache:
+    """SQLite-backed LRU cache of chunk digests keyed by (path, size, mtime, chunk size, algorithm).
+
+    An entry is dropped as soon as the size or modification time of its file changes. The database
+    is safe to share between concurrent pytest processes.
+    """
+
+    def __init__(self, path: str = DIGEST_CACHE_PATH, max_entries: int = DIGEST_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS digests ("
+                "path TEXT, chunk_size INTEGER, algorithm TEXT, size INTEGER, mtime_ns INTEGER, "
+                "digests TEXT, last_used REAL, PRIMARY KEY (path, chunk_size, algorithm))"
+            )
+
+    def get(self, file_url: str, chunk_size: int, algorithm: str = "md5") -> list:
+        """Returns cached digests or None if there is no valid entry for the file."""
+        path = os.path.realpath(file_url)
+        stat = os.stat(path)
+        row = self.db.execute(
+            "SELECT size, mtime_ns, digests FROM digests WHERE path = ? AND chunk_size = ? AND algorithm = ?",
+            (path, chunk_size, algorithm),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            if (row[0], row[1]) != (stat.st_size, stat.st_mtime_ns):
+                self.db.execute(
+                    "DELETE FROM digests WHERE path = ? AND chunk_size = ? AND algorithm = ?",
+                    (path, chunk_size, algorithm),
+                )
+                return None
+            self.db.execute(
+                "UPDATE digests SET last_used = ? WHERE path = ? AND chunk_size = ? AND algorithm = ?",
+                (time.time(), path, chunk_size, algorithm),
+            )
+        return row[2].split(",") if row[2] else []
+
+    def put(self, file_url: str, chunk_size: int, digests: list, algorithm: str = "md5") -> None:
+        path = os.path.realpath(file_url)
+        stat = os.stat(path)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, chunk_size, algorithm, stat.st_size, stat.st_mtime_ns, ",".join(digests), time.time()),
+            )
+            self.db.execute(
+                "DELETE FROM digests WHERE rowid NOT IN "
+                "(SELECT rowid FROM digests ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def close(self) -> None:
+        self.db.close()
+
+
+_cache = None
+
+
+def get_cache() -> DigestCache:
+    global _cache
+    if _cache is None:
+        _cache = DigestCache(os.environ.get("MCM_DIGEST_CACHE", DIGEST_CACHE_PATH))
+    return _cache
+
+
+def main() -> None:
+    from Engine.integrity import (calculate_cached_chunk_hashes,
+                                  calculate_st30p_framebuff_size,
+                                  calculate_yuv_frame_size)
+    from Engine.media_catalog import catalog
+
+    parser = argparse.ArgumentParser(description="Pre-populates the digest cache for all files in media_files.")
+    parser.add_argument("--media", default="/mnt/media", help="path to media asset (default /mnt/media)")
+    parser.add_argument("--cache", help=f"path to the cache database (default {DIGEST_CACHE_PATH})")
+    args = parser.parse_args()
+    if args.cache:
+        os.environ["MCM_DIGEST_CACHE"] = args.cache
+
+    assets = {
+        filename: calculate_yuv_frame_size(asset.width, asset.height, asset.file_format)
+        for filename, asset in catalog.files(kind="video").items()
+    }
+    for filename, asset in catalog.files(kind="audio").items():
+        assets[filename] = calculate_st30p_framebuff_size(asset.key, "1", "48kHz", "ST")
+
+    for filename, chunk_size in sorted(assets.items()):
+        file_url = os.path.join(args.media, filename)
+        if not os.path.exists(file_url):
+            print(f"missing  {filename}")
+            continue
+        start = time.perf_counter()
+        digests = calculate_cached_chunk_hashes(file_url, chunk_size)
+        print(f"{time.perf_counter() - start:7.2f}s {len(digests):5} chunks  {filename}")
+
+
+if __name__ == "__main__":
+    main()
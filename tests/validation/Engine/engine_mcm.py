@@ -3,9 +3,11 @@
 # Media Communications Mesh
 
 import logging
+import os
+import re
 import signal
 import subprocess
-import time
+import tempfile
 
 from pathlib import Path
 
@@ -14,7 +16,28 @@ import Engine.connection
 import Engine.connection_json
 import Engine.execute
 import Engine.payload
-from Engine.integrity import calculate_yuv_frame_size, check_st20p_integrity
+import Engine.workspace
+from Engine.audio_integrity import check_st30p_sample_integrity
+from Engine.const import STARTUP_TIMEOUT
+from Engine.integrity import StreamingIntegrityChecker, calculate_yuv_frame_size, check_st20p_integrity
+from Engine.phases import phase, timed
+from Engine.quality import check_st22_quality
+from Engine.synthetic_media import SyntheticFrameChecker, SyntheticVideo, unblock_writer
+from Engine.text_integrity import check_text_integrity
+
+RX_READY = r"\[RX\] Waiting for frames"
+RX_FRAME = "rx_frame"  # per-frame counter of the process log
+RX_DRAIN_TIMEOUT = 5  # seconds for RxApp to receive the remaining frames after TxApp ends
+RX_STALL_TIMEOUT = 3  # seconds without a new frame once frames started arriving
+TX_DEFAULT_RATE = 25  # buffers per second TxApp sends when the payload sets no rate
+TX_PACING = re.compile(
+    r"\[TX\] Pacing: (?P<frames>\d+) frames in (?P<seconds>[\d.]+) s, (?P<fps>[\d.]+) fps achieved, "
+    r"target (?P<target>[\d.]+) fps, (?P<missed>\d+) deadlines missed, max lateness (?P<max_late_ms>[\d.]+) ms"
+)
+PACING_TOLERANCE = 0.05  # relative shortfall of the achieved rate allowed against the target
+PACING_MISSED_RATIO = 0.01  # share of frames allowed to miss their deadline
+TX_TIMEOUT = 60  # seconds for TxApp when the number of frames is not known
+COMPLETION_MARGIN = 5  # seconds on top of the expected transfer time
 
 
 video_format_matches = {
@@ -27,26 +50,46 @@ def video_file_format_to_payload_format(pixel_format: str) -> str:
     return video_format_matches.get(pixel_format, pixel_format) # matched if matches, else original
 
 
-def create_client_json(build: str, client: Engine.client_json.ClientJson) -> None:
+def config_dir(build: str) -> Path:
+    """Directory of client.json, connection.json and received files: the workspace of the running test, if any."""
+    workspace = Engine.workspace.current()
+    if workspace is not None:
+        return Path(workspace.path)
+    return Path(build, "tests", "tools", "TestApp", "build")
+
+
+@timed("json")
+def create_client_json(build: str, client: Engine.client_json.ClientJson, output_dir: str = None) -> None:
+    workspace = Engine.workspace.current()
+    if workspace is not None:
+        workspace.bind_client(client)
     logging.debug("Client JSON:")
     for line in client.to_json().splitlines():
         logging.debug(line)
-    output_path = Path(build, "tests", "tools", "TestApp", "build", "client.json")
+    output_path = Path(output_dir or config_dir(build), "client.json")
     logging.debug(f"Client JSON path: {output_path}")
     client.prepare_and_save_json(output_path=output_path)
 
 
-def create_connection_json(build: str, connection: Engine.connection_json.ConnectionJson) -> None:
+@timed("json")
+def create_connection_json(build: str, connection: Engine.connection_json.ConnectionJson, output_dir: str = None) -> None:
+    workspace = Engine.workspace.current()
+    if workspace is not None:
+        workspace.bind_connection(connection)
     logging.debug("Connection JSON:")
     for line in connection.to_json().splitlines():
         logging.debug(line)
-    output_path = Path(build, "tests", "tools", "TestApp", "build", "connection.json")
+    output_path = Path(output_dir or config_dir(build), "connection.json")
     logging.debug(f"Connection JSON path: {output_path}")
     connection.prepare_and_save_json(output_path=output_path)
 
 
-def run_rx_app(client_cfg_file: str, connection_cfg_file: str, path_to_output_file: str, cwd: str, timeout: int = 0) -> Engine.execute.AsyncProcess:
-    return Engine.execute.call(f"./RxApp {client_cfg_file} {connection_cfg_file} {path_to_output_file}", cwd=cwd, timeout=timeout)
+def run_rx_app(
+    client_cfg_file: str, connection_cfg_file: str, path_to_output_file: str, cwd: str, timeout: int = 0, options: str = ""
+) -> Engine.execute.AsyncProcess:
+    return Engine.execute.call(
+        f"./RxApp {options}{client_cfg_file} {connection_cfg_file} {path_to_output_file}", cwd=cwd, timeout=timeout
+    )
 
 
 def run_tx_app(client_cfg_file: str, connection_cfg_file: str, path_to_input_file: str, cwd: str, testcmd: bool = True) -> subprocess.CompletedProcess:
@@ -58,9 +101,94 @@ def handle_tx_failure(tx: subprocess.CompletedProcess) -> None:
         Engine.execute.log_fail(f"TxApp failed with return code {tx.returncode}")
 
 
+def tx_options(latency: bool = False, rate: float = None) -> str:
+    """Options of TxApp: -l for latency stamps, -r for a rate other than the payload's (0: as fast as possible)."""
+    return ("-l " if latency else "") + (f"-r {rate:g} " if rate is not None else "")
+
+
+def tx_pacing(tx: Engine.execute.AsyncProcess) -> dict:
+    """Returns the pacing report TxApp printed at the end, None when there is none."""
+    for line in reversed(tx.log.text().splitlines()):
+        match = TX_PACING.search(line)
+        if match:
+            return {key: float(value) for key, value in match.groupdict().items()}
+    return None
+
+
+def check_pacing(tx: Engine.execute.AsyncProcess, rate: float = None) -> bool:
+    """Verifies TxApp kept its rate: the target equals rate (when given), the achieved rate is within
+    PACING_TOLERANCE of the target and no more than PACING_MISSED_RATIO of frames missed their deadline."""
+    report = tx_pacing(tx)
+    if report is None:
+        logging.warning("TxApp printed no pacing report")
+        return True
+    Engine.execute.log_info(
+        f"TxApp pacing: {report['fps']:.2f} fps achieved, target {report['target']:.2f} fps, "
+        f"{report['missed']:.0f}/{report['frames']:.0f} deadlines missed, max lateness {report['max_late_ms']:.3f} ms"
+    )
+    if not report["target"] or report["frames"] < 2:
+        return True  # as fast as possible
+    failures = []
+    if rate and abs(report["target"] - float(rate)) > 0.001 * float(rate):
+        failures.append(f"TxApp paced at {report['target']:.3f} fps instead of {float(rate):.3f} fps")
+    if report["fps"] < report["target"] * (1 - PACING_TOLERANCE):
+        failures.append(f"TxApp achieved {report['fps']:.2f} fps of the {report['target']:.2f} fps target")
+    if report["missed"] > report["frames"] * PACING_MISSED_RATIO:
+        failures.append(f"TxApp missed {report['missed']:.0f} of {report['frames']:.0f} frame deadlines")
+    for failure in failures:
+        Engine.execute.log_fail(failure)
+    return not failures
+
+
 def stop_rx_app(rx: Engine.execute.AsyncProcess) -> None:
-    rx.process.terminate()
-    rx.process.wait()
+    Engine.execute.killproc(rx.process, timeout=RX_DRAIN_TIMEOUT)
+
+
+def expected_frame_count(file_path: str, media_info: dict) -> int:
+    """Returns the number of frames TxApp sends from a video file, None when it is not known."""
+    if not media_info.get("width") or not os.path.isfile(file_path):
+        return None
+    frame_size = calculate_yuv_frame_size(media_info["width"], media_info["height"], media_info["pixelFormat"])
+    return -(-os.path.getsize(file_path) // frame_size)  # a partial last frame is sent as well
+
+
+@timed("transfer")
+def run_tx_until_received(
+    rx: Engine.execute.AsyncProcess, tx_command: str, app_path: str, frames: int = None, fps: float = None, abort=None,
+    rate: float = None
+) -> Engine.execute.AsyncProcess:
+    """Starts TxApp and stops RxApp as soon as the last frame has been received.
+
+    The deadline follows from the number of frames and the rate TxApp paces at (rate when given, else fps),
+    so a stalled transfer fails quickly instead of waiting for fixed timeouts. Without a known number of
+    frames, RxApp is stopped once TxApp has finished and RxApp has drained. Returns the finished TxApp.
+    """
+    transfer_timeout = TX_TIMEOUT
+    pace = float(rate if rate is not None else fps or TX_DEFAULT_RATE)
+    if frames:
+        # unpaced transfers are bounded by the default rate, stalls are detected anyway
+        transfer_timeout = frames / (pace or TX_DEFAULT_RATE) + COMPLETION_MARGIN
+    tx = Engine.execute.call(tx_command, cwd=app_path, timeout=transfer_timeout + COMPLETION_MARGIN)
+
+    stalled = False
+    if frames:
+        received = Engine.execute.wait_for_progress(rx, RX_FRAME, frames, transfer_timeout, RX_STALL_TIMEOUT, abort)
+        stalled = received < frames
+    else:
+        Engine.execute.wait_until(
+            lambda: tx.process.poll() is not None or (abort is not None and abort()), "TxApp finished", transfer_timeout
+        )
+        if abort is None or not abort():
+            Engine.execute.wait_for_exit(rx, timeout=RX_DRAIN_TIMEOUT) # RxApp exits once no frame arrives for 1 s
+    stop_rx_app(rx)
+
+    if stalled or (abort is not None and abort()):
+        Engine.execute.killproc(tx.process)
+    elif Engine.execute.wait_for_exit(tx, timeout=COMPLETION_MARGIN) is None:
+        logging.warning(f"TxApp did not finish {COMPLETION_MARGIN}s after the transfer, stopping it")
+        Engine.execute.killproc(tx.process)
+    Engine.execute.wait(tx)
+    return tx
 
 
 def remove_sent_file(file_path: str, app_path: str) -> None:
@@ -84,13 +212,40 @@ def remove_sent_file(full_path: Path) -> None:
         logging.debug(f"Cannot remove. File does not exist: {full_path}")
 
 
-def run_rx_tx_with_file(file_path: str, build: str, timeout: int = 0, media_info = {}) -> None:
+def check_received_file(file_path: str, output_file_path: str, media_info: dict, lossy: bool = False) -> bool:
+    """Verifies a received file against the sent one, the way its payload allows."""
+    if "audioFormat" in media_info:
+        integrity_check = check_st30p_sample_integrity(
+            file_path, output_file_path, media_info["audioFormat"], media_info["channels"], media_info["sampleRate"]
+        )
+    elif media_info.get("payloadType") == Engine.payload.PayloadType.ANCIL:
+        # variable-sized ancillary / ST 2110-41 messages, located in the source by a rolling hash
+        integrity_check = check_text_integrity(file_path, output_file_path)
+    elif lossy:
+        # compressed transports (ST 2110-22) never reproduce the source bit-exactly
+        integrity_check = check_st22_quality(
+            file_path, output_file_path, media_info.get("width"), media_info.get("height"), media_info.get("pixelFormat")
+        )
+    else:
+        frame_size = calculate_yuv_frame_size(media_info.get("width"), media_info.get("height"), media_info.get("pixelFormat"))
+        integrity_check = check_st20p_integrity(file_path, output_file_path, frame_size, media_info=media_info)
+    return integrity_check
+
+
+def run_rx_tx_with_file(
+    file_path: str, build: str, timeout: int = 0, media_info = {}, lossy: bool = False, output_dir: str = None,
+    rate: float = None
+) -> Engine.execute.AsyncProcess:
+    """Sends a media file and verifies the received copy and the pacing of TxApp; returns the finished RxApp.
+
+    rate overrides the rate of the payload, 0 sends as fast as possible.
+    """
     app_path = Path(build, "tests", "tools", "TestApp", "build")
 
     try:
-        client_cfg_file = Path(app_path.resolve(), "client.json")
-        connection_cfg_file = Path(app_path.resolve(), "connection.json")
-        output_file_path = Path(app_path, Path(file_path).name + "_MCMoutput.yuv").resolve()
+        client_cfg_file = Path(config_dir(build).resolve(), "client.json")
+        connection_cfg_file = Path(config_dir(build).resolve(), "connection.json")
+        output_file_path = Path(output_dir or config_dir(build), Path(file_path).name + "_MCMoutput.yuv").resolve()
         rx = run_rx_app(
             client_cfg_file=client_cfg_file,
             connection_cfg_file=connection_cfg_file,
@@ -98,21 +253,119 @@ def run_rx_tx_with_file(file_path: str, build: str, timeout: int = 0, media_info
             cwd=app_path,
             timeout=timeout
             )
-        time.sleep(2) # 2 seconds for RxApp to spin up
-        tx = run_tx_app(
+        Engine.execute.wait_for_output(rx, RX_READY, timeout=STARTUP_TIMEOUT)
+        tx = run_tx_until_received(
+            rx,
+            f"./TxApp {tx_options(rate=rate)}{client_cfg_file} {connection_cfg_file} {file_path}",
+            app_path,
+            expected_frame_count(file_path, media_info),
+            media_info.get("fps"),
+            rate=rate,
+            )
+        handle_tx_failure(tx.process)
+        check_pacing(tx, rate if rate is not None else media_info.get("fps"))
+    finally:
+        with phase("integrity"):
+            integrity_check = check_received_file(file_path, str(output_file_path), media_info, lossy)
+        logging.debug(f"Integrity: {integrity_check}")
+        remove_sent_file(output_file_path)
+
+        if not integrity_check:
+            Engine.execute.log_fail("At least one of the received frames has not passed the integrity test")
+    return rx
+
+
+def run_rx_tx_with_stream(
+    file_path: str, build: str, timeout: int = 0, media_info = {}, fail_fast: bool = True, rate: float = None
+) -> Engine.execute.AsyncProcess:
+    """Same as run_rx_tx_with_file, but RxApp writes into a named pipe verified on the fly instead of a file."""
+    frame_size = calculate_yuv_frame_size(media_info.get("width"), media_info.get("height"), media_info.get("pixelFormat"))
+    fifo_dir = tempfile.mkdtemp(prefix="mcm_rx_")
+    fifo_path = os.path.join(fifo_dir, Path(file_path).name + "_MCMoutput.fifo")
+    os.mkfifo(fifo_path)
+    checker = StreamingIntegrityChecker(file_path, fifo_path, frame_size, fail_fast=fail_fast)
+    try:
+        frames = expected_frame_count(file_path, media_info)
+        return run_rx_tx_with_checker(file_path, checker, build, timeout, frames, media_info.get("fps"), rate=rate)
+    finally:
+        os.unlink(fifo_path)
+        os.rmdir(fifo_dir)
+
+
+def run_rx_tx_with_synthetic(
+    build: str, media_info = {}, frames: int = 100, pattern: str = "ramp", timeout: int = 0, fail_fast: bool = True,
+    latency_path: str = None, rate: float = None
+) -> Engine.execute.AsyncProcess:
+    """Sends generated frames carrying their own sequence numbers and CRCs, so no media file is needed.
+
+    With latency_path, TxApp stamps every buffer and RxApp writes the latency records to latency_path.
+    rate overrides the fps of the payload, 0 sends as fast as possible.
+    """
+    video = SyntheticVideo(media_info.get("width"), media_info.get("height"), media_info.get("pixelFormat"), pattern)
+    fifo_dir = tempfile.mkdtemp(prefix="mcm_synthetic_")
+    input_path = os.path.join(fifo_dir, f"synthetic_{video.width}x{video.height}_{pattern}.fifo")
+    output_path = os.path.join(fifo_dir, "synthetic_MCMoutput.fifo")
+    os.mkfifo(input_path)
+    os.mkfifo(output_path)
+    checker = SyntheticFrameChecker(output_path, video.frame_size, expected_frames=frames, fail_fast=fail_fast)
+    # TxApp reads its input file as it sends, so frames are generated just in time
+    writer = Engine.execute.RaisingThread(target=video.write, args=(input_path, frames))
+    writer.daemon = True
+    writer.start()
+    try:
+        return run_rx_tx_with_checker(
+            input_path, checker, build, timeout, frames, media_info.get("fps"), latency_path, rate
+        )
+    finally:
+        unblock_writer(input_path)
+        writer.join(5)
+        for fifo in (input_path, output_path):
+            os.unlink(fifo)
+        os.rmdir(fifo_dir)
+
+
+def run_rx_tx_with_checker(
+    file_path: str, checker: StreamingIntegrityChecker, build: str, timeout: int = 0, frames: int = None, fps: float = None,
+    latency_path: str = None, rate: float = None
+) -> Engine.execute.AsyncProcess:
+    """Runs RxApp writing into the checker's named pipe and TxApp sending file_path, then joins the checker.
+
+    The pacing of TxApp is verified against rate, else fps. Returns the finished RxApp.
+    """
+    app_path = Path(build, "tests", "tools", "TestApp", "build")
+    checker.start()
+
+    try:
+        client_cfg_file = Path(config_dir(build).resolve(), "client.json")
+        connection_cfg_file = Path(config_dir(build).resolve(), "connection.json")
+        rx = run_rx_app(
             client_cfg_file=client_cfg_file,
             connection_cfg_file=connection_cfg_file,
-            path_to_input_file=file_path,
-            cwd=app_path
+            path_to_output_file=checker.fifo_path,
+            cwd=app_path,
+            timeout=timeout,
+            options=f"-l {latency_path} " if latency_path else "",
+            )
+        Engine.execute.wait_for_output(rx, RX_READY, timeout=STARTUP_TIMEOUT)
+        tx = run_tx_until_received(
+            rx,
+            f"./TxApp {tx_options(bool(latency_path), rate)}{client_cfg_file} {connection_cfg_file} {file_path}",
+            app_path,
+            frames,
+            fps,
+            abort=lambda: checker.failed,
+            rate=rate,
             )
-        time.sleep(5) # 5 seconds for TxApp to shut down before handling it as a failure
-        handle_tx_failure(tx)
-        stop_rx_app(rx)
+        if checker.failed:
+            logging.debug(f"Frame {checker.invalid_frame} is invalid, TxApp was stopped")
+        else:
+            handle_tx_failure(tx.process)
+            check_pacing(tx, rate if rate is not None else fps)
     finally:
-        frame_size = calculate_yuv_frame_size(media_info.get("width"), media_info.get("height"), media_info.get("pixelFormat"))
-        integrity_check = check_st20p_integrity(file_path, str(output_file_path), frame_size)
+        with phase("integrity"):
+            integrity_check = checker.join()
         logging.debug(f"Integrity: {integrity_check}")
-        remove_sent_file(output_file_path)
 
         if not integrity_check:
             Engine.execute.log_fail("At least one of the received frames has not passed the integrity test")
+    return rx
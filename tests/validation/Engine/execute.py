@@ -4,6 +4,8 @@
 
 import logging
 import os
+import signal
+import socket
 import subprocess
 import threading
 import time
@@ -15,6 +17,8 @@ import pytest
 from pytest_check import check
 
 from .const import LOG_FOLDER
+from .orchestrator import KILL_GRACE, ProcessResult, get_orchestrator, signal_group, wait_exit
+from .process_log import ProcessLog
 from .stash import add_result_log, set_result_note
 
 
@@ -44,113 +48,214 @@ class RaisingThread(threading.Thread):
 
 
 class AsyncProcess:
-    def __init__(self, process: subprocess.Popen, reader: threading.Thread, timer: threading.Timer):
-        self.process = process
-        self.reader = reader
-        self.timer = timer
+    """Process supervised by the orchestrator, with its output ingested so far for readiness probes."""
+
+    def __init__(self):
+        self.managed = None
+        self.process = None
         self.output = ""
+        self.result = None
+
+    @property
+    def log(self) -> ProcessLog:
+        return self.managed.log
 
+    @property
+    def output_open(self) -> bool:
+        return not self.log.ended
 
-def killproc(proc: subprocess.Popen, sigint: bool = False):
+
+def killproc(proc: subprocess.Popen, sigint: bool = False, timeout: float = KILL_GRACE):
+    """Stops the process group of proc, escalating to SIGKILL after timeout; returns the return code."""
     result = proc.poll()
     if result is not None:
         return result
 
     # try to 'gently' terminate proc
-    if sigint:
-        proc.send_signal(2)  # SIGINT
-    else:
-        proc.terminate()
-
-    for _ in range(5):
-        result = proc.poll()
-        if result is not None:
-            return result
-        time.sleep(1)  # wait a little longer for proc to terminate
+    signal_group(proc, signal.SIGINT if sigint else signal.SIGTERM)
+    if wait_exit(proc, timeout):
+        return proc.returncode
 
     # failed to terminate proc, so kill it
-    proc.kill()
-    for _ in range(10):
-        result = proc.poll()
-        if result is not None:
-            return result
-        time.sleep(1)  # give system more time to kill proc
+    signal_group(proc, signal.SIGKILL)
+    if wait_exit(proc, timeout):
+        return proc.returncode
 
     # failed to kill proc
-    if result is None:
-        logging.error(f"Failed to kill process with pid {proc.pid}")
+    logging.error(f"Failed to kill process with pid {proc.pid}")
 
 
-def readproc(process: subprocess.Popen):
-    case_id = os.environ["PYTEST_CURRENT_TEST"]
-    case_id = case_id[: case_id.rfind("(") - 1]
-    logfile = os.path.join(LOG_FOLDER, "latest", f"{case_id}.pid{process.pid}.log")
+def stop_all_processes() -> list:
+    """Stops everything started by call/calls that is still running, except persistent processes, as leaked."""
+    leaked = get_orchestrator().stop_all()
+    for pid, command in leaked:
+        logging.warning(f"Leaked process {pid} was stopped: {command}")
+    return leaked
 
-    ansi_esc = re.compile(r'\x1b\[[0-9;]*m')
 
-    output = []
-    with open(logfile, "w") as file:
-        if process.stdout is not None:
-            for line in iter(process.stdout.readline, ""):
-                line = ansi_esc.sub('', line) # Remove ANSI escape color codes
-                output.append(line)
-                file.write(line)
-    return "".join(output)
+def process_logfile(pid: int) -> str:
+    case_id = os.environ["PYTEST_CURRENT_TEST"]
+    case_id = case_id[: case_id.rfind("(") - 1]
+    return os.path.join(LOG_FOLDER, "latest", f"{case_id}.pid{pid}.log.gz")
 
 
-def call(command: str, cwd: str, timeout: int = 60, sigint: bool = False, env: dict = None) -> AsyncProcess:
-    processes = calls([command], cwd=cwd, timeout=timeout, sigint=sigint, env=env)
+def call(
+    command: str, cwd: str, timeout: int = 60, sigint: bool = False, env: dict = None, persistent: bool = False
+) -> AsyncProcess:
+    processes = calls([command], cwd=cwd, timeout=timeout, sigint=sigint, env=env, persistent=persistent)
     return processes[0]
 
 
 def calls(
-    commands: List[str], cwd: str = None, timeout: int = 60, sigint: bool = False, env: dict = None
+    commands: List[str], cwd: str = None, timeout: int = 60, sigint: bool = False, env: dict = None,
+    persistent: bool = False
 ) -> List[AsyncProcess]:
+    """Starts commands under the orchestrator; persistent ones are not stopped at the end of the test."""
     ret = []
+    orchestrator = get_orchestrator()
     for command in commands:
-        process = subprocess.Popen(
-            "exec " + command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            shell=True,
-            text=True,
-            cwd=cwd,
-            env=env,
-        )
+        ap = AsyncProcess()
+        ap.managed = orchestrator.spawn(command, cwd, env, timeout, sigint, process_logfile, persistent)
+        ap.process = ap.managed.process
         logging.testcmd(command)
-        logging.debug(f"PID: {process.pid}")
-
-        reader = RaisingThread(target=readproc, args=[process])
-        reader.daemon = True
-        reader.start()
-        timer = None
-        if timeout > 0:
-            timer = threading.Timer(timeout, killproc, args=[process, sigint])
-            timer.daemon = True
-            timer.start()
-        ret.append(AsyncProcess(process=process, reader=reader, timer=timer))
+        logging.debug(f"PID: {ap.process.pid}")
+        ret.append(ap)
     return ret
 
 
+def wait_for_output(ap: AsyncProcess, pattern: str, timeout: float = 10) -> float:
+    """Waits until the process prints a line matching the pattern; per-frame lines are counted, not matched.
+
+    Returns seconds waited, or None when the process ended or the timeout expired first.
+    """
+    regex = re.compile(pattern)
+    start = time.monotonic()
+    deadline = start + timeout
+    checked = 0
+    with ap.log.updated:
+        while True:
+            lines, checked = ap.log.since(checked)
+            if any(regex.search(line) for line in lines):
+                waited = time.monotonic() - start
+                logging.debug(f"Process {ap.process.pid} printed '{pattern}' after {waited:.3f}s")
+                return waited
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not ap.output_open:
+                break
+            ap.log.updated.wait(remaining)
+    if ap.output_open:
+        logging.warning(f"Process {ap.process.pid} did not print '{pattern}' in {timeout}s")
+    else:
+        logging.warning(f"Process {ap.process.pid} ended its output without printing '{pattern}'")
+    return None
+
+
+def wait_for_progress(
+    ap: AsyncProcess, counter: str, target: int, timeout: float, stall_timeout: float = None, abort=None
+) -> int:
+    """Follows a per-frame counter of the process log, e.g. "rx_frame", until it reaches target.
+
+    Gives up at the timeout, when the counter does not advance for stall_timeout seconds after it started,
+    when the output ends or when abort() returns True. Returns the last counter value seen.
+    """
+    line_counter = ap.log.counters[counter]
+    start = time.monotonic()
+    deadline = start + timeout
+    with ap.log.updated:
+        while True:
+            count = line_counter.value
+            last_progress = line_counter.times[-1] if line_counter.times else None
+            now = time.monotonic()
+            if count >= target:
+                logging.debug(f"Process {ap.process.pid} reached {count}/{target} after {now - start:.3f}s")
+                return count
+            if abort is not None and abort():
+                return count
+            if now >= deadline:
+                logging.warning(f"Process {ap.process.pid} reached only {count}/{target} in {timeout:.1f}s")
+                return count
+            if stall_timeout and last_progress and now - last_progress >= stall_timeout:
+                logging.warning(f"Process {ap.process.pid} stalled at {count}/{target} for {stall_timeout:.1f}s")
+                return count
+            if not ap.output_open:
+                logging.warning(f"Process {ap.process.pid} ended its output at {count}/{target}")
+                return count
+            ap.log.updated.wait(min(deadline - now, 0.1))
+
+
+def wait_until(check, what: str, timeout: float = 10, ap: AsyncProcess = None, interval: float = 0.01) -> float:
+    """Polls check() until it returns True; stops early when the process ap ends.
+
+    Returns seconds waited, or None on timeout.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while time.monotonic() < deadline:
+        if check():
+            waited = time.monotonic() - start
+            logging.debug(f"{what} after {waited:.3f}s")
+            return waited
+        if ap is not None and ap.process.poll() is not None:
+            logging.warning(f"Process {ap.process.pid} ended with RC {ap.process.returncode} before: {what}")
+            return None
+        time.sleep(interval)
+    logging.warning(f"Timed out after {timeout}s waiting for: {what}")
+    return None
+
+
+def port_open(port: int, host: str = "localhost") -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=0.1):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_port(port: int, host: str = "localhost", timeout: float = 10, ap: AsyncProcess = None) -> float:
+    """Waits until the port accepts connections; returns seconds waited, or None."""
+    return wait_until(lambda: port_open(port, host), f"port {host}:{port} accepts connections", timeout, ap)
+
+
+def wait_for_exit(ap: AsyncProcess, timeout: float = 10) -> float:
+    """Waits until the process ends; returns seconds waited, or None."""
+    start = time.monotonic()
+    if not wait_exit(ap.process, timeout):
+        logging.debug(f"Process {ap.process.pid} still running after {timeout}s")
+        return None
+    waited = time.monotonic() - start
+    logging.debug(f"Process {ap.process.pid} ended with RC {ap.process.returncode} after {waited:.3f}s")
+    return waited
+
+
+def record_result(ap: AsyncProcess, result: ProcessResult) -> None:
+    ap.result = result
+    ap.output = result.output
+    logging.debug(f"Process {ap.process.pid} finished with RC: {ap.process.returncode}, output: {ap.log.summary()}")
+    if ap.process.returncode > 0:
+        logging.debug(f"Recent output of process {ap.process.pid}:\n{ap.log.report()}")
+
+
 def wait(ap: AsyncProcess) -> str:
     try:  # in case of user interrupt
-        ap.process.wait()
-        ap.timer.cancel()
+        result = get_orchestrator().wait(ap.managed)
     except:  # noqa E722
         killproc(ap.process)
         raise
-    finally:
-        ap.timer.cancel()
-        ap.timer.join(30)
-        ap.output = ap.reader.join(30)
-        logging.debug(f"Process {ap.process.pid} finished with RC: {ap.process.returncode}")
+    record_result(ap, result)
     return ap.output
 
 
-def waitall(aps=List[AsyncProcess]):
-    for ap in aps:
-        wait(ap)
-    return
+def waitall(aps: List[AsyncProcess]) -> List[ProcessResult]:
+    """Waits for all processes at once, so teardown time is that of the slowest process, not the sum."""
+    try:
+        results = get_orchestrator().waitall([ap.managed for ap in aps])
+    except:  # noqa E722
+        for ap in aps:
+            killproc(ap.process)
+        raise
+    for ap, result in zip(aps, results):
+        record_result(ap, result)
+    return results
 
 
 def run(command: str, cwd: str = None, testcmd: bool = False, timeout: int = 60) -> subprocess.CompletedProcess:
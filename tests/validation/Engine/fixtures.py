@@ -2,16 +2,37 @@
 # Copyright 2024-2025 Intel Corporation
 # Media Communications Mesh
 
+import logging
 import os
 from typing import Dict
 
 import pytest
 
+from .benchmark import BASELINES_PATH, load_baselines, write_results
+from .const import LOG_FOLDER
+from .execute import log_info
+from .media_catalog import catalog
+from .resources import ResourceSampler, format_summary
+from .staging import TMPFS_DIR, MediaStage
 from .stash import clear_result_media, remove_result_media
+from .workspace import close_workspace, open_workspace
 
 phase_report_key = pytest.StashKey[Dict[str, pytest.CollectReport]]()
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "media(filename): test sends the media file, skipped when it is missing or truncated")
+
+
+def pytest_collection_modifyitems(config, items):
+    media = config.getoption("--media") or "/mnt/media"
+    for item in items:
+        for marker in item.iter_markers("media"):
+            problem = catalog.problem(media, marker.args[0])
+            if problem:
+                item.add_marker(pytest.mark.skip(reason=problem))
+
+
 @pytest.hookimpl(wrapper=True, tryfirst=True)
 def pytest_runtest_makereport(item, call):
     # execute all other hooks to obtain the report object
@@ -33,6 +54,45 @@ def media(request):
     return media
 
 
+@pytest.fixture(scope="session")
+def media_stage(request):
+    stage = request.config.getoption("--stage")
+    if stage is None:
+        stage = "none"
+    mode, _, directory = stage.lower().partition(":")
+    media_stage = MediaStage(mode, directory or TMPFS_DIR)
+    yield media_stage
+
+    logging.info(f"Media staging: {media_stage.summary()}")
+    media_stage.cleanup()
+
+
+@pytest.fixture(scope="session")
+def benchmark_trials(request):
+    trials = request.config.getoption("--trials")
+    if trials is None:
+        return 3
+    return int(trials)
+
+
+@pytest.fixture(scope="session")
+def benchmark_baselines():
+    return load_baselines(BASELINES_PATH)
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """List of BenchmarkCase, written out as JSON at the end of the session."""
+    path = request.config.getoption("--benchmark-json")
+    if path is None:
+        path = os.path.join(LOG_FOLDER, "latest", "benchmarks.json")
+    cases = []
+    yield cases
+
+    if cases:
+        write_results(path, cases)
+
+
 @pytest.fixture(scope="session")
 def build(request):
     build = request.config.getoption("--build")
@@ -78,6 +138,41 @@ def fixture_remove_result_media(request):
     remove_result_media()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def workspace(request):
+    """Directory of the test's config files and RX output; ports and URNs leased by the test are released after it."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    workspace = open_workspace(f"{worker}-{request.node.name}")
+    yield workspace
+
+    keep = os.environ["keep"] == "all"
+    if os.environ["keep"] == "failed":
+        report = request.node.stash[phase_report_key]
+        keep = "call" in report and report["call"].failed
+    if keep:
+        logging.info(f"Workspace kept in {workspace.path}")
+    close_workspace(remove=not keep)
+
+
+@pytest.fixture(scope="function", autouse=True)
+def resource_sampler(request):
+    """Samples CPU, memory, context switches and I/O of every process the test starts."""
+    rate = request.config.getoption("--sample-rate")
+    rate = 10 if rate is None else float(rate)
+    if rate <= 0:
+        yield None
+        return
+    sampler = ResourceSampler(rate)
+    sampler.start()
+    yield sampler
+
+    sampler.stop()
+    if sampler.series:
+        for summary in sampler.summaries():
+            log_info(f"Resources of {format_summary(summary)}")
+        sampler.write(os.path.join(LOG_FOLDER, "latest", f"{request.node.nodeid}.resources.json"))
+
+
 @pytest.fixture(scope="session")
 def dma_port_list(request):
     dma = request.config.getoption("--dma")
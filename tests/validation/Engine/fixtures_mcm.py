@@ -3,71 +3,83 @@
 # Media Communications Mesh
 import logging
 import os
-import subprocess
-import time
+
+import psutil
 
 import Engine.execute
+from Engine.proxy_pool import ProxyPool
+from Engine.testapp_build import build_testapp
 
 import pytest
 
 
 @pytest.fixture(scope="session")
-def build_TestApp(build: str) -> None:
-    path = os.path.join(build, "tests", "tools", "TestApp", "build")
-    subprocess.run(f'rm -rf "{path}"', shell=True, timeout=10)
-    subprocess.run(f'mkdir -p "{path}"', shell=True, timeout=10)
-    subprocess.run("cmake ..", cwd=path, shell=True, timeout=10)
-    subprocess.run("make", cwd=path, shell=True, timeout=10)
+def build_TestApp(request, build: str) -> None:
+    """Builds TxApp and RxApp unless they were built from the same sources and libmcm_dp; raises on build errors."""
+    build_testapp(build, force=request.config.getoption("--rebuild"))
 
 
-def kill_all_existing_media_proxies() -> None:
-    # TODO: This assumes the way previous media_proxy worked will not change in the new version, which is unlikely
-    "Kills all existing media_proxy processes using their PIDs found with px -aux"
-    existing_mps = subprocess.run("ps -aux | awk '/media_proxy/{print($2)}'", shell=True, capture_output=True)
-    mp_pids = existing_mps.stdout.decode("utf-8").split()  # returns an array of PIDs
-    (subprocess.run(f"kill -9 {mp_pid}", shell=True) for mp_pid in mp_pids)
+def kill_all_existing_media_proxies(names: tuple = ("media_proxy", "mesh-agent"), timeout: float = 2) -> None:
+    """Kills all media_proxy and mesh-agent processes left over from earlier runs, so their ports are free."""
+    stale = [p for p in psutil.process_iter(["name"]) if p.info["name"] in names and p.pid != os.getpid()]
+    for process in stale:
+        logging.debug(f"Killing stale {process.info['name']} with PID {process.pid}")
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(stale, timeout=timeout)
+    for process in alive:
+        logging.warning(f"Stale {process.info['name']} with PID {process.pid} survived SIGKILL")
 
 
 @pytest.fixture(scope="function", autouse=True)
-def media_proxy_single() -> None:
-    kill_existing = True
-    # TODO: This assumes the way previous media_proxy worked will not change in the new version, which is unlikely
-    # TODO: Re-add the parameters properly
-    """Opens new media_proxies for sender and receiver.
-    May optionally kill the already-running media_proxies first.
-
-    Arguments:
-        sender_mp_port(int): specifies the port number for sender
-        receiver_mp_port(int): specifies the port number for receiver
-
-    Keyword arguments:
-        kill_existing(bool, optional): if use kill_all_existing_media_proxies() function to kill -9 all existing
-                                       media_proxies before running new instances
-    """
-    if kill_existing:
+def process_cleanup() -> None:
+    """Stops processes a test left running, so the next test starts clean."""
+    yield
+    Engine.execute.stop_all_processes()
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "media_proxy(proxy_args='', agent_args=''): extra options of media_proxy and mesh-agent, restarted when they differ",
+    )
+
+
+@pytest.fixture(scope="session")
+def media_proxy_pool() -> ProxyPool:
+    """mesh-agent and media_proxy shared by the tests of the session (of the worker, with pytest-xdist)."""
+    # other workers' proxies are not stale: with pytest-xdist, ports are kept apart by leases instead
+    if "PYTEST_XDIST_WORKER" not in os.environ:
         kill_all_existing_media_proxies()
+    pool = ProxyPool()
+    yield pool
 
-    # mesh-agent start
-    mesh_agent_proc = Engine.execute.call(f"mesh-agent", cwd=".")
-    time.sleep(0.2) # short sleep used for mesh-agent to spin up
-    if mesh_agent_proc.process.returncode:
-        logging.debug(f"mesh-agent's return code: {mesh_agent_proc.returncode} of type {type(mesh_agent_proc.returncode)}")
-    # single media_proxy start
-    # TODO: Add parameters to media_proxy
-    sender_mp_proc = Engine.execute.call(f"media_proxy", cwd=".")
-    time.sleep(0.2) # short sleep used for media_proxy to spin up
-    if sender_mp_proc.process.returncode:
-        logging.debug(f"media_proxy's return code: {sender_mp_proc.returncode} of type {type(sender_mp_proc.returncode)}")
+    pool.close()
+    logging.info(pool.summary())
 
-    yield
 
-    sender_mp_proc.process.terminate()
-    if not sender_mp_proc.process.returncode:
-        logging.debug(f"media_proxy terminated properly")
-    time.sleep(2) # allow media_proxy to terminate properly, before terminating mesh-agent
-    mesh_agent_proc.process.terminate()
-    if not mesh_agent_proc.process.returncode:
-        logging.debug(f"mesh-agent terminated properly")
+@pytest.fixture(scope="function", autouse=True)
+def media_proxy_single(request, process_cleanup, media_proxy_pool, workspace) -> Engine.execute.AsyncProcess:
+    """Provides a healthy media_proxy registered in a mesh-agent, started by an earlier test when possible.
+
+    Options of media_proxy and mesh-agent come from @pytest.mark.media_proxy(proxy_args=..., agent_args=...);
+    client.json of the test points at the SDK port of the media_proxy. Yields the media_proxy process. The
+    test fails when it leaves the pair crashed, unresponsive or leaking.
+    """
+    marker = request.node.get_closest_marker("media_proxy")
+    pair = media_proxy_pool.acquire(dict(marker.kwargs) if marker else {})
+    workspace.proxy = pair.ports
+    yield pair.proxy
+
+    # apps the test left running are stopped first, their connections are reported as leaked processes
+    Engine.execute.stop_all_processes()
+    problem = media_proxy_pool.release(pair)
+    if problem is not None:
+        kind, reason = problem
+        logs = ", ".join(ap.log.path for ap in (pair.proxy, pair.agent) if ap.log.path)
+        Engine.execute.log_fail(f"mesh-agent and media_proxy were left unusable ({kind}): {reason}; logs: {logs}")
 
 
 @pytest.fixture(scope="package")
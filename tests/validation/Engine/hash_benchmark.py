@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Reports frame hashing throughput for every video resolution in media_files.
+
+Usage: python -m Engine.hash_benchmark [--media /mnt/media] [--workers N]
+"""
+
+import argparse
+import os
+import time
+
+from Engine.integrity import calculate_chunk_hashes, calculate_yuv_frame_size
+from Engine.media_catalog import catalog
+
+
+def benchmark(file_url: str, frame_size: int, workers: int) -> float:
+    """Returns hashing throughput in GB/s."""
+    start = time.perf_counter()
+    calculate_chunk_hashes(file_url, frame_size, workers=workers)
+    elapsed = time.perf_counter() - start
+    return os.path.getsize(file_url) / elapsed / 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--media", default="/mnt/media", help="path to media asset (default /mnt/media)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="hashing threads (default: CPU count)")
+    args = parser.parse_args()
+
+    print(f"{'resolution':>10} {'format':>22} {'1 thread GB/s':>14} {f'{args.workers} threads GB/s':>16}  file")
+    for filename, asset in sorted(catalog.files(kind="video").items(), key=lambda a: (a[1].width, a[1].height)):
+        width, height, file_format = asset.width, asset.height, asset.file_format
+        file_url = os.path.join(args.media, filename)
+        if not os.path.exists(file_url):
+            print(f"{width}x{height:<5} {file_format:>22} {'missing':>14} {'missing':>16}  {filename}")
+            continue
+        frame_size = calculate_yuv_frame_size(width, height, file_format)
+        calculate_chunk_hashes(file_url, frame_size)  # warm up the page cache
+        single = benchmark(file_url, frame_size, workers=1)
+        parallel = benchmark(file_url, frame_size, workers=args.workers)
+        print(f"{width}x{height:<5} {file_format:>22} {single:>14.2f} {parallel:>16.2f}  {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,48 +4,274 @@
 
 import hashlib
 import logging
+import mmap
+import os
 import re
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from math import floor
 
-from Engine.execute import log_fail
+from Engine.digest_cache import get_cache
+from Engine.execute import RaisingThread, log_fail
+from Engine.phases import timed
+from Engine.staging import original_path
 
 
-def calculate_chunk_hashes(file_url: str, chunk_size: int) -> list:
-    chunk_sums = []
-    with open(file_url, "rb") as f:
-        while chunk := f.read(chunk_size):
-            if len(chunk) != chunk_size:
-                logging.debug(f"CHUNK SIZE MISMATCH {len(chunk)} != {chunk_size}")
-            chunk_sum = hashlib.md5(chunk).hexdigest()
-            chunk_sums.append(chunk_sum)
+def _hash_chunk(chunk: memoryview, chunk_size: int, algorithm: str) -> str:
+    if len(chunk) != chunk_size:
+        logging.debug(f"CHUNK SIZE MISMATCH {len(chunk)} != {chunk_size}")
+    return hashlib.new(algorithm, chunk).hexdigest()
+
+
+@timed("hashing")
+def calculate_chunk_hashes(file_url: str, chunk_size: int, algorithm: str = "md5", workers: int = None) -> list:
+    """Returns ordered digests of consecutive chunk_size chunks of the file.
+
+    The file is memory-mapped and every chunk is hashed straight from the mapping by a thread pool.
+    hashlib releases the GIL for large buffers, so chunks are hashed in parallel without being copied.
+    """
+    if os.path.getsize(file_url) == 0:
+        return []
+    with open(file_url, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mm) as view, ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            return list(
+                pool.map(
+                    lambda offset: _hash_chunk(view[offset : offset + chunk_size], chunk_size, algorithm),
+                    range(0, len(view), chunk_size),
+                )
+            )
+
+
+def calculate_cached_chunk_hashes(file_url: str, chunk_size: int, algorithm: str = "md5") -> list:
+    """calculate_chunk_hashes for source files, served from the persistent digest cache when possible."""
+    cache = get_cache()
+    file_url = original_path(file_url)  # staged copies share the digests of their original
+    chunk_sums = cache.get(file_url, chunk_size, algorithm)
+    if chunk_sums is None:
+        chunk_sums = calculate_chunk_hashes(file_url, chunk_size, algorithm)
+        cache.put(file_url, chunk_size, chunk_sums, algorithm)
+    else:
+        logging.debug(f"Using cached digests of {file_url}")
     return chunk_sums
 
 
-def check_chunk_integrity(src_chunk_sums, out_chunk_sums, expected_frame_percentage: int = 80) -> bool:
+class FrameMatchReport:
+    """Result of aligning received frame digests with source frame digests.
+
+    Source frames are referenced by their index in the source, received frames by their index in the output.
+    """
+
+    def __init__(self, src_frames: int, out_frames: int):
+        self.src_frames = src_frames
+        self.out_frames = out_frames
+        self.matched = 0
+        self.corrupted = []  # received frames not present in the source at all
+        self.corrupted_src = []  # source frame expected in place of each corrupted frame
+        self.duplicated = []  # received frames repeating an already received source frame
+        self.reordered = []  # received frames arriving after a later source frame
+        self.dropped = []  # source frames never received, before the last received one
+        self.truncated = 0  # source frames never received, after the last received one
+        self.bursts = []  # (first source frame, length) of consecutive dropped frames
+
+    def summary(self) -> str:
+        max_burst = max((length for _, length in self.bursts), default=0)
+        return (
+            f"matched {self.matched}/{self.src_frames}, corrupted {len(self.corrupted)}, "
+            f"dropped {len(self.dropped)} in {len(self.bursts)} bursts (longest {max_burst}), "
+            f"duplicated {len(self.duplicated)}, reordered {len(self.reordered)}, "
+            f"not received at the end {self.truncated}"
+        )
+
+
+def match_frames(src_chunk_sums: list, out_chunk_sums: list) -> FrameMatchReport:
+    """Aligns received digests with source digests in a single pass over both lists.
+
+    Every received frame is assigned to the earliest not yet received source frame with the same digest
+    that follows the last in-order frame, so a dropped frame does not shift the ones received after it.
+    A corrupted frame stands in for the source frame expected in its place, which is then counted only once,
+    as corrupted, unless it arrives intact after all.
+    """
+    report = FrameMatchReport(len(src_chunk_sums), len(out_chunk_sums))
+    positions = {}
+    for i, chunk_sum in enumerate(src_chunk_sums):
+        positions.setdefault(chunk_sum, []).append(i)
+    first_unreceived = dict.fromkeys(positions, 0)
+    received = bytearray(len(src_chunk_sums))
+    expected = 0  # source frame following the last in-order received frame
+    stand_ins = set()  # source frames received corrupted, counted neither as dropped nor as not received
+    run = 0  # corrupted frames since the last valid one, each standing in for the next source frame
+
+    for j, chunk_sum in enumerate(out_chunk_sums):
+        candidates = positions.get(chunk_sum)
+        if candidates is None:
+            src_frame = min(expected + run, len(src_chunk_sums) - 1)
+            report.corrupted.append(j)
+            report.corrupted_src.append(src_frame)
+            stand_ins.add(src_frame)
+            run += 1
+            continue
+        run = 0
+        k = bisect_left(candidates, expected)
+        if k < len(candidates):
+            expected = candidates[k] + 1
+        else:
+            # all occurrences precede the in-order position, so it is either late or repeated
+            k = first_unreceived[chunk_sum]
+            while k < len(candidates) and received[candidates[k]]:
+                k += 1
+            first_unreceived[chunk_sum] = k
+            if k == len(candidates):
+                report.duplicated.append(j)
+                continue
+            report.reordered.append(j)
+        received[candidates[k]] = 1
+        report.matched += 1
+
+    last = expected - 1
+    for i in range(last):
+        if not received[i] and i not in stand_ins:
+            report.dropped.append(i)
+            if report.bursts and report.bursts[-1][0] + report.bursts[-1][1] == i:
+                report.bursts[-1] = (report.bursts[-1][0], report.bursts[-1][1] + 1)
+            else:
+                report.bursts.append((i, 1))
+    report.truncated = len(src_chunk_sums) - expected - sum(1 for i in stand_ins if i >= expected)
+    return report
+
+
+def check_chunk_integrity(
+    src_chunk_sums, out_chunk_sums, expected_frame_percentage: int = 80, report: FrameMatchReport = None
+) -> bool:
+    """Passes when no received frame is corrupted; report is match_frames() of the digests when already known."""
     logging.debug("SOURCE CHUNKS:")
     logging.debug(src_chunk_sums)
     logging.debug("OUTPUT CHUNKS:")
     logging.debug(out_chunk_sums)
 
-    min_len = min(len(src_chunk_sums), len(out_chunk_sums))
-    for i in range(min_len):
-        if src_chunk_sums[i] != out_chunk_sums[i]:
-            logging.debug(f"Received frame {i+1} is invalid")
-            return False
+    if report is None:
+        report = match_frames(src_chunk_sums, out_chunk_sums)
+    logging.debug(f"Frame matching: {report.summary()}")
+    for i in report.corrupted:
+        logging.debug(f"Received frame {i+1} is invalid")
+    if report.dropped or report.duplicated or report.reordered:
+        logging.warning(f"Transport loss detected: {report.summary()}")
 
     # Ensure enough frames were sent
-    if len(out_chunk_sums) / len(src_chunk_sums) * 100.00 < expected_frame_percentage:
-        logging.warning(f"Received only {len(out_chunk_sums)/len(src_chunk_sums) * 100:.2f}% of the frames! Expected: {expected_frame_percentage:.2f}%")
+    if report.matched / len(src_chunk_sums) * 100.00 < expected_frame_percentage:
+        logging.warning(
+            f"Received only {report.matched / len(src_chunk_sums) * 100:.2f}% of the frames! "
+            f"Expected: {expected_frame_percentage:.2f}%"
+        )
     else:
-        logging.debug(f"Received {len(out_chunk_sums)/len(src_chunk_sums) * 100:.2f}% of the frames")
+        logging.debug(f"Received {report.matched/len(src_chunk_sums) * 100:.2f}% of the frames")
 
-    return True
+    return not report.corrupted
 
 
-def check_st20p_integrity(src_url: str, out_url: str, frame_size: int, expected_frame_percentage: int = 80) -> bool:
-    src_chunk_sums = calculate_chunk_hashes(src_url, frame_size)
+def check_st20p_integrity(
+    src_url: str, out_url: str, frame_size: int, expected_frame_percentage: int = 80, media_info: dict = None
+) -> bool:
+    src_chunk_sums = calculate_cached_chunk_hashes(src_url, frame_size)
     out_chunk_sums = calculate_chunk_hashes(out_url, frame_size)
-    return check_chunk_integrity(src_chunk_sums, out_chunk_sums, expected_frame_percentage)
+    report = match_frames(src_chunk_sums, out_chunk_sums)
+    integrity = check_chunk_integrity(src_chunk_sums, out_chunk_sums, expected_frame_percentage, report)
+    if not integrity and media_info:
+        log_corruption(src_url, out_url, report, media_info)
+    return integrity
+
+
+def log_corruption(src_url: str, out_url: str, report: FrameMatchReport, media_info: dict, max_frames: int = 8) -> None:
+    """Logs a corruption map of the first max_frames invalid frames."""
+    from Engine.frame_diff import locate_corruption
+
+    for out_frame, src_frame in list(zip(report.corrupted, report.corrupted_src))[:max_frames]:
+        cmap = locate_corruption(
+            src_url,
+            out_url,
+            out_frame,
+            src_frame,
+            media_info.get("width"),
+            media_info.get("height"),
+            media_info.get("pixelFormat"),
+            media_info.get("packetSize"),
+        )
+        logging.debug(cmap.summary())
+
+
+class StreamingIntegrityChecker:
+    """Hashes frames read from a named pipe while RxApp writes them and compares them with the source digests.
+
+    The checker opens the pipe for reading, so RxApp's output never touches the disk. With fail_fast set,
+    reading stops on the first invalid frame, which closes the pipe and makes RxApp's next write fail.
+    """
+
+    def __init__(self, src_url: str, fifo_path: str, frame_size: int, fail_fast: bool = True):
+        self.src_url = src_url
+        self.fifo_path = fifo_path
+        self.frame_size = frame_size
+        self.fail_fast = fail_fast
+        self.src_chunk_sums = []
+        self.out_chunk_sums = []
+        self.invalid_frame = None
+        self.reader = None
+
+    @property
+    def failed(self) -> bool:
+        return self.invalid_frame is not None
+
+    def start(self) -> None:
+        self.src_chunk_sums = calculate_cached_chunk_hashes(self.src_url, self.frame_size)
+        self._start_reader()
+
+    def _start_reader(self) -> None:
+        self.reader = RaisingThread(target=self._consume)
+        self.reader.daemon = True
+        self.reader.start()
+
+    @property
+    def received_frames(self) -> int:
+        return len(self.out_chunk_sums)
+
+    def _consume(self) -> None:
+        src_chunk_sums = set(self.src_chunk_sums)
+        with open(self.fifo_path, "rb") as out:
+            while chunk := out.read(self.frame_size):
+                if len(chunk) != self.frame_size:
+                    logging.debug(f"CHUNK SIZE MISMATCH {len(chunk)} != {self.frame_size}")
+                chunk_sum = hashlib.md5(chunk).hexdigest()
+                self.out_chunk_sums.append(chunk_sum)
+                # a digest missing from the source is corruption, other deviations are left to match_frames()
+                if chunk_sum not in src_chunk_sums:
+                    logging.debug(f"Received frame {self.received_frames} is invalid")
+                    if self.invalid_frame is None:
+                        self.invalid_frame = self.received_frames
+                    if self.fail_fast:
+                        return
+
+    def stop(self) -> None:
+        """Unblocks the reader if RxApp never opened the pipe for writing."""
+        try:
+            fd = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+            os.close(fd)
+        except OSError:
+            pass  # no reader waiting on the pipe
+
+    def join(self, timeout: float = 30, expected_frame_percentage: int = 80) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.reader.is_alive() and time.monotonic() < deadline:
+            self.stop()
+            self.reader.join(0.1)
+        if self.reader.is_alive():
+            logging.warning(f"Integrity reader of {self.fifo_path} did not finish in {timeout}s")
+            return False
+        if self.failed:
+            return False
+        return self.verify(expected_frame_percentage)
+
+    def verify(self, expected_frame_percentage: int = 80) -> bool:
+        return check_chunk_integrity(self.src_chunk_sums, self.out_chunk_sums, expected_frame_percentage)
 
 
 def calculate_yuv_frame_size(width: int, height: int, file_format: str) -> int:
@@ -61,86 +287,46 @@ def calculate_yuv_frame_size(width: int, height: int, file_format: str) -> int:
 
 
 def check_st30p_integrity(src_url: str, out_url: str, size: int) -> bool:
-    src_chunk_sums = calculate_chunk_hashes(src_url, size)
+    src_chunk_sums = calculate_cached_chunk_hashes(src_url, size)
     out_chunk_sums = calculate_chunk_hashes(out_url, size)
     return check_chunk_integrity(src_chunk_sums, out_chunk_sums)
 
 
-def calculate_st30p_framebuff_size(
-    format: str, ptime: str, sampling: str, channel: str
-) -> int:
-    match format:
-        case "PCM8":
-            sample_size = 1
-        case "PCM16":
-            sample_size = 2
-        case "PCM24":
-            sample_size = 3
-
-    match sampling:
-        case "48kHz":
-            match ptime:
-                case "1":
-                    sample_num = 48
-                case "0.12":
-                    sample_num = 6
-                case "0.25":
-                    sample_num = 12
-                case "0.33":
-                    sample_num = 16
-                case "4":
-                    sample_num = 192
-        case "96kHz":
-            match ptime:
-                case "1":
-                    sample_num = 96
-                case "0.12":
-                    sample_num = 12
-                case "0.25":
-                    sample_num = 24
-                case "0.33":
-                    sample_num = 32
-                case "4":
-                    sample_num = 384
-
-    match channel:
-        case "M":
-            channel_num = 1
-        case "DM" | "ST" | "LtRt" | "AES3":
-            channel_num = 2
-        case "51":
-            channel_num = 6
-        case "71":
-            channel_num = 8
-        case "222":
-            channel_num = 24
-        case "SGRP":
-            channel_num = 4
-        case _:
-            match = re.match(r"^U(\d{2})$", channel)
-
-            if match:
-                channel_num = int(match.group(1))
-
-    packet_size = sample_size * sample_num * channel_num
+AUDIO_SAMPLE_SIZES = {"PCM8": 1, "PCM16": 2, "PCM24": 3, "pcm_s8": 1, "pcm_s16be": 2, "pcm_s24be": 3}
+AUDIO_SAMPLING_RATES = {"48kHz": 48_000, "96kHz": 96_000}
+AUDIO_PACKET_TIMES = {  # ns
+    "1": 1_000_000 * 1,
+    "0.12": 1_000_000 * 0.125,
+    "0.25": 1_000_000 * 0.25,
+    "0.33": 1_000_000 * 1 / 3,
+    "4": 1_000_000 * 4,
+}
+AUDIO_CHANNELS = {"M": 1, "DM": 2, "ST": 2, "LtRt": 2, "AES3": 2, "51": 6, "71": 8, "222": 24, "SGRP": 4}
+ST30P_DESIRED_FRAME_TIME = 10_000_000  # ns
 
-    match ptime:
-        case "1":
-            packet_time = 1_000_000 * 1
-        case "0.12":
-            packet_time = 1_000_000 * 0.125
-        case "0.25":
-            packet_time = 1_000_000 * 0.25
-        case "0.33":
-            packet_time = 1_000_000 * 1 / 3
-        case "4":
-            packet_time = 1_000_000 * 4
+# samples per packet and packets per frame buffer, precomputed for every (sampling, ptime)
+ST30P_PACKET_SAMPLES = {
+    (sampling, ptime): round(rate * packet_time / 1_000_000_000)
+    for sampling, rate in AUDIO_SAMPLING_RATES.items()
+    for ptime, packet_time in AUDIO_PACKET_TIMES.items()
+}
+ST30P_PACKETS_PER_FRAME = {
+    ptime: floor(ST30P_DESIRED_FRAME_TIME / packet_time) if ST30P_DESIRED_FRAME_TIME > packet_time else 1
+    for ptime, packet_time in AUDIO_PACKET_TIMES.items()
+}
 
-    desired_frame_time = 10_000_000
 
-    packet_per_frame = 1
+def audio_channel_count(channel: str) -> int:
+    if channel in AUDIO_CHANNELS:
+        return AUDIO_CHANNELS[channel]
+    match = re.match(r"^U(\d{2})$", channel)
+    if match:
+        return int(match.group(1))
+    log_fail(f"Channel order {channel} is not known")
 
-    if desired_frame_time > packet_time:
-        packet_per_frame = floor(desired_frame_time / packet_time)
 
-    return packet_per_frame * packet_size
\ No newline at end of file
+def calculate_st30p_framebuff_size(
+    format: str, ptime: str, sampling: str, channel: str
+) -> int:
+    packet_size = AUDIO_SAMPLE_SIZES[format] * ST30P_PACKET_SAMPLES[(sampling, ptime)] * audio_channel_count(channel)
+    return ST30P_PACKETS_PER_FRAME[ptime] * packet_size
@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""End-to-end latency of buffers, from mesh_put_buffer in TxApp to mesh_get_buffer_timeout in RxApp.
+
+In latency mode TxApp stamps a sequence number and a CLOCK_MONOTONIC timestamp into the metadata of
+every buffer and RxApp writes them to a latency file with its own receive time (latency_record_t in
+TestApp/Inc/mcm.h). Latencies are collected in a histogram with HDR-style log-linear buckets, so the
+percentiles keep a fixed relative precision however many buffers are sent.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+LATENCY_RECORD = np.dtype([("seq", "<u4"), ("reserved", "<u4"), ("tx_ns", "<u8"), ("rx_ns", "<u8")])
+PERCENTILES = (50, 99, 99.9)
+
+
+def read_latency_records(path: str) -> np.ndarray:
+    """Returns the records RxApp wrote to a latency file; a record cut off at the end is ignored."""
+    with open(path, "rb") as f:
+        data = f.read()
+    usable = len(data) - len(data) % LATENCY_RECORD.itemsize
+    return np.frombuffer(data[:usable], dtype=LATENCY_RECORD)
+
+
+class LatencyHistogram:
+    """Counts of values in log-linear buckets: every power of two is split into 2^sub_bucket_bits buckets.
+
+    Any value is reported with a relative error below 10^-significant_figures; min and max are exact.
+    """
+
+    def __init__(self, significant_figures: int = 3):
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self.counts = {}  # lowest value of a bucket: count
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+
+    def bucket(self, values: np.ndarray) -> np.ndarray:
+        """Returns the lowest value of the bucket of every value."""
+        values = np.maximum(values.astype(np.int64), 1)
+        _, exponents = np.frexp(values.astype(np.float64))  # values below 2^53 are exact
+        shifts = np.maximum(exponents - 1 - self.sub_bucket_bits, 0)
+        return (values >> shifts) << shifts
+
+    def record(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.int64)
+        if not len(values):
+            return
+        buckets, counts = np.unique(self.bucket(values), return_counts=True)
+        for bucket, count in zip(buckets.tolist(), counts.tolist()):
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += len(values)
+        self.sum += int(values.sum())
+        low, high = int(values.min()), int(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def percentile(self, percentile: float) -> int:
+        """Returns the value below or at which percentile % of the values are, at bucket precision."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(round(self.total * percentile / 100, 6)))  # 100000 * 99.9 / 100 is 99900.00000000001
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(bucket, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def summary(self) -> dict:
+        """Count, min, mean, p50, p99, p99.9 and max, in microseconds for values in ns."""
+        summary = {"count": self.total, "min_us": (self.min or 0) / 1e3, "mean_us": self.mean / 1e3}
+        for percentile in PERCENTILES:
+            summary[f"p{percentile:g}_us"] = self.percentile(percentile) / 1e3
+        summary["max_us"] = (self.max or 0) / 1e3
+        return {key: round(value, 3) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+class LatencyReport:
+    """Latency histogram of the records of one transfer, with the buffers that did not arrive in order."""
+
+    def __init__(self, records: np.ndarray, expected_frames: int = None, significant_figures: int = 3):
+        self.histogram = LatencyHistogram(significant_figures)
+        self.histogram.record(records["rx_ns"].astype(np.int64) - records["tx_ns"].astype(np.int64))
+        sequences = records["seq"].astype(np.int64)
+        expected = expected_frames if expected_frames is not None else int(sequences.max(initial=0))
+        self.received = len(records)
+        self.lost = len(set(range(1, expected + 1)) - set(sequences.tolist()))
+        self.reordered = int(np.count_nonzero(np.diff(sequences) < 0))
+
+    def summary(self) -> dict:
+        return {**self.histogram.summary(), "lost": self.lost, "reordered": self.reordered}
+
+
+class LatencyCase:
+    """Latency of one connection type, written to the benchmark results next to the throughput cases."""
+
+    def __init__(self, name: str, parameters: dict):
+        self.name = name
+        self.parameters = parameters
+        self.report = None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "parameters": self.parameters,
+            "latency": self.report.summary() if self.report is not None else None,
+        }
+
+
+def analyze_latency(path: str, expected_frames: int = None) -> LatencyReport:
+    report = LatencyReport(read_latency_records(path), expected_frames)
+    logging.debug(f"Latency of {report.received} buffers: {report.summary()}")
+    if not report.received:
+        logging.warning(f"No latency records in {path}, is the metadata stamped by TxApp?")
+    return report
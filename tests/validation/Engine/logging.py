@@ -13,6 +13,7 @@ import pytest
 
 from .const import LOG_FOLDER
 from .csv_report import csv_add_test, csv_write_report
+from .phases import phase
 from .stash import (clear_issue, clear_result_log, clear_result_note,
                     get_issue, get_result_log, get_result_note)
 
@@ -173,7 +174,7 @@ def log_case(request, caplog: pytest.LogCaptureFixture):
     logging.banner("#" * 20 + "    DMESG OUTPUT    " + "#" * 20)
     logging.banner("")
 
-    with subprocess.Popen(
+    with phase("dmesg"), subprocess.Popen(
         "exec dmesg -H", stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, text=True
     ) as proc:
         dmesg = "".join(proc.stdout)
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Indexed view of the media files in media_files.py.
+
+Tests parametrize with catalog.params(...), which marks every case with the file it needs. The collection
+hook in fixtures.py validates each file once and skips cases with missing or truncated files before any
+media_proxy is started.
+"""
+
+import os
+import re
+
+import pytest
+
+import Engine.media_files as media_files
+from Engine.integrity import AUDIO_SAMPLE_SIZES, calculate_yuv_frame_size
+
+# dicts of media_files.py indexed by the catalog, with the kind of media they hold
+GROUPS = {
+    "jxs_files": "jxs",
+    "yuv_files": "video",
+    "yuv_files_422p10le": "video",
+    "yuv_files_interlace": "video",
+    "yuv_files_422rfc10": "video",
+    "audio_files": "audio",
+    "anc_files": "text",
+    "st41_files": "text",
+}
+RESOLUTIONS = {"480p": 480, "576p": 576, "720p": 720, "1080p": 1080, "4K": 2160, "8K": 4320}
+FRAMES_IN_NAME = re.compile(r"_(\d+)frames")
+
+
+class MediaAsset:
+    """One entry of a media_files dict; the same file may be listed by several entries."""
+
+    def __init__(self, group: str, key: str, info: dict):
+        self.group = group
+        self.key = key
+        self.info = info
+        self.kind = GROUPS[group]
+        self.filename = info["filename"]
+        self.file_format = info.get("file_format", info.get("format"))
+        self.width = info.get("width")
+        self.height = info.get("height")
+        self.fps = info.get("fps")
+
+    @property
+    def unit_size(self) -> int:
+        """Bytes of a frame (video) or of a sample of all channels (audio), None when files are not sized."""
+        if self.kind == "video":
+            return calculate_yuv_frame_size(self.width, self.height, self.file_format)
+        if self.kind == "audio":
+            return AUDIO_SAMPLE_SIZES[self.file_format] * self.info["channels"]
+        return None
+
+    def __repr__(self) -> str:
+        return f"MediaAsset({self.group}.{self.key}: {self.filename})"
+
+
+class MediaCatalog:
+    """Media assets with indexes by group, file, resolution, pixel format and fps."""
+
+    def __init__(self, groups: dict):
+        self.assets = []
+        self.indexes = {}  # attribute: {value: set of asset positions}
+        for group in groups:
+            for key, info in getattr(media_files, group).items():
+                self._add(MediaAsset(group, key, info))
+        self._problems = {}  # (media path, filename): problem found, None when the file is usable
+
+    def _add(self, asset: MediaAsset) -> None:
+        position = len(self.assets)
+        self.assets.append(asset)
+        for attribute in ("group", "kind", "filename", "file_format", "height", "fps"):
+            self.indexes.setdefault(attribute, {}).setdefault(getattr(asset, attribute), set()).add(position)
+        self.indexes.setdefault("size", {}).setdefault((asset.width, asset.height), set()).add(position)
+
+    def query(self, resolution: str = None, **criteria) -> list:
+        """Returns assets matching all criteria, e.g. query(resolution="4K", file_format="YUV422RFC4175PG2BE10").
+
+        Criteria are group, kind, filename, file_format, height, fps or size as (width, height).
+        """
+        if resolution is not None:
+            criteria["height"] = RESOLUTIONS[resolution]
+        positions = set(range(len(self.assets)))
+        for attribute, value in criteria.items():
+            if attribute not in self.indexes:
+                raise ValueError(f"Media catalog has no index of {attribute}")
+            positions &= self.indexes[attribute].get(value, set())
+        return [self.assets[position] for position in sorted(positions)]
+
+    def files(self, resolution: str = None, **criteria) -> dict:
+        """Returns {filename: first matching asset}, listing every matching file once."""
+        files = {}
+        for asset in self.query(resolution, **criteria):
+            files.setdefault(asset.filename, asset)
+        return files
+
+    def params(self, resolution: str = None, **criteria) -> list:
+        """Returns pytest params of the keys of matching assets, marked with the media file they need."""
+        return [
+            pytest.param(asset.key, id=asset.key, marks=pytest.mark.media(asset.filename))
+            for asset in self.query(resolution, **criteria)
+        ]
+
+    def problem(self, media: str, filename: str) -> str:
+        """Validates a file once per session; returns why it cannot be used, or None."""
+        if (media, filename) not in self._problems:
+            self._problems[(media, filename)] = self._validate(media, filename)
+        return self._problems[(media, filename)]
+
+    def _validate(self, media: str, filename: str) -> str:
+        path = os.path.join(media, filename)
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return f"Media file {path} does not exist"
+        if not size:
+            return f"Media file {path} is empty"
+
+        for asset in self.query(filename=filename):
+            unit_size = asset.unit_size
+            if unit_size is None:
+                continue
+            if size % unit_size:
+                return f"Media file {path} is truncated: {size} bytes is not a multiple of {unit_size} ({asset.key})"
+            frames = FRAMES_IN_NAME.search(filename)
+            if asset.kind == "video" and frames and size != int(frames.group(1)) * unit_size:
+                return f"Media file {path} has {size // unit_size} frames, {frames.group(1)} expected ({asset.key})"
+        return None
+
+
+catalog = MediaCatalog(GROUPS)
@@ -0,0 +1,281 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Single asyncio event loop supervising every process started by Engine.execute.
+
+Instead of a reader thread and a timer thread per process, one loop thread reads all stdout pipes
+without blocking, learns about process exits from pidfds and enforces per-process deadlines.
+Any number of processes can be waited for concurrently.
+"""
+
+import asyncio
+import logging
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+
+import psutil
+
+from .process_log import ProcessLog
+
+READ_SIZE = 64 * 1024
+KILL_GRACE = 5  # seconds between the deadline signal and SIGKILL
+POLL_INTERVAL = 0.05  # seconds between exit checks where pidfds are not available
+
+
+def signal_group(process: subprocess.Popen, sig: int) -> None:
+    """Signals the process group led by the process, or the process alone when it does not lead one."""
+    try:
+        if os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, sig)
+        else:
+            process.send_signal(sig)
+    except ProcessLookupError:
+        pass  # already gone
+
+
+def group_members(pgid: int) -> list:
+    """Returns PIDs of live (not zombie) processes in the process group."""
+    members = []
+    for process in psutil.process_iter(["status"]):
+        try:
+            if process.info["status"] != psutil.STATUS_ZOMBIE and os.getpgid(process.pid) == pgid:
+                members.append(process.pid)
+        except ProcessLookupError:
+            pass
+    return members
+
+
+def wait_exit(process: subprocess.Popen, timeout: float) -> bool:
+    """Waits until a child process ends, woken up by its pidfd rather than polling; returns whether it ended."""
+    if process.poll() is not None:
+        return True
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except ProcessLookupError:
+        pidfd = None  # exited already, just not reaped yet
+    except (AttributeError, OSError):
+        try:
+            process.wait(timeout)  # waitpid with sub-second back-off
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    if pidfd is not None:
+        try:
+            select.select([pidfd], [], [], timeout)
+        finally:
+            os.close(pidfd)
+    # the exit may be reaped by the orchestrator thread at the same time, so wait() instead of poll()
+    try:
+        process.wait(0.1)
+        return True
+    except subprocess.TimeoutExpired:
+        return False
+
+
+class ProcessResult:
+    """Outcome of a finished process; output holds the recent lines kept by its ProcessLog."""
+
+    def __init__(self, pid: int, command: str, returncode: int, output: str, duration: float, timed_out: bool):
+        self.pid = pid
+        self.command = command
+        self.returncode = returncode
+        self.output = output
+        self.duration = duration
+        self.timed_out = timed_out
+
+    def __repr__(self) -> str:
+        return f"ProcessResult(pid={self.pid}, rc={self.returncode}, {self.duration:.3f}s, timed_out={self.timed_out})"
+
+
+class ManagedProcess:
+    """Loop-side state of a supervised process; its output is ingested by a ProcessLog."""
+
+    def __init__(
+        self, process: subprocess.Popen, command: str, log: ProcessLog, timeout: float, sigint: bool,
+        persistent: bool = False
+    ):
+        self.process = process
+        self.command = command
+        self.log = log
+        self.timeout = timeout
+        self.sigint = sigint
+        self.persistent = persistent  # outlives tests, e.g. pooled media_proxy; not stopped by stop_all
+        self.started = time.monotonic()
+        self.ended = None
+        self.timed_out = False
+        self.eof = False
+        self.exited = False
+        self.pidfd = None
+        self.deadline = None
+        self.done = None  # asyncio future, resolved with the ProcessResult
+
+    def result(self) -> ProcessResult:
+        return ProcessResult(
+            self.process.pid,
+            self.command,
+            self.process.returncode,
+            self.log.text(),
+            (self.ended or time.monotonic()) - self.started,
+            self.timed_out,
+        )
+
+
+class Orchestrator:
+    """Owns the event loop thread; all public methods are safe to call from any thread."""
+
+    def __init__(self):
+        self.processes = {}  # pid: ManagedProcess of every process still running or not yet waited for
+        self.groups = {}  # process group: command, for groups not yet found empty
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="orchestrator", daemon=True)
+        self.thread.start()
+
+    def spawn(
+        self, command: str, cwd: str = None, env: dict = None, timeout: float = 0, sigint: bool = False,
+        logfile=None, persistent: bool = False
+    ) -> ManagedProcess:
+        """Starts a shell command; logfile is called with the PID and returns the path its output is logged to."""
+        process = subprocess.Popen(
+            "exec " + command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=True,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,  # own process group, so children of the command are stopped with it
+        )
+        log = ProcessLog(logfile(process.pid) if logfile is not None else None)
+        mp = ManagedProcess(process, command, log, timeout, sigint, persistent)
+        self.processes[process.pid] = mp
+        self.groups[process.pid] = command
+        asyncio.run_coroutine_threadsafe(self._watch(mp), self.loop).result()
+        return mp
+
+    async def _watch(self, mp: ManagedProcess) -> None:
+        mp.done = self.loop.create_future()
+        fd = mp.process.stdout.fileno()
+        os.set_blocking(fd, False)
+        self.loop.add_reader(fd, self._on_output, mp)
+        try:
+            mp.pidfd = os.pidfd_open(mp.process.pid)
+            self.loop.add_reader(mp.pidfd, self._on_exit, mp)
+        except (AttributeError, OSError):
+            self.loop.call_later(POLL_INTERVAL, self._poll_exit, mp)
+        if mp.timeout and mp.timeout > 0:
+            mp.deadline = self.loop.call_later(mp.timeout, self._on_deadline, mp)
+
+    def _on_output(self, mp: ManagedProcess) -> None:
+        fd = mp.process.stdout.fileno()
+        try:
+            data = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        mp.log.feed(data)
+        if not data:
+            self.loop.remove_reader(fd)
+            mp.process.stdout.close()
+            mp.eof = True
+            self._finish(mp)
+
+    def _on_exit(self, mp: ManagedProcess) -> None:
+        self.loop.remove_reader(mp.pidfd)
+        os.close(mp.pidfd)
+        mp.pidfd = None
+        self._poll_exit(mp)
+
+    def _poll_exit(self, mp: ManagedProcess) -> None:
+        # poll() also returns None while another thread is reaping the process in wait()
+        if mp.process.poll() is None:
+            self.loop.call_later(POLL_INTERVAL, self._poll_exit, mp)
+        else:
+            self._exited(mp)
+
+    def _exited(self, mp: ManagedProcess) -> None:
+        mp.exited = True
+        mp.ended = time.monotonic()
+        if mp.deadline is not None:
+            mp.deadline.cancel()
+        self._finish(mp)
+
+    def _on_deadline(self, mp: ManagedProcess) -> None:
+        if mp.process.poll() is not None:
+            return
+        logging.debug(f"Process {mp.process.pid} exceeded its {mp.timeout}s deadline")
+        mp.timed_out = True
+        signal_group(mp.process, signal.SIGINT if mp.sigint else signal.SIGTERM)
+        mp.deadline = self.loop.call_later(KILL_GRACE, self._kill, mp)
+
+    def _kill(self, mp: ManagedProcess) -> None:
+        if mp.process.poll() is None:
+            signal_group(mp.process, signal.SIGKILL)
+
+    def _finish(self, mp: ManagedProcess) -> None:
+        if not (mp.eof and mp.exited) or mp.done.done():
+            return
+        self.processes.pop(mp.process.pid, None)
+        mp.done.set_result(mp.result())
+
+    def wait(self, mp: ManagedProcess, timeout: float = None) -> ProcessResult:
+        """Blocks until the process has ended and its output is read; raises TimeoutError after timeout."""
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(asyncio.shield(mp.done), timeout), self.loop)
+        return future.result()
+
+    def waitall(self, mps: list, timeout: float = None) -> list:
+        """Waits for all processes concurrently; returns their results in the same order."""
+
+        async def gather():
+            return await asyncio.wait_for(asyncio.gather(*(asyncio.shield(mp.done) for mp in mps)), timeout)
+
+        return asyncio.run_coroutine_threadsafe(gather(), self.loop).result()
+
+    def running(self) -> list:
+        return [mp for mp in list(self.processes.values()) if mp.process.poll() is None]
+
+    def stop_all(self, timeout: float = KILL_GRACE) -> list:
+        """Stops every process group still alive: SIGTERM to all at once, SIGKILL to what is left after timeout.
+
+        Persistent processes that are still running are left alone, with their groups.
+        Returns (pid, command) of processes that were still running, i.e. leaked by their owner.
+        """
+        running = [mp for mp in self.running() if not mp.persistent]
+        leaked = [(mp.process.pid, mp.command) for mp in running]
+        for mp in running:
+            signal_group(mp.process, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        for mp in running:
+            if not wait_exit(mp.process, max(0, deadline - time.monotonic())):
+                signal_group(mp.process, signal.SIGKILL)
+                wait_exit(mp.process, 1)
+        # children left behind in the groups, also of commands that have already ended
+        reported = {pid for pid, _ in leaked}
+        for pgid, command in list(self.groups.items()):
+            leader = self.processes.get(pgid)
+            if leader is not None and leader.persistent and leader.process.poll() is None:
+                continue
+            members = group_members(pgid)
+            if not members:
+                del self.groups[pgid]
+                continue
+            leaked.extend((pid, f"child of: {command}") for pid in members if pid not in reported)
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass  # the group emptied since it was listed
+        return leaked
+
+
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+
+
+def get_orchestrator() -> Orchestrator:
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = Orchestrator()
+        return _orchestrator
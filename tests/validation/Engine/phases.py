@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Phases of the harness timed for the profiler (Engine.profiler), importable before the plugin is registered.
+
+phase() and @timed() do nothing unless a profiling mode was chosen with --profile.
+"""
+
+import contextlib
+import cProfile
+import functools
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+TABLE_ROWS = 30
+
+active = None  # PhaseProfiler of the session, None when profiling is off
+
+
+class Frame:
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.children = 0.0
+
+
+class PhaseProfiler:
+    """Nested phases of the main thread; self time per stack, total time per phase path."""
+
+    def __init__(self, cprofile: bool = False):
+        self.cprofile = cprofile
+        self.stack = []
+        self.self_times = defaultdict(float)  # collapsed stack: seconds spent in the phase itself
+        self.durations = defaultdict(list)  # phase path without the test: seconds of every occurrence
+        self.stats = None  # pstats.Stats of the session
+        self.started = time.perf_counter()
+        self.wall = 0.0
+
+    def enter(self, name: str) -> None:
+        self.stack.append(Frame(name))
+
+    def exit(self) -> None:
+        frame = self.stack.pop()
+        elapsed = time.perf_counter() - frame.start
+        path = [f.name for f in self.stack] + [frame.name]
+        self.self_times[";".join(path)] += elapsed - frame.children
+        self.durations[";".join(path[1:])].append(elapsed)
+        if self.stack:
+            self.stack[-1].children += elapsed
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        if threading.current_thread() is not threading.main_thread():
+            yield  # phases of helper threads overlap with the main thread
+            return
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def add_stats(self, profile: cProfile.Profile) -> None:
+        if self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+
+    def table(self) -> list:
+        rows = []
+        for path, durations in self.durations.items():
+            if path:
+                rows.append((sum(durations), path, len(durations), max(durations)))
+        rows.sort(reverse=True)
+        lines = [f"{'total s':>9} {'% wall':>7} {'count':>6} {'mean s':>8} {'max s':>8}  phase"]
+        for total, path, count, longest in rows[:TABLE_ROWS]:
+            share = 100 * total / self.wall if self.wall else 0.0
+            lines.append(f"{total:>9.2f} {share:>7.1f} {count:>6} {total / count:>8.3f} {longest:>8.3f}  {path}")
+        return lines
+
+    def write_collapsed(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            for stack, seconds in sorted(self.self_times.items()):
+                f.write(f"{stack} {round(seconds * 1e6)}\n")  # µs, as sample counts
+
+
+def phase(name: str):
+    """Context manager timing a part of the harness; does nothing unless profiling is on."""
+    if active is None:
+        return contextlib.nullcontext()
+    return active.phase(name)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as a phase."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Bounded ingestion of process output.
+
+Output arrives in blocks and is written to a gzip-compressed log as it comes. In memory, only a ring
+buffer of recent lines is kept, for probes and failure reports; per-frame lines of TxApp and RxApp are
+not stored at all but counted, with the time every occurrence arrived.
+"""
+
+import codecs
+import gzip
+import re
+import threading
+import time
+from array import array
+from collections import deque
+
+TAIL_LINES = 1000  # recent lines kept in memory
+REPORT_LINES = 20  # recent lines in a failure report
+COMPRESS_LEVEL = 1  # fast gzip, logs are written while the test runs
+
+ansi_esc = re.compile(r"\x1b\[[0-9;]*m")
+
+# name, literal every matching line contains, regex capturing a number (None to count occurrences)
+FRAME_COUNTERS = (
+    ("tx_frame", "[TX] Sending frame: ", r"\[TX\] Sending frame: (\d+)"),
+    ("rx_fetched", "[RX] Fetched mesh data buffer", None),
+    ("rx_frame", "[RX] Frame: ", r"\[RX\] Frame: (\d+)"),
+    ("rx_saving", "[RX] Saving buffer data to a file", None),
+)
+
+
+class LineCounter:
+    """Occurrences of a per-frame line, with the monotonic time of each and the last number it carried."""
+
+    def __init__(self, name: str, literal: str, pattern: str = None):
+        self.name = name
+        self.literal = literal
+        self.regex = re.compile(pattern) if pattern else None
+        self.count = 0
+        self.number = None
+        self.times = array("d")
+
+    @property
+    def value(self) -> int:
+        """Last number printed, or the number of occurrences for lines without one."""
+        if self.regex is None:
+            return self.count
+        return self.number or 0
+
+    def add(self, line: str, now: float) -> bool:
+        if self.literal not in line:
+            return False
+        if self.regex is not None:
+            match = self.regex.search(line)
+            if match is None:
+                return False
+            self.number = int(match.group(1))
+        self.count += 1
+        self.times.append(now)
+        return True
+
+    def rate(self) -> float:
+        """Occurrences per second between the first and the last one."""
+        if self.count < 2:
+            return 0.0
+        return (self.count - 1) / max(self.times[-1] - self.times[0], 1e-9)
+
+    def __repr__(self) -> str:
+        return f"{self.name}={self.value} ({self.count} lines, {self.rate():.1f}/s)"
+
+
+class ProcessLog:
+    """Output of one process; feed() is called with every block read and with b"" at the end of output.
+
+    Readers wait on updated, which is notified once per block, and hold it while reading the tail.
+    """
+
+    def __init__(self, path: str = None, tail_lines: int = TAIL_LINES, counters: tuple = FRAME_COUNTERS):
+        self.path = path
+        self.file = gzip.open(path, "wt", compresslevel=COMPRESS_LEVEL) if path else None
+        self.tail = deque(maxlen=tail_lines)
+        self.lines = 0  # lines kept in the tail so far, including those already dropped from it
+        self.counted = 0  # lines taken by counters instead
+        self.bytes = 0
+        self.counters = {name: LineCounter(name, literal, pattern) for name, literal, pattern in counters}
+        self.ended = False
+        self.updated = threading.Condition()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, data: bytes) -> None:
+        now = time.monotonic()
+        text = self._partial + self._decoder.decode(data, final=not data)
+        if data:
+            cut = text.rfind("\n") + 1
+            text, self._partial = text[:cut], text[cut:]
+        elif text and not text.endswith("\n"):
+            text += "\n"  # last line without a newline
+        if "\x1b" in text:
+            text = ansi_esc.sub("", text)
+        if self.file is not None and text:
+            self.file.write(text)
+
+        with self.updated:
+            self.bytes += len(data)
+            for line in text.splitlines(keepends=True):
+                if not any(counter.add(line, now) for counter in self.counters.values()):
+                    self.tail.append(line)
+                    self.lines += 1
+                else:
+                    self.counted += 1
+            if not data:
+                self.ended = True
+                if self.file is not None:
+                    self.file.close()
+            self.updated.notify_all()
+
+    def since(self, index: int) -> tuple:
+        """Returns (lines kept from index on, next index); lines already dropped from the tail are skipped."""
+        first = self.lines - len(self.tail)
+        start = max(index, first)
+        return list(self.tail)[start - first :], self.lines
+
+    def text(self) -> str:
+        with self.updated:
+            return "".join(self.tail)
+
+    def summary(self) -> str:
+        with self.updated:
+            counters = ", ".join(repr(counter) for counter in self.counters.values() if counter.count)
+            return f"{self.lines + self.counted} lines, {self.bytes} bytes" + (f"; {counters}" if counters else "")
+
+    def report(self, lines: int = REPORT_LINES) -> str:
+        """Summary and the last lines, for failure messages."""
+        with self.updated:
+            recent = list(self.tail)[-lines:]
+        return "\n".join([self.summary()] + [line.rstrip("\n") for line in recent])
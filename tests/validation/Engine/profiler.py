@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Opt-in breakdown of where the wall-clock time of each test goes (--profile=phases or --profile=cprofile).
+
+Setup and teardown of every fixture, the test call and the phases marked in the harness with phase()
+(JSON generation, transfer, integrity checks, hashing, dmesg collection...) are timed as a tree per test.
+At the end of the session a table of phases is printed and the tree is written as collapsed stacks to
+logs/latest/profile.collapsed, for flamegraph.pl or speedscope. With cprofile, the Python code of the main
+thread is profiled as well: per test to logs/latest/<test case>.prof and summarized for the session.
+
+This module holds only the pytest hooks; the harness marks its phases with Engine.phases, which is imported
+before this plugin is registered.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import time
+
+import pytest
+
+from . import phases
+from .const import LOG_FOLDER
+from .phases import PhaseProfiler
+
+PROFILE_MODES = ("phases", "cprofile")
+PSTATS_ROWS = 15
+
+
+def pytest_configure(config):
+    mode = config.getoption("--profile")
+    if mode is None:
+        return
+    if mode not in PROFILE_MODES:
+        raise RuntimeError(f"Wrong option --profile={mode}, expected one of {PROFILE_MODES}")
+    phases.active = PhaseProfiler(cprofile=mode == "cprofile")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if phases.active is None:
+        return (yield)
+    profile = cProfile.Profile() if phases.active.cprofile else None
+    phases.active.enter(item.originalname)
+    if profile is not None:
+        profile.enable()
+    try:
+        return (yield)
+    finally:
+        if profile is not None:
+            profile.disable()
+            path = os.path.join(LOG_FOLDER, "latest", f"{item.nodeid}.prof")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profile.dump_stats(path)
+            phases.active.add_stats(profile)
+        phases.active.exit()
+
+
+def _timed_hook(name: str):
+    @pytest.hookimpl(wrapper=True)
+    def hook(item, *args):
+        if phases.active is None:
+            return (yield)
+        with phases.active.phase(name):
+            return (yield)
+
+    return hook
+
+
+pytest_runtest_setup = _timed_hook("setup")
+pytest_runtest_call = _timed_hook("call")
+pytest_runtest_teardown = _timed_hook("teardown")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if phases.active is None or not phases.active.stack:
+        return (yield)
+    # finalizers run last in, first out: the fixture's own teardown runs between these two
+    teardown = {}
+    fixturedef.addfinalizer(functools.partial(_exit_teardown, teardown))
+    with phases.active.phase(fixturedef.argname):
+        result = yield
+    fixturedef.addfinalizer(functools.partial(_enter_teardown, fixturedef.argname, teardown))
+    return result
+
+
+def _enter_teardown(name: str, teardown: dict) -> None:
+    phases.active.enter(name)
+    teardown["frame"] = phases.active.stack[-1]
+
+
+def _exit_teardown(teardown: dict) -> None:
+    # nothing to close when the fixture failed to set up
+    if phases.active.stack and phases.active.stack[-1] is teardown.get("frame"):
+        phases.active.exit()
+
+
+def pytest_terminal_summary(terminalreporter):
+    if phases.active is None:
+        return
+    phases.active.wall = time.perf_counter() - phases.active.started
+    terminalreporter.section(f"harness profile ({phases.active.wall:.1f}s wall)")
+    for line in phases.active.table():
+        terminalreporter.write_line(line)
+    collapsed = os.path.join(LOG_FOLDER, "latest", "profile.collapsed")
+    phases.active.write_collapsed(collapsed)
+    terminalreporter.write_line(f"Collapsed stacks for flame graphs: {collapsed}")
+    if phases.active.stats is not None:
+        terminalreporter.write_line(f"Python functions by cumulative time (main thread, top {PSTATS_ROWS}):")
+        phases.active.stats.stream = io.StringIO()
+        phases.active.stats.sort_stats("cumulative").print_stats(PSTATS_ROWS)
+        for line in phases.active.stats.stream.getvalue().splitlines():
+            terminalreporter.write_line(line)
@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""mesh-agent and media_proxy kept running across tests, health-checked around every test.
+
+Before and after a test the running pair is checked: both processes are alive, the SDK port accepts connections and
+the control API of mesh-agent lists exactly one healthy media_proxy with no connections or bridges left
+over from the previous test. media_proxy must also not have grown in file descriptors, threads or RSS
+beyond fixed limits since the first test it served. The pair is restarted only when a check fails or when
+the test asks for other options (@pytest.mark.media_proxy); a check failing after a test fails that test.
+"""
+
+import json
+import logging
+import urllib.request
+from collections import Counter
+
+import psutil
+
+import Engine.execute
+from Engine.const import STARTUP_TIMEOUT
+from Engine.workspace import lease_proxy_ports
+
+RELEASE_TIMEOUT = 2  # seconds for connections of the previous test to be removed from mesh-agent
+STOP_TIMEOUT = 2  # seconds for each process to end on SIGTERM
+FD_GROWTH = 64  # file descriptors media_proxy may gain since its first test
+THREAD_GROWTH = 16
+RSS_GROWTH_KB = 512 * 1024
+
+
+def media_proxy_status(port: int) -> list:
+    """Returns the media_proxies registered in mesh-agent with their status, None when its control API does not respond."""
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/media-proxy?status", timeout=1) as response:
+            return json.load(response).get("mediaProxy") or []
+    except (OSError, ValueError):
+        return None
+
+
+def process_usage(pid: int) -> dict:
+    process = psutil.Process(pid)
+    with process.oneshot():
+        return {"fds": process.num_fds(), "threads": process.num_threads(), "rss_kb": process.memory_info().rss // 1024}
+
+
+class ProxyPair:
+    """A mesh-agent and a media_proxy registered in it, on ports leased for them."""
+
+    def __init__(self, options: dict):
+        self.options = options
+        self.lease, self.ports = lease_proxy_ports(lambda port: not Engine.execute.port_open(port))
+        self.agent = None
+        self.proxy = None
+        self.baseline = None  # usage of media_proxy after its first test
+        self.tests = 0
+
+    def start(self) -> None:
+        ports = self.ports
+        logging.debug(f"Starting mesh-agent and media_proxy on {ports}")
+        self.agent = Engine.execute.call(
+            f"mesh-agent -p {ports.agent_proxy_api} -c {ports.agent_control_api} {self.options.get('agent_args', '')}".rstrip(),
+            cwd=".", timeout=0, persistent=True,
+        )
+        Engine.execute.wait_for_port(ports.agent_proxy_api, timeout=STARTUP_TIMEOUT, ap=self.agent)
+        self.proxy = Engine.execute.call(
+            f"media_proxy -t {ports.sdk} -p {ports.rdma} --agent=localhost:{ports.agent_proxy_api} "
+            f"{self.options.get('proxy_args', '')}".rstrip(),
+            cwd=".", timeout=0, persistent=True,
+        )
+        Engine.execute.wait_for_port(ports.sdk, timeout=STARTUP_TIMEOUT, ap=self.proxy)
+        Engine.execute.wait_until(
+            lambda: bool(media_proxy_status(ports.agent_control_api)),
+            "media_proxy registered in mesh-agent",
+            STARTUP_TIMEOUT,
+            self.proxy,
+        )
+
+    def stop(self) -> None:
+        # media_proxy has to terminate properly before mesh-agent is terminated
+        for name, ap in (("media_proxy", self.proxy), ("mesh-agent", self.agent)):
+            if ap is None:
+                continue
+            rc = Engine.execute.killproc(ap.process, timeout=STOP_TIMEOUT)
+            if rc is None:
+                logging.error(f"{name} with PID {ap.process.pid} could not be stopped")
+            else:
+                logging.debug(f"{name} stopped with RC {rc}")
+        self.lease.release()
+
+    def problem(self) -> tuple:
+        """Returns (kind, description) of why the pair cannot serve another test, None when it is healthy.
+
+        Kinds are "crash", "unresponsive" and "leak".
+        """
+        for name, ap in (("mesh-agent", self.agent), ("media_proxy", self.proxy)):
+            if ap.process.poll() is not None:
+                return "crash", f"{name} exited with RC {ap.process.returncode}"
+        if not Engine.execute.port_open(self.ports.sdk):
+            return "unresponsive", f"media_proxy does not accept connections on port {self.ports.sdk}"
+        proxies = media_proxy_status(self.ports.agent_control_api)
+        if proxies is None:
+            return "unresponsive", f"mesh-agent control API does not respond on port {self.ports.agent_control_api}"
+        if len(proxies) != 1:
+            return "unresponsive", f"{len(proxies)} media_proxies registered in mesh-agent"
+        if not (proxies[0].get("status") or {}).get("healthy", True):
+            return "unresponsive", "mesh-agent reports media_proxy as unhealthy"
+        if Engine.execute.wait_until(self._released, "connections released", RELEASE_TIMEOUT) is None:
+            status = media_proxy_status(self.ports.agent_control_api) or [{}]
+            status = status[0].get("status") or {}
+            return "leak", f"{status.get('connsNum')} connections and {status.get('bridgesNum')} bridges left in media_proxy"
+        return self._leak()
+
+    def _released(self) -> bool:
+        proxies = media_proxy_status(self.ports.agent_control_api) or [{}]
+        status = proxies[0].get("status") or {}
+        return not status.get("connsNum") and not status.get("bridgesNum")
+
+    def _leak(self) -> tuple:
+        try:
+            usage = process_usage(self.proxy.process.pid)
+        except psutil.Error:
+            return None  # other checks catch a process that is gone
+        if self.baseline is None:
+            self.baseline = usage  # buffers are allocated lazily, so growth is counted from the first test on
+            return None
+        if usage["fds"] > self.baseline["fds"] + FD_GROWTH:
+            return "leak", f"media_proxy file descriptors grew from {self.baseline['fds']} to {usage['fds']}"
+        if usage["threads"] > self.baseline["threads"] + THREAD_GROWTH:
+            return "leak", f"media_proxy threads grew from {self.baseline['threads']} to {usage['threads']}"
+        if usage["rss_kb"] > self.baseline["rss_kb"] + RSS_GROWTH_KB:
+            return "leak", f"media_proxy RSS grew from {self.baseline['rss_kb']} kB to {usage['rss_kb']} kB"
+        return None
+
+
+class ProxyPool:
+    """Hands the running pair to every test, restarting it only when unhealthy or started with other options."""
+
+    def __init__(self):
+        self.pair = None
+        self.starts = 0
+        self.reuses = 0
+        self.restarts = Counter()  # kind of problem: count
+
+    def acquire(self, options: dict) -> ProxyPair:
+        if self.pair is not None:
+            if self.pair.options != options:
+                problem = "options", f"options {self.pair.options} changed to {options}"
+            else:
+                problem = self.pair.problem()
+            if problem is None:
+                self.reuses += 1
+                self.pair.tests += 1
+                return self.pair
+            kind, reason = problem
+            logging.info(f"Restarting mesh-agent and media_proxy after {self.pair.tests} tests: {reason}")
+            self.restarts[kind] += 1
+            self.pair.stop()
+        self.pair = ProxyPair(options)
+        self.pair.start()
+        self.starts += 1
+        self.pair.tests = 1
+        return self.pair
+
+    def release(self, pair: ProxyPair) -> tuple:
+        """Checks the pair after a test; returns (kind, description) of what the test left broken, None when healthy.
+
+        A broken pair is stopped right away, so the next test starts a new one instead of finding the damage.
+        """
+        if pair is not self.pair:
+            return None
+        problem = pair.problem()
+        if problem is not None:
+            kind, reason = problem
+            logging.info(f"Stopping mesh-agent and media_proxy after {pair.tests} tests: {reason}")
+            self.restarts[kind] += 1
+            self.close()
+        return problem
+
+    def close(self) -> None:
+        if self.pair is not None:
+            self.pair.stop()
+            self.pair = None
+
+    def summary(self) -> str:
+        restarts = ", ".join(f"{kind}: {count}" for kind, count in self.restarts.items()) or "none"
+        return f"media_proxy pool: {self.starts} starts, {self.reuses} reuses; restarts by reason: {restarts}"
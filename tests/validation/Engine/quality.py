@@ -0,0 +1,173 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Vectorized per-frame PSNR/SSIM for lossy video paths (ST 2110-22 / JPEG XS), where md5 integrity cannot pass."""
+
+import logging
+import os
+
+import numpy as np
+
+from Engine.integrity import calculate_yuv_frame_size
+
+PEAK = 1023  # 10-bit samples
+PSNR_IDENTICAL = 100.0  # reported instead of infinity for identical planes
+SSIM_BLOCK = 8
+MEMORY_BUDGET = 512 * 1024 * 1024  # bytes of decoded samples held at once
+PLANES = ("Y", "U", "V")
+
+
+def decode_frames(frames: np.ndarray, width: int, height: int, file_format: str) -> tuple:
+    """Decodes a (frames, frame_size) uint8 array into Y, U, V uint16 arrays of shape (frames, height, width[/2])."""
+    n = frames.shape[0]
+    match file_format:
+        case "YUV422PLANAR10LE" | "yuv422p10le":
+            samples = frames.view("<u2")
+            luma = width * height
+            chroma = luma // 2
+            y = samples[:, :luma].reshape(n, height, width)
+            u = samples[:, luma : luma + chroma].reshape(n, height, width // 2)
+            v = samples[:, luma + chroma :].reshape(n, height, width // 2)
+            return y, u, v
+        case "YUV422RFC4175PG2BE10" | "yuv422p10rfc4175":
+            # 5-byte pixel group: Cb Y0 Cr Y1, 10 bits each, big endian
+            pg = frames.reshape(n, height, width // 2, 5).astype(np.uint16)
+            u = (pg[..., 0] << 2) | (pg[..., 1] >> 6)
+            y0 = ((pg[..., 1] & 0x3F) << 4) | (pg[..., 2] >> 4)
+            v = ((pg[..., 2] & 0x0F) << 6) | (pg[..., 3] >> 2)
+            y1 = ((pg[..., 3] & 0x03) << 8) | pg[..., 4]
+            y = np.stack((y0, y1), axis=-1).reshape(n, height, width)
+            return y, u, v
+    raise ValueError(f"Decoding of {file_format} is not supported")
+
+
+def psnr(ref: np.ndarray, dist: np.ndarray) -> np.ndarray:
+    """Returns PSNR in dB of every frame of (frames, height, width) arrays."""
+    diff = ref.astype(np.int32) - dist
+    mse = np.einsum("fhw,fhw->f", diff, diff, dtype=np.float64) / (diff.shape[1] * diff.shape[2])
+    with np.errstate(divide="ignore"):
+        result = 10 * np.log10(PEAK**2 / mse)
+    return np.minimum(result, PSNR_IDENTICAL)
+
+
+def _block_means(x: np.ndarray) -> np.ndarray:
+    """Returns means of non-overlapping 8x8 blocks of (frames, height, width) array, summed exactly in integers."""
+    n, h, w = x.shape
+    rows = x.reshape(n, h // SSIM_BLOCK, SSIM_BLOCK, w).sum(axis=2, dtype=np.uint32)
+    blocks = rows.reshape(n, h // SSIM_BLOCK, w // SSIM_BLOCK, SSIM_BLOCK).sum(axis=3, dtype=np.uint32)
+    return blocks / SSIM_BLOCK**2
+
+
+def ssim(ref: np.ndarray, dist: np.ndarray) -> np.ndarray:
+    """Returns mean SSIM of every frame, computed over non-overlapping 8x8 blocks."""
+    _, h, w = ref.shape
+    h -= h % SSIM_BLOCK
+    w -= w % SSIM_BLOCK
+    # 64 squared 10-bit samples fit in uint32, so block moments are exact
+    a = ref[:, :h, :w].astype(np.uint32)
+    b = dist[:, :h, :w].astype(np.uint32)
+
+    mu_a = _block_means(a)
+    mu_b = _block_means(b)
+    var_a = _block_means(a * a) - mu_a**2
+    var_b = _block_means(b * b) - mu_b**2
+    cov = _block_means(a * b) - mu_a * mu_b
+
+    c1 = (0.01 * PEAK) ** 2
+    c2 = (0.03 * PEAK) ** 2
+    index = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a**2 + mu_b**2 + c1) * (var_a + var_b + c2))
+    return index.mean(axis=(1, 2))
+
+
+class QualityReport:
+    """Per-frame PSNR and SSIM of every plane."""
+
+    def __init__(self, frames: int):
+        self.frames = frames
+        self.psnr = {plane: np.empty(frames) for plane in PLANES}
+        self.ssim = {plane: np.empty(frames) for plane in PLANES}
+
+    def stats(self, values: np.ndarray) -> dict:
+        if not len(values):
+            return {}
+        return {
+            "min": float(values.min()),
+            "mean": float(values.mean()),
+            "p1": float(np.percentile(values, 1)),
+            "p5": float(np.percentile(values, 5)),
+            "p50": float(np.percentile(values, 50)),
+        }
+
+    def summary(self) -> dict:
+        return {
+            plane: {"psnr": self.stats(self.psnr[plane]), "ssim": self.stats(self.ssim[plane])} for plane in PLANES
+        }
+
+
+def measure_quality(
+    src_url: str, out_url: str, width: int, height: int, file_format: str, batch_size: int = None
+) -> QualityReport:
+    """Compares frames of both files position by position, decoding batch_size frames at a time."""
+    size = calculate_yuv_frame_size(width, height, file_format)
+    if not os.path.getsize(src_url) or not os.path.getsize(out_url):
+        return QualityReport(0)
+    src = np.memmap(src_url, dtype=np.uint8, mode="r")
+    out = np.memmap(out_url, dtype=np.uint8, mode="r")
+    frames = min(len(src), len(out)) // size
+    src = src[: frames * size].reshape(frames, size)
+    out = out[: frames * size].reshape(frames, size)
+    if batch_size is None:
+        # two decoded copies plus float temporaries of the largest plane
+        batch_size = max(1, MEMORY_BUDGET // (width * height * 16))
+
+    report = QualityReport(frames)
+    for start in range(0, frames, batch_size):
+        end = min(start + batch_size, frames)
+        ref_planes = decode_frames(np.asarray(src[start:end]), width, height, file_format)
+        dist_planes = decode_frames(np.asarray(out[start:end]), width, height, file_format)
+        for plane, ref, dist in zip(PLANES, ref_planes, dist_planes):
+            report.psnr[plane][start:end] = psnr(ref, dist)
+            report.ssim[plane][start:end] = ssim(ref, dist)
+    return report
+
+
+def check_st22_quality(
+    src_url: str,
+    out_url: str,
+    width: int,
+    height: int,
+    file_format: str,
+    min_psnr: float = 40.0,
+    min_ssim: float = 0.95,
+    expected_frame_percentage: int = 80,
+) -> bool:
+    """Passes when the worst frame of every plane meets min_psnr and min_ssim."""
+    report = measure_quality(src_url, out_url, width, height, file_format)
+    summary = report.summary()
+    for plane, values in summary.items():
+        logging.debug(f"Quality of plane {plane}: PSNR {values['psnr']} SSIM {values['ssim']}")
+
+    src_frames = os.path.getsize(src_url) // calculate_yuv_frame_size(width, height, file_format)
+    if not src_frames:
+        logging.warning(f"Source {src_url} is shorter than one {width}x{height} {file_format} frame")
+        return False
+    if report.frames / src_frames * 100.00 < expected_frame_percentage:
+        logging.warning(
+            f"Received only {report.frames / src_frames * 100:.2f}% of the frames! "
+            f"Expected: {expected_frame_percentage:.2f}%"
+        )
+    if not report.frames:
+        return False
+
+    passed = True
+    for plane in PLANES:
+        worst_psnr = summary[plane]["psnr"]["min"]
+        worst_ssim = summary[plane]["ssim"]["min"]
+        if worst_psnr < min_psnr:
+            logging.debug(f"Plane {plane}: minimum PSNR {worst_psnr:.2f} dB below {min_psnr:.2f} dB")
+            passed = False
+        if worst_ssim < min_ssim:
+            logging.debug(f"Plane {plane}: minimum SSIM {worst_ssim:.4f} below {min_ssim:.4f}")
+            passed = False
+    return passed
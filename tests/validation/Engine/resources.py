@@ -0,0 +1,173 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Resource usage of the processes started by Engine.execute, sampled from /proc in a background thread.
+
+Every process the orchestrator supervises (media_proxy, mesh-agent, TxApp, RxApp, ...) is sampled at a
+fixed rate from /proc/<pid>/stat, status, io and sched. Samples are stored in arrays, one per metric, and
+summarized per process at the end of a test.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+
+from .orchestrator import get_orchestrator
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+# cumulative counters, summarized as the difference between the first and the last sample
+COUNTERS = ("cpu_s", "voluntary_ctxt_switches", "nonvoluntary_ctxt_switches", "read_bytes", "write_bytes",
+            "rchar", "wchar", "sched_runtime_s", "nr_migrations")
+# levels, summarized as mean and peak
+GAUGES = ("rss_kb", "threads")
+METRICS = COUNTERS + GAUGES
+
+
+def read_proc(pid: int) -> dict:
+    """Returns the metrics of a process; metrics of files that cannot be read (e.g. io of another user) are NaN."""
+    sample = dict.fromkeys(METRICS, math.nan)
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rpartition(")")[2].split()
+    sample["cpu_s"] = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+    sample["threads"] = int(fields[17])
+    for name, parse in (("status", _parse_status), ("io", _parse_io), ("sched", _parse_sched)):
+        try:
+            with open(f"/proc/{pid}/{name}") as f:
+                parse(f, sample)
+        except (PermissionError, FileNotFoundError):
+            pass
+    return sample
+
+
+def _parse_status(f, sample: dict) -> None:
+    for line in f:
+        key, _, value = line.partition(":")
+        if key == "VmRSS":
+            sample["rss_kb"] = int(value.split()[0])
+        elif key in ("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches"):
+            sample[key] = int(value)
+
+
+def _parse_io(f, sample: dict) -> None:
+    for line in f:
+        key, _, value = line.partition(":")
+        if key in ("read_bytes", "write_bytes", "rchar", "wchar"):
+            sample[key] = int(value)
+
+
+def _parse_sched(f, sample: dict) -> None:
+    for line in f:
+        key, _, value = line.partition(":")
+        key = key.strip()
+        if key == "se.sum_exec_runtime":
+            sample["sched_runtime_s"] = float(value) / 1e3  # ms
+        elif key == "se.nr_migrations":
+            sample["nr_migrations"] = int(value)
+
+
+class ProcessSeries:
+    """Samples of one process: a time array and an array per metric."""
+
+    def __init__(self, pid: int, command: str):
+        self.pid = pid
+        self.command = command
+        self.name = os.path.basename(command.split()[0]) if command.strip() else str(pid)
+        self.times = array("d")
+        self.values = {metric: array("d") for metric in METRICS}
+
+    def add(self, now: float, sample: dict) -> None:
+        self.times.append(now)
+        for metric in METRICS:
+            self.values[metric].append(sample[metric])
+
+    def summary(self) -> dict:
+        summary = {"pid": self.pid, "name": self.name, "samples": len(self.times)}
+        if not self.times:
+            return summary
+        seconds = self.times[-1] - self.times[0]
+        summary["seconds"] = round(seconds, 3)
+        for metric in COUNTERS:
+            values = self.values[metric]
+            summary[metric] = round(values[-1] - values[0], 6)
+        cpu = self.values["cpu_s"]
+        summary["cpu_mean_pct"] = round(100 * (cpu[-1] - cpu[0]) / seconds, 1) if seconds else 0.0
+        rates = [(b - a) / (t1 - t0) for a, b, t0, t1 in zip(cpu, cpu[1:], self.times, self.times[1:]) if t1 > t0]
+        summary["cpu_peak_pct"] = round(100 * max(rates, default=0.0), 1)
+        for metric in GAUGES:
+            values = [value for value in self.values[metric] if not math.isnan(value)]
+            summary[f"{metric}_mean"] = round(sum(values) / len(values), 1) if values else math.nan
+            summary[f"{metric}_peak"] = max(values, default=math.nan)
+        return summary
+
+    def to_dict(self) -> dict:
+        start = self.times[0] if self.times else 0.0
+        return {
+            "summary": self.summary(),
+            "command": self.command,
+            "t": [round(t - start, 4) for t in self.times],
+            **{metric: [None if math.isnan(v) else v for v in values] for metric, values in self.values.items()},
+        }
+
+
+class ResourceSampler:
+    """Samples every process running under the orchestrator, rate times a second, until stopped."""
+
+    def __init__(self, rate: float = 10):
+        self.interval = 1 / rate
+        self.series = {}  # pid: ProcessSeries
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.sample()  # last sample of processes still running
+
+    def _run(self) -> None:
+        next_sample = time.monotonic()
+        while not self.stopped.is_set():
+            self.sample()
+            next_sample += self.interval
+            self.stopped.wait(max(0.0, next_sample - time.monotonic()))
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        for mp in get_orchestrator().running():
+            pid = mp.process.pid
+            try:
+                sample = read_proc(pid)
+            except (FileNotFoundError, ProcessLookupError, IndexError):
+                continue  # ended since it was listed
+            if pid not in self.series:
+                self.series[pid] = ProcessSeries(pid, mp.command)
+            self.series[pid].add(now, sample)
+
+    def summaries(self) -> list:
+        return [series.summary() for series in self.series.values()]
+
+    def write(self, path: str) -> None:
+        """Writes summaries and time series of all sampled processes as JSON."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"interval": self.interval, "processes": [s.to_dict() for s in self.series.values()]}, f)
+        logging.debug(f"Resource samples of {len(self.series)} processes written to {path}")
+
+
+def format_summary(summary: dict) -> str:
+    if summary["samples"] < 2:
+        return f"{summary['name']} (PID {summary['pid']}): {summary['samples']} samples"
+    return (
+        f"{summary['name']} (PID {summary['pid']}): CPU {summary['cpu_s']:.2f}s, mean {summary['cpu_mean_pct']:.1f}%, "
+        f"peak {summary['cpu_peak_pct']:.1f}%; RSS peak {summary['rss_kb_peak'] / 1024:.1f} MiB; "
+        f"ctx switches {summary['voluntary_ctxt_switches']:.0f}/{summary['nonvoluntary_ctxt_switches']:.0f} "
+        f"(voluntary/involuntary); I/O read {summary['read_bytes'] / 1e6:.1f} MB, "
+        f"written {summary['write_bytes'] / 1e6:.1f} MB"
+    )
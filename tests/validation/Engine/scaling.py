@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Capacity of media_proxy: how many concurrent streams it carries at their full rate.
+
+A step runs N TX/RX pairs at once through one media_proxy, each on its own connection (URN or port leased
+by the workspace). TxApp sends from /dev/zero, paced at the fps of the payload, for a fixed time; the step
+holds when every stream received at least (1 - RATE_TOLERANCE) of that fps and lost at most LOSS_LIMIT of
+the frames sent. The number of streams is doubled until a step fails and the knee is then found by bisection.
+"""
+
+import logging
+import os
+import time
+from pathlib import Path
+
+import Engine.client_json
+import Engine.engine_mcm as utils
+import Engine.execute
+from Engine.benchmark import ProxyCpu
+from Engine.const import STARTUP_TIMEOUT
+
+STEP_SECONDS = 5  # seconds every step sends for
+RATE_TOLERANCE = 0.05  # shortfall of the received fps allowed against the target
+LOSS_LIMIT = 0.01  # share of sent frames a stream may lose
+
+
+class StreamResult:
+    """Frames one TxApp sent and its RxApp received, with the received rate."""
+
+    def __init__(self, sent: int, received: int, fps: float):
+        self.sent = sent
+        self.received = received
+        self.fps = fps
+
+    @property
+    def loss(self) -> float:
+        return max(self.sent - self.received, 0) / self.sent if self.sent else 1.0
+
+    def to_dict(self) -> dict:
+        return {"sent": self.sent, "received": self.received, "fps": round(self.fps, 3), "loss": round(self.loss, 6)}
+
+
+class ScalingStep:
+    """Streams run concurrently in one step, and the CPU time media_proxy spent on them."""
+
+    def __init__(self, target_fps: float, frame_size: int, streams: list, seconds: float, cpu_seconds: float):
+        self.target_fps = target_fps
+        self.frame_size = frame_size
+        self.streams = streams
+        self.seconds = seconds
+        self.cpu_seconds = cpu_seconds
+
+    @property
+    def gbps(self) -> float:
+        """Aggregate received payload rate."""
+        return sum(stream.fps for stream in self.streams) * self.frame_size * 8 / 1e9
+
+    @property
+    def proxy_cpu_pct(self) -> float:
+        return 100 * self.cpu_seconds / self.seconds if self.seconds else 0.0
+
+    def holds(self) -> bool:
+        return all(
+            stream.fps >= self.target_fps * (1 - RATE_TOLERANCE) and stream.loss <= LOSS_LIMIT
+            for stream in self.streams
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "streams": len(self.streams),
+            "holds": self.holds(),
+            "gbps": round(self.gbps, 6),
+            "min_fps": round(min(stream.fps for stream in self.streams), 3),
+            "max_loss": round(max(stream.loss for stream in self.streams), 6),
+            "proxy_cpu_pct": round(self.proxy_cpu_pct, 1),
+            "per_stream": [stream.to_dict() for stream in self.streams],
+        }
+
+
+class ScalingCase:
+    """Steps of one connection type and resolution; capacity is the most streams of a step that held."""
+
+    def __init__(self, name: str, parameters: dict):
+        self.name = name
+        self.parameters = parameters
+        self.steps = {}  # number of streams: ScalingStep
+        self.capacity = None
+
+    def add(self, step: ScalingStep) -> ScalingStep:
+        logging.info(
+            f"{self.name} with {len(step.streams)} streams: {step.gbps:.3f} Gbit/s, "
+            f"min {min(stream.fps for stream in step.streams):.2f} fps, "
+            f"max loss {100 * max(stream.loss for stream in step.streams):.2f}%, "
+            f"proxy CPU {step.proxy_cpu_pct:.0f}% - {'holds' if step.holds() else 'saturated'}"
+        )
+        self.steps[len(step.streams)] = step
+        return step
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "parameters": self.parameters,
+            "capacity": self.capacity,
+            "steps": [self.steps[streams].to_dict() for streams in sorted(self.steps)],
+        }
+
+
+def find_knee(holds, limit: int) -> int:
+    """Returns the largest n <= limit for which holds(n) is True, assuming it is monotonic; 0 when holds(1) fails.
+
+    n is doubled from 1 until a step fails or limit is reached, then the failing range is bisected.
+    """
+    good, bad, n = 0, None, 1
+    while True:
+        if not holds(n):
+            bad = n
+            break
+        good = n
+        if n >= limit:
+            return good
+        n = min(2 * n, limit)
+    while bad - good > 1:
+        middle = (good + bad) // 2
+        if holds(middle):
+            good = middle
+        else:
+            bad = middle
+    return good
+
+
+class StreamConfigs:
+    """client.json and connection.json of every stream, each in its own directory of the test's workspace.
+
+    connection() returns a new ConnectionJson with the default URN or port, which the workspace replaces
+    with one of its own, so streams never share a multipoint group or an ST 2110 port.
+    """
+
+    def __init__(self, build: str, connection):
+        self.build = build
+        self.connection = connection
+        self.dirs = []
+
+    def get(self, count: int) -> list:
+        while len(self.dirs) < count:
+            path = Path(utils.config_dir(self.build), f"stream{len(self.dirs)}")
+            path.mkdir(parents=True, exist_ok=True)
+            utils.create_client_json(self.build, Engine.client_json.ClientJson(), output_dir=path)
+            utils.create_connection_json(self.build, self.connection(), output_dir=path)
+            self.dirs.append(path.resolve())
+        return self.dirs[:count]
+
+
+def run_streams(build: str, dirs: list, fps: float, frame_size: int, proxy_pid: int) -> ScalingStep:
+    """Runs a TX/RX pair per config directory concurrently for STEP_SECONDS and measures every stream."""
+    app_path = Path(build, "tests", "tools", "TestApp", "build")
+    receivers = []
+    senders = []
+    try:
+        for path in dirs:
+            rx = utils.run_rx_app(path / "client.json", path / "connection.json", os.devnull, app_path)
+            receivers.append(rx)
+        for rx in receivers:
+            Engine.execute.wait_for_output(rx, utils.RX_READY, timeout=STARTUP_TIMEOUT)
+        for path in dirs:
+            tx = Engine.execute.call(
+                f"./TxApp {utils.tx_options(rate=fps)}{path / 'client.json'} {path / 'connection.json'} /dev/zero",
+                cwd=app_path,
+                timeout=STEP_SECONDS + STARTUP_TIMEOUT + utils.COMPLETION_MARGIN,
+            )
+            senders.append(tx)
+        for tx in senders:
+            Engine.execute.wait_for_progress(tx, "tx_frame", 1, STARTUP_TIMEOUT)
+        cpu = ProxyCpu(proxy_pid)
+        cpu.start()
+        start = time.monotonic()
+        time.sleep(STEP_SECONDS)
+        seconds = time.monotonic() - start
+        cpu_seconds = cpu.stop()
+    finally:
+        for tx in senders:
+            Engine.execute.killproc(tx.process)
+        for rx in receivers:
+            Engine.execute.wait_for_exit(rx, timeout=utils.RX_DRAIN_TIMEOUT)  # RxApp exits 1 s after the last frame
+            utils.stop_rx_app(rx)
+        Engine.execute.waitall(senders + receivers)
+
+    streams = []
+    for tx, rx in zip(senders, receivers):
+        received = rx.log.counters[utils.RX_FRAME]
+        streams.append(StreamResult(tx.log.counters["tx_frame"].value, received.value, received.rate()))
+    return ScalingStep(fps, frame_size, streams, seconds, cpu_seconds)
@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Takes disk reads of source media off the measured path.
+
+Source files are either copied into a RAM-backed directory (tmpfs) or read once to prewarm the page cache
+before TxApp starts; the RX output of staged runs is written to the RAM-backed directory as well. Parallel
+workers use separate subdirectories.
+"""
+
+import logging
+import os
+import shutil
+import time
+from collections import OrderedDict
+
+STAGE_MODES = ("none", "prewarm", "tmpfs")
+TMPFS_DIR = "/dev/shm"
+PREWARM_CHUNK = 16 * 1024 * 1024
+FREE_RESERVE = 0.2  # part of the RAM-backed file system left free for RX output
+
+# staged copy: original path, so digests of the original can be reused for the copy
+staged_sources = {}
+
+
+def original_path(file_url: str) -> str:
+    return staged_sources.get(file_url, file_url)
+
+
+def prewarm(file_url: str) -> int:
+    """Reads a file through the page cache; returns bytes read."""
+    buffer = bytearray(PREWARM_CHUNK)
+    total = 0
+    with open(file_url, "rb", buffering=0) as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while read := f.readinto(buffer):
+            total += read
+    return total
+
+
+class MediaStage:
+    """Stages source files for a session; every file is staged once and kept until it has to make room."""
+
+    def __init__(self, mode: str = "none", directory: str = TMPFS_DIR):
+        if mode not in STAGE_MODES:
+            raise RuntimeError(f"Wrong stage mode {mode}, expected one of {STAGE_MODES}")
+        self.mode = mode
+        # every pytest-xdist worker stages into and cleans up its own directory
+        self.root = os.path.join(directory, "mcm-validation", os.environ.get("PYTEST_XDIST_WORKER", "main"))
+        self.staged = OrderedDict()  # original path: staged path, least recently used first
+        self.prewarmed = set()
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        if mode == "tmpfs":
+            os.makedirs(self.output_dir, exist_ok=True)
+
+    @property
+    def output_dir(self) -> str:
+        """Directory for RX output, None to keep it next to the TestApp binaries."""
+        return os.path.join(self.root, "output") if self.mode == "tmpfs" else None
+
+    def source(self, file_url: str) -> str:
+        """Stages a source file; returns the path TxApp should read it from."""
+        if self.mode == "none":
+            return file_url
+        if self.mode == "tmpfs" and file_url in self.staged:
+            self.staged.move_to_end(file_url)
+            return self.staged[file_url]
+        if self.mode == "tmpfs" and self._make_room(os.path.getsize(file_url)):
+            return self._copy(file_url)
+        if file_url not in self.prewarmed:
+            self._prewarm(file_url)
+        return file_url
+
+    def _free_bytes(self) -> int:
+        stat = os.statvfs(self.root)
+        return stat.f_bavail * stat.f_frsize - int(stat.f_blocks * stat.f_frsize * FREE_RESERVE)
+
+    def _make_room(self, size: int) -> bool:
+        while self._free_bytes() < size and self.staged:
+            _, staged_url = self.staged.popitem(last=False)
+            self._remove(staged_url)
+        if self._free_bytes() < size:
+            logging.debug(f"{self.root} has no room for {size} bytes, prewarming the page cache instead")
+            return False
+        return True
+
+    def _copy(self, file_url: str) -> str:
+        staged_url = os.path.join(self.root, os.path.basename(file_url))
+        start = time.monotonic()
+        # copy2 keeps the modification time, so cached digests of the original stay valid for the copy
+        shutil.copy2(file_url, staged_url)
+        self._account("Staged", file_url, os.path.getsize(staged_url), time.monotonic() - start)
+        self.staged[file_url] = staged_url
+        staged_sources[staged_url] = file_url
+        return staged_url
+
+    def _prewarm(self, file_url: str) -> None:
+        start = time.monotonic()
+        size = prewarm(file_url)
+        self._account("Prewarmed", file_url, size, time.monotonic() - start)
+        self.prewarmed.add(file_url)
+
+    def _account(self, action: str, file_url: str, size: int, seconds: float) -> None:
+        self.files += 1
+        self.bytes += size
+        self.seconds += seconds
+        logging.debug(f"{action} {file_url}: {size / 1e6:.1f} MB in {seconds:.2f}s ({size / 1e9 / max(seconds, 1e-9):.2f} GB/s)")
+
+    def _remove(self, staged_url: str) -> None:
+        staged_sources.pop(staged_url, None)
+        try:
+            os.remove(staged_url)
+        except FileNotFoundError:
+            pass
+
+    def summary(self) -> str:
+        return (
+            f"{self.mode}: {self.bytes / 1e9:.2f} GB of source media in {self.files} files "
+            f"taken off the measured path in {self.seconds:.2f}s"
+        )
+
+    def cleanup(self) -> None:
+        for staged_url in self.staged.values():
+            self._remove(staged_url)
+        self.staged.clear()
+        if self.mode == "tmpfs":
+            shutil.rmtree(self.root, ignore_errors=True)
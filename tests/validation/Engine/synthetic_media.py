@@ -0,0 +1,231 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Self-describing synthetic video generated on the fly, for tests that do not need the media library.
+
+Every frame starts with a header holding a sequence number, a TX timestamp slot and the CRC32 of the rest
+of the frame, so RX verifies each frame on its own, without a source file or source digests.
+"""
+
+import logging
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from Engine.integrity import StreamingIntegrityChecker, calculate_yuv_frame_size
+
+MAGIC = b"MCMS"
+VERSION = 1
+# magic, version, sequence number, TX timestamp in ns (0 until stamped by TX), CRC32 of the payload, payload length
+HEADER = struct.Struct("<4sIQQII")
+PATTERNS = ("ramp", "bars")
+RAMP_STEP = 16  # pixels the ramp moves per frame
+PHASE_MEMORY = 256 * 1024 * 1024  # bytes of encoded frames cached per generator
+
+# 75% color bars, 10-bit BT.709 Y, Cb, Cr: white, yellow, cyan, green, magenta, red, blue, black
+COLOR_BARS = np.array(
+    [
+        [721, 512, 512],
+        [674, 176, 543],
+        [581, 589, 176],
+        [534, 253, 207],
+        [251, 771, 817],
+        [204, 435, 848],
+        [111, 848, 481],
+        [64, 512, 512],
+    ],
+    dtype=np.uint16,
+)
+
+
+def encode_frame(y: np.ndarray, u: np.ndarray, v: np.ndarray, file_format: str) -> bytes:
+    """Encodes 10-bit Y (height, width), U and V (height, width / 2) planes; the inverse of quality.decode_frames."""
+    match file_format:
+        case "YUV422PLANAR10LE" | "yuv422p10le":
+            return b"".join(plane.astype("<u2").tobytes() for plane in (y, u, v))
+        case "YUV422RFC4175PG2BE10" | "yuv422p10rfc4175":
+            # 5-byte pixel group: Cb Y0 Cr Y1, 10 bits each, big endian
+            y0, y1 = y[:, 0::2], y[:, 1::2]
+            pg = np.empty(u.shape + (5,), dtype=np.uint8)
+            pg[..., 0] = u >> 2
+            pg[..., 1] = ((u & 0x03) << 6) | (y0 >> 4)
+            pg[..., 2] = ((y0 & 0x0F) << 4) | (v >> 6)
+            pg[..., 3] = ((v & 0x3F) << 2) | (y1 >> 8)
+            pg[..., 4] = y1 & 0xFF
+            return pg.tobytes()
+    raise ValueError(f"Encoding of {file_format} is not supported")
+
+
+class SyntheticVideo:
+    """Generates frames of a moving pattern in any catalog resolution and pixel format.
+
+    The pattern repeats after a few phases, so encoded phases and their CRCs are cached and a frame
+    costs a header and a copy once the cache is warm.
+    """
+
+    def __init__(self, width: int, height: int, file_format: str, pattern: str = "ramp"):
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern {pattern}, expected one of {PATTERNS}")
+        self.width = width
+        self.height = height
+        self.file_format = file_format
+        self.pattern = pattern
+        self.frame_size = calculate_yuv_frame_size(width, height, file_format)
+        if self.frame_size <= HEADER.size:
+            raise ValueError(f"Frame of {width}x{height} is too small for a {HEADER.size}-byte header")
+        # phases of a full pattern period, as many as fit in memory
+        self.phases = max(1, min(width // RAMP_STEP, PHASE_MEMORY // self.frame_size))
+        self._cache = {}
+
+    def planes(self, phase: int) -> tuple:
+        """Returns 10-bit Y, U, V planes of the pattern shifted by phase steps."""
+        shift = phase * RAMP_STEP
+        x = (np.arange(self.width) + shift) % self.width
+        x_chroma = x[::2]
+        if self.pattern == "ramp":
+            luma = (64 + x * (940 - 64) // self.width).astype(np.uint16)
+            rows = (64 + np.arange(self.height)[:, None] * (960 - 64) // self.height).astype(np.uint16)
+            y = np.broadcast_to(luma, (self.height, self.width))
+            u = np.broadcast_to(rows, (self.height, self.width // 2))
+            v = np.broadcast_to(luma[x_chroma], (self.height, self.width // 2))
+        else:
+            bars = COLOR_BARS[x * len(COLOR_BARS) // self.width]
+            y = np.broadcast_to(bars[:, 0], (self.height, self.width))
+            u = np.broadcast_to(bars[::2, 1], (self.height, self.width // 2))
+            v = np.broadcast_to(bars[::2, 2], (self.height, self.width // 2))
+        return y, u, v
+
+    def _phase(self, phase: int) -> tuple:
+        if phase not in self._cache:
+            payload = encode_frame(*self.planes(phase), self.file_format)[HEADER.size :]
+            self._cache[phase] = (payload, zlib.crc32(payload))
+        return self._cache[phase]
+
+    def frame(self, sequence: int) -> bytes:
+        payload, crc = self._phase(sequence % self.phases)
+        return HEADER.pack(MAGIC, VERSION, sequence, 0, crc, len(payload)) + payload
+
+    def frames(self, count: int, start: int = 0):
+        for sequence in range(start, start + count):
+            yield self.frame(sequence)
+
+    def write(self, path: str, count: int) -> int:
+        """Writes count frames to a file or a named pipe; returns the number of frames written."""
+        written = 0
+        try:
+            with open(path, "wb") as out:
+                for frame in self.frames(count):
+                    out.write(frame)
+                    written += 1
+        except BrokenPipeError:
+            logging.debug(f"Reader of {path} went away after {written} frames")
+        return written
+
+
+def parse_frame(frame: bytes) -> tuple:
+    """Returns (sequence, TX timestamp, valid) of a received frame; sequence is None without a valid header."""
+    if len(frame) < HEADER.size:
+        return None, 0, False
+    magic, version, sequence, timestamp, crc, length = HEADER.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        return None, 0, False
+    valid = length == len(frame) - HEADER.size and zlib.crc32(memoryview(frame)[HEADER.size :]) == crc
+    return sequence, timestamp, valid
+
+
+class SyntheticFrameReport:
+    """Received sequence numbers; frames are referenced by their index in the output."""
+
+    def __init__(self, expected_frames: int = None):
+        self.expected_frames = expected_frames
+        self.sequences = []  # sequence number of every received frame, None when the header is damaged
+        self.corrupted = []
+
+    def add(self, frame: bytes) -> bool:
+        sequence, _, valid = parse_frame(frame)
+        if not valid:
+            self.corrupted.append(len(self.sequences))
+        self.sequences.append(sequence)
+        return valid
+
+    @property
+    def received(self) -> int:
+        return len(self.sequences)
+
+    def summary(self) -> dict:
+        corrupted = set(self.corrupted)
+        sequences = [s for i, s in enumerate(self.sequences) if s is not None and i not in corrupted]
+        unique = set(sequences)
+        expected = self.expected_frames if self.expected_frames is not None else max(unique, default=-1) + 1
+        return {
+            "received": self.received,
+            "valid": len(unique),
+            "corrupted": len(self.corrupted),
+            "duplicated": len(sequences) - len(unique),
+            "dropped": len(set(range(expected)) - unique),
+            "reordered": sum(1 for a, b in zip(sequences, sequences[1:]) if b < a),
+        }
+
+
+class SyntheticFrameChecker(StreamingIntegrityChecker):
+    """Verifies synthetic frames read from a named pipe by their headers, in constant time per frame."""
+
+    def __init__(self, fifo_path: str, frame_size: int, expected_frames: int = None, fail_fast: bool = True):
+        super().__init__(None, fifo_path, frame_size, fail_fast)
+        self.report = SyntheticFrameReport(expected_frames)
+
+    def start(self) -> None:
+        self._start_reader()  # nothing to load, frames carry their own checksums
+
+    @property
+    def received_frames(self) -> int:
+        return self.report.received
+
+    def _consume(self) -> None:
+        with open(self.fifo_path, "rb") as out:
+            while chunk := out.read(self.frame_size):
+                if not self.report.add(chunk):
+                    logging.debug(f"Received frame {self.received_frames} is invalid")
+                    if self.invalid_frame is None:
+                        self.invalid_frame = self.received_frames
+                    if self.fail_fast:
+                        return
+
+    def verify(self, expected_frame_percentage: int = 80) -> bool:
+        return check_synthetic_report(self.report, expected_frame_percentage)
+
+
+def check_synthetic_report(report: SyntheticFrameReport, expected_frame_percentage: int = 80) -> bool:
+    summary = report.summary()
+    logging.debug(f"Synthetic frames: {summary}")
+    if summary["dropped"] or summary["duplicated"] or summary["reordered"]:
+        logging.warning(f"Transport loss detected: {summary}")
+    expected = report.expected_frames or summary["valid"] + summary["dropped"]
+    if not expected or summary["valid"] / expected * 100.00 < expected_frame_percentage:
+        logging.warning(f"Received only {summary['valid']} of {expected} frames! Expected: {expected_frame_percentage:.2f}%")
+    return not report.corrupted
+
+
+def check_synthetic_integrity(
+    out_url: str, frame_size: int, expected_frames: int = None, expected_frame_percentage: int = 80
+) -> bool:
+    """Verifies a received file of synthetic frames without any source file."""
+    report = SyntheticFrameReport(expected_frames)
+    with open(out_url, "rb") as out:
+        while chunk := out.read(frame_size):
+            report.add(chunk)
+    for i in report.corrupted:
+        logging.debug(f"Received frame {i + 1} is invalid")
+    return check_synthetic_report(report, expected_frame_percentage)
+
+
+def unblock_writer(path: str) -> None:
+    """Opens a named pipe for reading and closes it at once, so a writer waiting for a reader fails."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        os.close(fd)
+    except OSError:
+        pass
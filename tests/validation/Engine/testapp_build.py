@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Incremental build of TxApp and RxApp.
+
+The TestApp sources, its CMakeLists.txt, the SDK headers and the libmcm_dp it links against are hashed; when
+the digest matches the one stored by the last successful build, the build is skipped. Otherwise the existing
+CMake tree is reused with a parallel make, through ccache when it is installed. Builds of parallel workers
+are serialized by a lock on the build directory.
+"""
+
+import fcntl
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import time
+
+BUILD_TIMEOUT = 600  # seconds for configuring or building
+DIGEST_FILE = ".inputs.sha256"
+LOCK_FILE = ".build.lock"
+LIBRARY_DIRS = ("/usr/local/lib", "/usr/local/lib64", "/usr/lib", "/usr/lib64", "/usr/lib/x86_64-linux-gnu")
+ERROR_LINES = 30  # lines of build output in the error
+READ_SIZE = 1024 * 1024
+
+
+def find_library(name: str = "libmcm_dp.so") -> str:
+    """Returns the real path of the library the linker would find, None when it is not installed."""
+    dirs = []
+    for variable in ("LIBRARY_PATH", "LD_LIBRARY_PATH"):
+        dirs.extend(d for d in os.environ.get(variable, "").split(":") if d)
+    for directory in dirs + list(LIBRARY_DIRS):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return os.path.realpath(path)
+    try:
+        listing = subprocess.run(["ldconfig", "-p"], capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in listing.splitlines():
+        if line.strip().startswith(name + " "):
+            return os.path.realpath(line.rpartition("=> ")[2].strip())
+    return None
+
+
+def build_inputs(build: str) -> list:
+    """Returns the files TxApp and RxApp are built from, in a stable order."""
+    source = os.path.join(build, "tests", "tools", "TestApp")
+    inputs = [os.path.join(source, "CMakeLists.txt")]
+    for pattern in ("*.c", "src/*.c", "Inc/*.h"):
+        inputs.extend(sorted(glob.glob(os.path.join(source, pattern))))
+    inputs.extend(sorted(glob.glob(os.path.join(build, "sdk", "include", "*.h"))))
+    library = find_library()
+    if library is None:
+        logging.warning("libmcm_dp.so not found, TestApp will not be rebuilt when it changes")
+    else:
+        inputs.append(library)
+    return inputs
+
+
+def inputs_digest(paths: list, recipe: str) -> str:
+    """SHA-256 over the names and contents of the files and the build recipe."""
+    digest = hashlib.sha256(recipe.encode())
+    for path in paths:
+        digest.update(path.encode() + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(READ_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _run(command: list, cwd: str) -> None:
+    logging.debug(f"Running {' '.join(command)} in {cwd}")
+    try:
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"{' '.join(command)} did not finish in {BUILD_TIMEOUT}s")
+    output = (result.stdout + result.stderr).splitlines()
+    for line in output:
+        logging.debug(line)
+    if result.returncode:
+        tail = "\n".join(output[-ERROR_LINES:])
+        raise RuntimeError(f"{' '.join(command)} failed with RC {result.returncode}:\n{tail}")
+
+
+def _foreign_cache(path: str) -> bool:
+    """Whether CMakeCache.txt in the build directory was configured for another source directory (a copied tree)."""
+    try:
+        with open(os.path.join(path, "CMakeCache.txt")) as f:
+            for line in f:
+                if line.startswith("CMAKE_HOME_DIRECTORY:INTERNAL="):
+                    home = line.partition("=")[2].strip()
+                    return os.path.realpath(home) != os.path.realpath(os.path.dirname(path))
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def build_testapp(build: str, force: bool = False) -> bool:
+    """Builds TxApp and RxApp when their inputs changed; returns whether a build ran, raises RuntimeError on failure."""
+    path = os.path.join(build, "tests", "tools", "TestApp", "build")
+    os.makedirs(path, exist_ok=True)
+    launcher = shutil.which("ccache")
+    configure = ["cmake", "..", f"-DCMAKE_C_COMPILER_LAUNCHER={launcher or ''}"]
+    with open(os.path.join(path, LOCK_FILE), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # another worker may be building
+        start = time.monotonic()
+        digest = inputs_digest(build_inputs(build), " ".join(configure))
+        digest_path = os.path.join(path, DIGEST_FILE)
+        try:
+            with open(digest_path) as f:
+                built = f.read().strip()
+        except FileNotFoundError:
+            built = None
+        binaries = all(os.path.exists(os.path.join(path, app)) for app in ("TxApp", "RxApp"))
+        if built == digest and binaries and not force:
+            logging.debug(f"TestApp is up to date, checked in {time.monotonic() - start:.3f}s")
+            return False
+
+        if os.path.exists(digest_path):
+            os.unlink(digest_path)  # a failed build must not look up to date
+        if _foreign_cache(path):
+            logging.debug(f"CMake tree in {path} belongs to other sources, starting over")
+            shutil.rmtree(os.path.join(path, "CMakeFiles"), ignore_errors=True)
+            os.unlink(os.path.join(path, "CMakeCache.txt"))
+        _run(configure, path)  # reuses CMakeCache.txt, so only the changed files are rebuilt
+        _run(["make", f"-j{os.cpu_count() or 1}"], path)
+        with open(digest_path, "w") as f:
+            f.write(digest + "\n")
+        logging.info(f"TestApp built in {time.monotonic() - start:.1f}s{' with ccache' if launcher else ''}")
+        return True
@@ -0,0 +1,301 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Offset-tolerant integrity of variable-sized ancillary (ST 2110-40) and ST 2110-41 text payloads.
+
+Fixed-size chunk hashing does not fit variable-sized messages, so received data is located in the source
+with a Rabin-Karp rolling hash instead. Partial messages, repeats and gaps are reported separately.
+"""
+
+import logging
+
+import numpy as np
+
+from Engine.frame_diff import to_ranges
+
+BLOCK = 16  # bytes per hashed block, received runs of at least 2 * BLOCK - 1 bytes are found by hash
+BASE = np.uint64(0x100000001B3)  # odd, so it is invertible modulo 2**64
+EXTEND_CHUNK = 4096  # bytes compared at a time, and the most over which candidate runs are compared
+VERIFY_CANDIDATES = 64  # source blocks with the hash of a received block verified, nearest first
+MIN_RUN = 4  # shortest run searched byte-wise in received data left between hashed runs
+SEARCH_LIMIT = 1024  # unmatched bytes searched in the whole source before the rest is reported without searching
+
+
+def window_hashes(data: np.ndarray, k: int) -> np.ndarray:
+    """Returns polynomial hashes modulo 2**64 of every k-byte window, computed from prefix sums in O(n)."""
+    n = len(data)
+    if n < k:
+        return np.empty(0, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        powers = np.cumprod(np.full(n, BASE, dtype=np.uint64))  # BASE**(i+1), wrapping modulo 2**64
+        inverse = np.uint64(pow(int(BASE), -1, 1 << 64))
+        inverse_powers = np.cumprod(np.full(n, inverse, dtype=np.uint64))
+        prefix = np.concatenate(([np.uint64(0)], np.cumsum(data.astype(np.uint64) * powers, dtype=np.uint64)))
+        # (prefix[i + k] - prefix[i]) / BASE**(i+1), i.e. the window hash independent of its position
+        return (prefix[k:] - prefix[:-k]) * inverse_powers[: n - k + 1]
+
+
+def _extend_forward(src: np.ndarray, out: np.ndarray, s: int, o: int, end: int = None) -> int:
+    """Returns the length of the common run of src[s:] and out[o:end]."""
+    end = len(out) if end is None else end
+    length = 0
+    while s + length < len(src) and o + length < end:
+        chunk = min(EXTEND_CHUNK, len(src) - s - length, end - o - length)
+        differ = np.flatnonzero(src[s + length : s + length + chunk] != out[o + length : o + length + chunk])
+        if len(differ):
+            return length + int(differ[0])
+        length += chunk
+    return length
+
+
+def _extend_backward(src: np.ndarray, out: np.ndarray, s: int, o: int, limit: int) -> int:
+    """Returns the length of the common run ending right before src[s] and out[o], up to limit bytes."""
+    length = min(limit, s, o)
+    if not length:
+        return 0
+    differ = np.flatnonzero(src[s - length : s][::-1] != out[o - length : o][::-1])
+    return int(differ[0]) if len(differ) else length
+
+
+class TextMatchReport:
+    """Placement of received data in the source; ranges are (first, end) byte offsets."""
+
+    def __init__(self, src_bytes: int, out_bytes: int):
+        self.src_bytes = src_bytes
+        self.out_bytes = out_bytes
+        self.segments = []  # (out first, out end, src first) of every run found in the source
+        self.unmatched = []  # received ranges not found in the source
+        self.gaps = []  # source ranges never received
+        self.repeats = []  # source ranges received more than once
+        self.reordered = 0  # segments starting before the end of the preceding one in the source
+
+    @property
+    def matched(self) -> int:
+        return sum(end - first for first, end, _ in self.segments)
+
+    def summary(self) -> str:
+        return (
+            f"matched {self.matched}/{self.out_bytes} received bytes in {len(self.segments)} segments, "
+            f"unmatched {sum(e - f for f, e in self.unmatched)} bytes in {len(self.unmatched)} ranges, "
+            f"gaps {sum(e - f for f, e in self.gaps)} bytes in {len(self.gaps)} ranges, "
+            f"repeats {sum(e - f for f, e in self.repeats)} bytes in {len(self.repeats)} ranges, "
+            f"reordered segments {self.reordered}"
+        )
+
+
+def _hashed_runs(src: np.ndarray, out: np.ndarray, block: int) -> list:
+    """Returns the runs found through hashes of source blocks, as (out first, out end, src first).
+
+    A hit first tries the source offset continuing the previous run, as after corrupted bytes; otherwise up to
+    VERIFY_CANDIDATES source blocks with the same hash are tried, nearest to the continuation first, and the one
+    covering the most received bytes wins, a later source offset (a gap rather than a repeat) on a tie. The hits
+    within block bytes of the first one compete the same way. Runs are compared over at most EXTEND_CHUNK bytes
+    in each direction and only the winner is extended further, so repetitive data is matched in linear time.
+    """
+    src_hashes = window_hashes(src, block)[::block]
+    if not len(src_hashes):
+        return []
+    order = np.argsort(src_hashes, kind="stable")  # source blocks of equal hash stay in ascending order
+    sorted_hashes = src_hashes[order]
+    out_hashes = window_hashes(out, block)
+    slots = np.searchsorted(sorted_hashes, out_hashes)
+    hits = np.flatnonzero(sorted_hashes[np.minimum(slots, len(sorted_hashes) - 1)] == out_hashes)
+
+    def candidates(o: int, expected: int):
+        """Source offsets of the blocks with the hash of out[o:o + block], nearest to expected first."""
+        same_hash = order[slots[o] : np.searchsorted(sorted_hashes, out_hashes[o], side="right")]
+        offsets = same_hash.astype(np.int64) * block
+        right = int(np.searchsorted(offsets, expected))
+        left = right - 1
+        for _ in range(min(VERIFY_CANDIDATES, len(offsets))):
+            if right < len(offsets) and (left < 0 or offsets[right] - expected <= expected - offsets[left]):
+                yield int(offsets[right])
+                right += 1
+            else:
+                yield int(offsets[left])
+                left -= 1
+
+    def best_run(o: int, pos: int, next_src: int, forward_end: int) -> tuple:
+        """(src first, bytes before o, bytes from o) of the run through the hit at o covering the most, None if none.
+
+        The run is followed back at most EXTEND_CHUNK bytes and forward up to forward_end.
+        """
+        back_limit = min(o - pos, EXTEND_CHUNK)
+        expected = o if next_src is None else next_src + (o - pos)
+        if next_src is not None and expected < len(src):
+            forward = _extend_forward(src, out, expected, o, forward_end)
+            if forward >= block:
+                return expected, _extend_backward(src, out, expected, o, back_limit), forward
+        best = None
+        for s in candidates(o, expected):
+            forward = _extend_forward(src, out, s, o, forward_end)
+            if forward < block:
+                continue  # hash collision
+            back = _extend_backward(src, out, s, o, back_limit)
+            if best is None or (back + forward, s >= expected) > (best[1] + best[2], best[0] >= expected):
+                best = s, back, forward
+            if s >= expected and back == back_limit and o + forward == forward_end:
+                break  # nothing covers more
+        return best
+
+    runs = []
+    pos = 0  # received bytes before pos are already accounted for
+    next_src = None  # source offset continuing the last run
+    i = 0
+    while i < len(hits):
+        o = int(hits[i])
+        forward_end = min(len(out), o + EXTEND_CHUNK)  # the same for all competing hits, so they compare fairly
+        # a run of the source found here may be a chance match of some block, while the true run only has its
+        # first aligned source block up to block bytes further, so the hits up to there compete
+        best = None
+        for hit in hits[i : np.searchsorted(hits, o + block)].tolist():
+            run = best_run(hit, pos, next_src, forward_end)
+            if run is not None and (best is None or run[1] + run[2] > best[2] + best[3]):
+                best = (hit,) + run
+        if best is None:
+            i += 1
+            continue
+        hit, s, back, forward = best
+        if back == EXTEND_CHUNK:
+            back = _extend_backward(src, out, s, hit, hit - pos)
+        if hit + forward == forward_end:
+            forward = _extend_forward(src, out, s, hit)
+        runs.append((hit - back, hit + forward, s - back))
+        pos = hit + forward
+        next_src = s + forward
+        i = int(np.searchsorted(hits, pos))
+    return runs
+
+
+def _search_run(src: bytes, out: bytes, o: int, end: int, start: int) -> tuple:
+    """Returns (src first, length) of the longest prefix of out[o:end] of at least MIN_RUN bytes found in src,
+    preferring an occurrence from start on, None when there is none.
+    """
+
+    def find(length: int) -> int:
+        needle = out[o : o + length]
+        s = src.find(needle, start)
+        return src.find(needle) if s < 0 else s
+
+    found = find(MIN_RUN) if end - o >= MIN_RUN else -1
+    if found < 0:
+        return None
+    good, bad = MIN_RUN, None
+    while bad is None and good < end - o:  # galloping, then bisection of the prefix length
+        length = min(2 * good, end - o)
+        s = find(length)
+        if s < 0:
+            bad = length
+        else:
+            good, found = length, s
+    while bad is not None and bad - good > 1:
+        middle = (good + bad) // 2
+        s = find(middle)
+        if s < 0:
+            bad = middle
+        else:
+            good, found = middle, s
+    return found, good
+
+
+def _fill(src: np.ndarray, out: np.ndarray, runs: list) -> list:
+    """Matches the received bytes left between runs byte-wise, for messages too short to be found by hash.
+
+    At every offset the continuation of the preceding run is tried first, then the longest run of at least
+    MIN_RUN bytes anywhere in the source, so single corrupted bytes are not explained away by chance matches.
+    """
+    src_bytes, out_bytes = src.tobytes(), out.tobytes()
+    filled = []
+    searched = 0
+    pos, next_src = 0, None
+    for first, end, s in runs + [(len(out), len(out), None)]:
+        o = pos
+        while o < first:
+            expected = None if next_src is None else next_src + (o - pos)
+            length = _extend_forward(src, out, expected, o, first) if expected is not None else 0
+            if length:
+                filled.append((o, o + length, expected))
+                o = pos = o + length
+                next_src = expected + length
+                continue
+            found = _search_run(src_bytes, out_bytes, o, first, next_src or 0) if searched < SEARCH_LIMIT else None
+            if found is None:
+                searched += 1
+                o += 1
+                continue
+            found_src, length = found
+            filled.append((o, o + length, found_src))
+            o = pos = o + length
+            next_src = found_src + length
+        if s is not None:
+            filled.append((first, end, s))
+            pos, next_src = end, s + (end - first)
+    return filled
+
+
+def match_text(src: bytes, out: bytes, block: int = BLOCK) -> TextMatchReport:
+    """Locates received bytes in the source.
+
+    Source blocks at multiples of block are indexed by hash and the received data is scanned with the
+    rolling hash at every offset. Each hit is verified and then extended byte-wise in both directions;
+    received data left between the runs found is then matched byte-wise.
+    """
+    src = np.frombuffer(src, dtype=np.uint8)
+    out = np.frombuffer(out, dtype=np.uint8)
+    report = TextMatchReport(len(src), len(out))
+    report.segments = _fill(src, out, _hashed_runs(src, out, block))
+
+    pos = 0
+    for i, (first, end, s) in enumerate(report.segments):
+        if first > pos:
+            report.unmatched.append((pos, first))
+        if i and s < report.segments[i - 1][2] + report.segments[i - 1][1] - report.segments[i - 1][0]:
+            report.reordered += 1
+        pos = end
+    if pos < len(out):
+        report.unmatched.append((pos, len(out)))
+
+    coverage = np.zeros(len(src) + 1, dtype=np.int32)
+    for first, end, s in report.segments:
+        coverage[s] += 1
+        coverage[s + end - first] -= 1
+    coverage = np.cumsum(coverage[:-1])
+    report.gaps = [(first, last + 1) for first, last in to_ranges(np.flatnonzero(coverage == 0))]
+    report.repeats = [(first, last + 1) for first, last in to_ranges(np.flatnonzero(coverage > 1))]
+    return report
+
+
+def write_messages(path: str, count: int, min_size: int, max_size: int, seed: int = 0) -> int:
+    """Writes count newline-terminated text messages of min_size to max_size bytes, each starting with its
+    sequence number, like a stream of ST 2110-41 data items; returns the bytes written."""
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ", dtype=np.uint8)
+    written = 0
+    with open(path, "wb") as f:
+        for sequence in range(count):
+            header = f"{sequence}:".encode()
+            size = max(int(rng.integers(min_size, max_size + 1)), len(header) + 1)
+            message = header + rng.choice(alphabet, size - len(header) - 1).tobytes() + b"\n"
+            f.write(message)
+            written += len(message)
+    return written
+
+
+def check_text_integrity(src_url: str, out_url: str, block: int = BLOCK, expected_percentage: int = 80) -> bool:
+    """Passes when every received byte is found in the source; gaps and repeats are only logged."""
+    with open(src_url, "rb") as f:
+        src = f.read()
+    with open(out_url, "rb") as f:
+        out = f.read()
+    report = match_text(src, out, block)
+    logging.debug(f"Text matching: {report.summary()}")
+    for first, end in report.unmatched:
+        logging.debug(f"Received bytes {first}-{end - 1} were not found in the source")
+    for first, end in report.gaps:
+        logging.debug(f"Source bytes {first}-{end - 1} were not received")
+
+    received = len(src) - sum(end - first for first, end in report.gaps)
+    if not src or received / len(src) * 100.00 < expected_percentage:
+        logging.warning(f"Received only {received} of {len(src)} source bytes! Expected: {expected_percentage:.2f}%")
+    return not report.unmatched
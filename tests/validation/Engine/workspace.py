@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+
+"""Per-test workspaces and leases of ports and URNs, so tests can run in parallel (e.g. pytest -n 8).
+
+Every test gets its own directory for client.json, connection.json and RX output. Proxy ports, multicast
+URNs and ST 2110 ports are leased from fixed pools: a lease is an exclusive flock on a file named after the
+pool slot, so leases are unique across processes and released by the kernel when a worker dies. The first
+slot of every pool is the value used so far, so a serial run keeps the well-known ports.
+"""
+
+import fcntl
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+from .connection import MultipointGroup, St2110
+from .const import MEDIA_PROXY_SDK_PORT, MESH_AGENT_CONTROL_API_PORT, MESH_AGENT_PROXY_API_PORT
+
+LEASE_DIR = os.path.join(tempfile.gettempdir(), "mcm-validation", "leases")
+WORKSPACE_DIR = os.path.join(tempfile.gettempdir(), "mcm-validation", "workspaces")
+
+PROXY_SLOTS = 16
+RDMA_FIRST_PORT = 9100
+RDMA_PORTS_PER_PROXY = 56  # 16 blocks within the default 9100-9999
+DEFAULT_MPG_URN = MultipointGroup().urn
+DEFAULT_ST2110_PORT = "9002"
+# multicast and ST 2110 ports interleave below the RDMA ports: 9003, 9005, ... and 9002, 9004, ...
+NETWORK_SLOTS = (RDMA_FIRST_PORT - 9002) // 2
+
+_current = None
+
+
+class Lease:
+    """Exclusive use of one slot of a pool until release() or the end of the process."""
+
+    def __init__(self, pool: str, slot: int, fd: int):
+        self.pool = pool
+        self.slot = slot
+        self.fd = fd
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+    def __repr__(self) -> str:
+        return f"Lease({self.pool}[{self.slot}])"
+
+
+def lease(pool: str, slots: int, usable=None) -> Lease:
+    """Leases the first free slot of a pool; usable(slot) can reject slots taken outside of the harness."""
+    os.makedirs(LEASE_DIR, exist_ok=True)
+    for slot in range(slots):
+        fd = os.open(os.path.join(LEASE_DIR, f"{pool}.{slot}.lock"), os.O_CREAT | os.O_RDWR, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        if usable is None or usable(slot):
+            return Lease(pool, slot, fd)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+    raise RuntimeError(f"All {slots} slots of {pool} are in use")
+
+
+class ProxyPorts:
+    """Ports of one media_proxy and its mesh-agent."""
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.sdk = MEDIA_PROXY_SDK_PORT + slot
+        self.agent_proxy_api = MESH_AGENT_PROXY_API_PORT + slot
+        self.agent_control_api = MESH_AGENT_CONTROL_API_PORT + slot
+        first = RDMA_FIRST_PORT + slot * RDMA_PORTS_PER_PROXY
+        self.rdma = f"{first}-{first + RDMA_PORTS_PER_PROXY - 1}"
+
+    def tcp_ports(self) -> tuple:
+        return self.sdk, self.agent_proxy_api, self.agent_control_api
+
+    def __repr__(self) -> str:
+        return f"ProxyPorts(sdk={self.sdk}, agent={self.agent_proxy_api}, control={self.agent_control_api})"
+
+
+def lease_proxy_ports(port_free) -> tuple:
+    """Returns (lease, ProxyPorts) of a media_proxy and mesh-agent pair whose ports are free according to port_free(port).
+
+    The pair outlives tests, so the lease is not held by a workspace.
+    """
+    held = lease("proxy", PROXY_SLOTS, lambda slot: all(port_free(port) for port in ProxyPorts(slot).tcp_ports()))
+    return held, ProxyPorts(held.slot)
+
+
+class Workspace:
+    """Directory and leases of one test; everything is released by release()."""
+
+    def __init__(self, name: str):
+        os.makedirs(WORKSPACE_DIR, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)[:80]}-", dir=WORKSPACE_DIR)
+        self.leases = []
+        self.proxy = None  # ProxyPorts of the media_proxy the test uses, set by media_proxy_single
+
+    def lease(self, pool: str, slots: int, usable=None) -> Lease:
+        held = lease(pool, slots, usable)
+        self.leases.append(held)
+        return held
+
+    def mpg_urn(self) -> str:
+        slot = self.lease("mpg", NETWORK_SLOTS).slot
+        return f"ipv4:224.0.0.1:{9003 + 2 * slot}"
+
+    def st2110_port(self) -> str:
+        slot = self.lease("st2110", NETWORK_SLOTS).slot
+        return str(9002 + 2 * slot)
+
+    def bind_client(self, client) -> None:
+        """Points a client with the default connection string at the media_proxy of this test."""
+        if self.proxy is not None and self.proxy.sdk != MEDIA_PROXY_SDK_PORT:
+            client.apiConnectionString = re.sub(r"Port=\d+", f"Port={self.proxy.sdk}", client.apiConnectionString)
+
+    def bind_connection(self, connection) -> None:
+        """Gives a connection with the default URN or port one of its own."""
+        if isinstance(connection.connection, MultipointGroup) and connection.connection.urn == DEFAULT_MPG_URN:
+            connection.connection.urn = self.mpg_urn()
+        elif isinstance(connection.connection, St2110) and str(connection.connection.remotePort) == DEFAULT_ST2110_PORT:
+            connection.connection.remotePort = self.st2110_port()
+
+    def release(self, remove: bool = True) -> None:
+        for held in self.leases:
+            held.release()
+        self.leases.clear()
+        if remove:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def current() -> Workspace:
+    """Workspace of the running test, None outside of tests."""
+    return _current
+
+
+def open_workspace(name: str) -> Workspace:
+    global _current
+    _current = Workspace(name)
+    logging.debug(f"Workspace {_current.path}")
+    return _current
+
+
+def close_workspace(remove: bool = True) -> None:
+    global _current
+    if _current is not None:
+        _current.release(remove)
+    _current = None
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import os
+
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.engine_mcm as utils
+import Engine.execute
+import Engine.payload
+from Engine.latency import LatencyCase, analyze_latency
+
+FRAMES = 500  # stamped buffers per connection type
+
+connections = {
+    "mpg": Engine.connection.MultipointGroup,
+    "st2110-20": Engine.connection.St2110_20,
+    "rdma": Engine.connection.Rdma,
+}
+
+
+@pytest.mark.parametrize("connection_type", connections.keys())
+def test_latency(build_TestApp, build: str, media_proxy_single, benchmark_results: list, tmp_path, connection_type: str) -> None:
+    client = Engine.client_json.ClientJson()
+    conn = connections[connection_type]()
+    payload = Engine.payload.Video(width=1920, height=1080, fps=25, pixelFormat="yuv422p10le")
+    connection = Engine.connection_json.ConnectionJson(
+        connection=conn, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    media_info = {
+        "width": payload.width,
+        "height": payload.height,
+        "fps": payload.fps,
+        "pixelFormat": payload.pixelFormat,
+    }
+
+    case = LatencyCase(f"latency-{connection_type}-1080p-{payload.pixelFormat}", media_info)
+    benchmark_results.append(case)
+    latency_path = os.path.join(tmp_path, "latency.bin")
+    utils.run_rx_tx_with_synthetic(build=build, media_info=media_info, frames=FRAMES, latency_path=latency_path)
+
+    case.report = analyze_latency(latency_path, expected_frames=FRAMES)
+    Engine.execute.log_info(f"{case.name}: {case.report.summary()}")
+    if not case.report.received:
+        Engine.execute.log_fail(f"{case.name}: no latency records, TxApp or RxApp does not support latency mode")
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.execute
+import Engine.payload
+from Engine.integrity import calculate_yuv_frame_size
+from Engine.scaling import ScalingCase, StreamConfigs, find_knee, run_streams
+
+FPS = 60
+
+connections = {
+    "mpg": Engine.connection.MultipointGroup,
+    "st2110-20": Engine.connection.St2110_20,
+    "rdma": Engine.connection.Rdma,
+}
+resolutions = {"1080p": (1920, 1080), "2160p": (3840, 2160)}
+
+
+@pytest.mark.parametrize("resolution", resolutions.keys())
+@pytest.mark.parametrize("connection_type", connections.keys())
+def test_scaling(
+    build_TestApp, build: str, media_proxy_single, benchmark_results: list, connection_type: str, resolution: str
+) -> None:
+    width, height = resolutions[resolution]
+    payload = Engine.payload.Video(width=width, height=height, fps=FPS, pixelFormat="yuv422p10le")
+    limit = Engine.client_json.ClientJson().maxMediaConnections
+
+    media_info = {
+        "width": payload.width,
+        "height": payload.height,
+        "fps": payload.fps,
+        "pixelFormat": payload.pixelFormat,
+    }
+
+    case = ScalingCase(f"scaling-{connection_type}-{resolution}-{payload.pixelFormat}", media_info)
+    benchmark_results.append(case)
+    configs = StreamConfigs(
+        build,
+        lambda: Engine.connection_json.ConnectionJson(connection=connections[connection_type](), payload=payload),
+    )
+    frame_size = calculate_yuv_frame_size(width, height, payload.pixelFormat)
+
+    def holds(streams: int) -> bool:
+        step = run_streams(build, configs.get(streams), FPS, frame_size, media_proxy_single.process.pid)
+        return case.add(step).holds()
+
+    case.capacity = find_knee(holds, limit)
+    step = case.steps.get(case.capacity)
+    if step is None:
+        Engine.execute.log_fail(f"{case.name}: a single stream does not reach {FPS} fps without loss")
+        return
+    Engine.execute.log_info(
+        f"{case.name}: capacity {case.capacity} of {limit} streams at {FPS} fps, {step.gbps:.3f} Gbit/s, "
+        f"proxy CPU {step.proxy_cpu_pct:.0f}%"
+    )
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import os
+
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.engine_mcm as utils
+import Engine.payload
+from Engine.benchmark import BenchmarkCase, audio_buffer_size, check_baseline, run_trials
+from Engine.integrity import calculate_yuv_frame_size
+from Engine.media_catalog import catalog
+from Engine.media_files import audio_files
+
+FRAMES = 250  # frames of every video trial
+
+video_connections = {
+    "mpg": Engine.connection.MultipointGroup,
+    "st2110-20": Engine.connection.St2110_20,
+    "rdma": Engine.connection.Rdma,
+}
+resolutions = {"1080p": (1920, 1080), "2160p": (3840, 2160)}
+
+
+@pytest.mark.parametrize("file_format", ["YUV422PLANAR10LE", "YUV422RFC4175PG2BE10"])
+@pytest.mark.parametrize("resolution", resolutions.keys())
+@pytest.mark.parametrize("connection_type", video_connections.keys())
+def test_video_throughput(
+    build_TestApp, build: str, media_proxy_single, benchmark_trials: int, benchmark_baselines: dict,
+    benchmark_results: list, connection_type: str, resolution: str, file_format: str
+) -> None:
+    width, height = resolutions[resolution]
+    client = Engine.client_json.ClientJson()
+    conn = video_connections[connection_type]()
+    payload = Engine.payload.Video(
+        width=width,
+        height=height,
+        fps=25,
+        pixelFormat=utils.video_file_format_to_payload_format(file_format),
+    )
+    connection = Engine.connection_json.ConnectionJson(
+        connection=conn, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    media_info = {
+        "width": payload.width,
+        "height": payload.height,
+        "fps": payload.fps,
+        "pixelFormat": payload.pixelFormat,
+    }
+
+    case = BenchmarkCase(f"{connection_type}-{resolution}-{payload.pixelFormat}", media_info)
+    benchmark_results.append(case)
+    run_trials(
+        case,
+        benchmark_trials,
+        media_proxy_single.process.pid,
+        calculate_yuv_frame_size(width, height, file_format),
+        lambda: utils.run_rx_tx_with_synthetic(build=build, media_info=media_info, frames=FRAMES, rate=0),
+    )
+    check_baseline(case, benchmark_baselines)
+
+
+@pytest.mark.parametrize("audio_type", catalog.params(group="audio_files"))
+def test_audio_throughput(
+    build_TestApp, build: str, media: str, media_stage, media_proxy_single, benchmark_trials: int,
+    benchmark_baselines: dict, benchmark_results: list, audio_type: str
+) -> None:
+    file = audio_files[audio_type]
+    client = Engine.client_json.ClientJson()
+    conn = Engine.connection.St2110_30()
+    payload = Engine.payload.Audio(
+        channels=file["channels"],
+        sampleRate=file["sample_rate"],
+        audio_format=file["format"],
+    )
+    connection = Engine.connection_json.ConnectionJson(
+        connection=conn, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    media_file_path = media_stage.source(os.path.join(media, file["filename"]))
+
+    media_info = {
+        "channels": payload.channels,
+        "sampleRate": payload.sampleRate,
+        "audioFormat": payload.audio_format,
+    }
+
+    case = BenchmarkCase(f"st2110-30-{audio_type}", media_info)
+    benchmark_results.append(case)
+    run_trials(
+        case,
+        benchmark_trials,
+        media_proxy_single.process.pid,
+        audio_buffer_size(media_info),
+        lambda: utils.run_rx_tx_with_file(
+            file_path=media_file_path, build=build, media_info=media_info, output_dir=media_stage.output_dir, rate=0
+        ),
+    )
+    check_baseline(case, benchmark_baselines)
@@ -2,7 +2,7 @@
 # Copyright 2024-2025 Intel Corporation
 # Media Communications Mesh
 
-pytest_plugins = ["Engine.fixtures", "Engine.logging", "Engine.fixtures_mcm"]
+pytest_plugins = ["Engine.fixtures", "Engine.logging", "Engine.fixtures_mcm", "Engine.profiler"]
 
 
 def pytest_addoption(parser):
@@ -10,6 +10,12 @@ def pytest_addoption(parser):
     parser.addoption("--dmesg", help="method of dmesg gathering: clear (dmesg -C), keep (default)")
     parser.addoption("--media", help="path to media asset (default /mnt/media)")
     parser.addoption("--build", help="path to build (default ../..)")
+    parser.addoption("--rebuild", action="store_true", help="build TestApp even when its inputs did not change")
     parser.addoption("--nic", help="list of PCI IDs of network devices")
     parser.addoption("--dma", help="list of PCI IDs of DMA devices")
     parser.addoption("--time", help="seconds to run every test (default=15)")
+    parser.addoption("--profile", help="time harness phases of every test: phases, cprofile (adds Python profiling)")
+    parser.addoption("--sample-rate", help="resource samples per second of started processes, 0 to disable (default 10)")
+    parser.addoption("--trials", help="trials of every benchmark case (default 3)")
+    parser.addoption("--benchmark-json", help="benchmark results file (default logs/latest/benchmarks.json)")
+    parser.addoption("--stage", help="source media staging: none (default), prewarm, tmpfs or tmpfs:<directory>")
@@ -10,11 +10,12 @@ import Engine.connection_json
 import Engine.engine_mcm as utils
 import Engine.execute
 import Engine.payload
+from Engine.media_catalog import catalog
 from Engine.media_files import yuv_files
 
 
-@pytest.mark.parametrize("video_type", [k for k in yuv_files.keys()])
-def test_video(build_TestApp, build: str, media: str, video_type: str) -> None:
+@pytest.mark.parametrize("video_type", catalog.params(group="yuv_files"))
+def test_video(build_TestApp, build: str, media: str, media_stage, video_type: str) -> None:
     client = Engine.client_json.ClientJson()
     conn_mpg = Engine.connection.Rdma()
     payload = Engine.payload.Video(
@@ -32,6 +33,6 @@ def test_video(build_TestApp, build: str, media: str, video_type: str) -> None:
 
     # Use a specified file from media_files.py
     media_file = yuv_files[video_type]["filename"]
-    media_file_path = os.path.join(media, media_file)
+    media_file_path = media_stage.source(os.path.join(media, media_file))
 
-    utils.run_rx_tx_with_file(file_path=media_file_path, build=build)
+    utils.run_rx_tx_with_file(file_path=media_file_path, build=build, output_dir=media_stage.output_dir)
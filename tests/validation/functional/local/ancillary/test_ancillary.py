@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.engine_mcm as utils
+import Engine.payload
+from Engine.text_integrity import write_messages
+
+message_sizes = {"short": (4, 30), "mixed": (4, 2000)}
+
+
+@pytest.mark.parametrize("message_size", message_sizes.keys())
+def test_ancillary(build_TestApp, build: str, media_proxy_single, message_size: str) -> None:
+    client = Engine.client_json.ClientJson()
+    conn_mpg = Engine.connection.MultipointGroup()
+    payload = Engine.payload.Ancillary()
+    connection = Engine.connection_json.ConnectionJson(
+        maxPayloadSize=1024, connection=conn_mpg, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    media_file_path = str(utils.config_dir(build).resolve() / f"ancillary_{message_size}.txt")
+    write_messages(media_file_path, 2000, *message_sizes[message_size])
+
+    media_info = {
+        "payloadType": payload.payload_type,
+    }
+
+    utils.run_rx_tx_with_file(file_path=media_file_path, build=build, media_info=media_info)
@@ -10,11 +10,13 @@ import Engine.engine_mcm as utils
 import Engine.execute
 import Engine.payload
 import pytest
+from Engine.media_catalog import catalog
 from Engine.media_files import audio_files
 
 
-@pytest.mark.parametrize("file", audio_files.values())
-def test_audio(build: str, media: str, file: dict):
+@pytest.mark.parametrize("audio_type", catalog.params(group="audio_files"))
+def test_audio(build: str, media: str, media_stage, audio_type: str):
+    file = audio_files[audio_type]
     client = Engine.client_json.ClientJson()
     conn_mpg = Engine.connection.MultipointGroup()
     payload = Engine.payload.Audio(
@@ -30,6 +32,12 @@ def test_audio(build: str, media: str, file: dict):
     utils.create_connection_json(build, connection)
 
     media_file = file["filename"]
-    media_file_path = os.path.join(media, media_file)
+    media_file_path = media_stage.source(os.path.join(media, media_file))
 
-    utils.run_rx_tx_with_file(file_path=media_file_path, build=build)
+    media_info = {
+        "channels": payload.channels,
+        "sampleRate": payload.sampleRate,
+        "audioFormat": payload.audio_format,
+    }
+
+    utils.run_rx_tx_with_file(file_path=media_file_path, build=build, media_info=media_info, output_dir=media_stage.output_dir)
@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.engine_mcm as utils
+import Engine.payload
+
+resolutions = {"720p": (1280, 720), "1080p": (1920, 1080), "2160p": (3840, 2160), "4320p": (7680, 4320)}
+
+
+@pytest.mark.parametrize("pattern", ["ramp", "bars"])
+@pytest.mark.parametrize("file_format", ["YUV422PLANAR10LE", "YUV422RFC4175PG2BE10"])
+@pytest.mark.parametrize("resolution", resolutions.keys())
+def test_synthetic_video(build_TestApp, build: str, media_proxy_single, resolution: str, file_format: str, pattern: str) -> None:
+    width, height = resolutions[resolution]
+    client = Engine.client_json.ClientJson()
+    conn_mpg = Engine.connection.MultipointGroup()
+    payload = Engine.payload.Video(
+        width=width,
+        height=height,
+        fps=25,
+        pixelFormat=utils.video_file_format_to_payload_format(file_format),
+    )
+    connection = Engine.connection_json.ConnectionJson(
+        connection=conn_mpg, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    media_info = {
+        "width": payload.width,
+        "height": payload.height,
+        "fps": payload.fps,
+        "pixelFormat": payload.pixelFormat,
+    }
+
+    utils.run_rx_tx_with_synthetic(build=build, media_info=media_info, frames=100, pattern=pattern)
@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import os
+import pytest
+
+import Engine.client_json
+import Engine.connection
+import Engine.connection_json
+import Engine.engine_mcm as utils
+import Engine.execute
+import Engine.payload
+from Engine.media_catalog import catalog
+from Engine.media_files import yuv_files_422p10le
+
+
+@pytest.mark.parametrize("video_type", catalog.params(group="yuv_files_422p10le"))
+def test_video(build_TestApp, build: str, media: str, media_stage, video_type: str) -> None:
+    client = Engine.client_json.ClientJson()
+    conn_st22 = Engine.connection.St2110_22()
+    payload = Engine.payload.Video(
+        width=yuv_files_422p10le[video_type]["width"],
+        height=yuv_files_422p10le[video_type]["height"],
+        fps=25,
+        pixelFormat=utils.video_file_format_to_payload_format(yuv_files_422p10le[video_type]["file_format"]),
+    )
+    connection = Engine.connection_json.ConnectionJson(
+        connection=conn_st22, payload=payload
+    )
+
+    utils.create_client_json(build, client)
+    utils.create_connection_json(build, connection)
+
+    # Use a specified file from media_files.py
+    media_file = yuv_files_422p10le[video_type]["filename"]
+    media_file_path = media_stage.source(os.path.join(media, media_file))
+
+    media_info = {
+        "width": payload.width,
+        "height": payload.height,
+        "fps": payload.fps,
+        "pixelFormat": payload.pixelFormat,
+    }
+
+    utils.run_rx_tx_with_file(file_path=media_file_path, build=build, media_info=media_info, lossy=True, output_dir=media_stage.output_dir)
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import numpy as np
+import pytest
+
+from Engine.audio_integrity import decode_pcm, match_audio
+
+RATE = 48000
+
+
+def tone(seconds: float = 2, frequency: float = 1000) -> np.ndarray:
+    wave = np.round(np.sin(2 * np.pi * frequency * np.arange(int(RATE * seconds)) / RATE) * 2**22).astype(np.int32)
+    return np.stack([wave, wave // 2], axis=1)
+
+
+def noise(seconds: float = 2) -> np.ndarray:
+    return np.random.default_rng(0).integers(-(2**23), 2**23, (int(RATE * seconds), 2)).astype(np.int32)
+
+
+def resample(samples: np.ndarray, ppm: float) -> np.ndarray:
+    """Nearest-neighbour resampling, as a receiver with a clock off by ppm slips single samples."""
+    ratio = 1 + ppm / 1e6
+    return samples[np.round(np.arange(int((len(samples) - 1) / ratio)) * ratio).astype(int)]
+
+
+@pytest.mark.parametrize("offset", [0, 7, 48, 1000])
+def test_tone_offset(offset: int) -> None:
+    src = tone()
+    report = match_audio(src, src[offset:], RATE)
+    assert report.start_offset % 48 == offset % 48  # a 1 kHz tone repeats every 48 samples
+    assert report.matched == len(src) - offset
+    assert report.corrupted == report.dropped == report.repeated == []
+    assert report.drift_ppm == 0
+
+
+@pytest.mark.parametrize("signal", [tone, noise])
+def test_single_drop(signal) -> None:
+    src = signal()
+    report = match_audio(src, np.concatenate([src[:30000], src[30100:]]), RATE)
+    assert report.corrupted == []
+    assert len(report.dropped) == 1
+    assert abs(report.drift_ppm) < 1
+
+
+def test_drop_range() -> None:
+    src = noise()
+    report = match_audio(src, np.concatenate([src[:30000], src[30100:]]), RATE)
+    assert report.dropped == [(30000, 30100)]
+
+
+def test_repeat() -> None:
+    src = noise()
+    report = match_audio(src, np.concatenate([src[:30000], src[29000:]]), RATE)
+    assert report.repeated == [(29000, 30000)]
+    assert report.corrupted == []
+    assert abs(report.drift_ppm) < 1
+
+
+@pytest.mark.parametrize("signal", [tone, noise])
+@pytest.mark.parametrize("ppm", [500, -500])
+def test_drift(signal, ppm: float) -> None:
+    report = match_audio(signal(), resample(signal(), ppm), RATE)
+    assert report.corrupted == []
+    assert report.drift_ppm == pytest.approx(ppm, rel=0.05)
+
+
+def test_corrupted() -> None:
+    src = noise()
+    out = src.copy()
+    out[5000:5010] = 0
+    report = match_audio(src, out, RATE)
+    assert report.corrupted == [(5000, 5010)]
+    assert report.dropped == report.repeated == []
+
+
+def test_decode_pcm_24bit() -> None:
+    raw = np.frombuffer(bytes([0x7F, 0xFF, 0xFF, 0x80, 0x00, 0x00, 0x00, 0x00, 0x01, 0xFF, 0xFF, 0xFF]), dtype=np.uint8)
+    assert decode_pcm(raw, "pcm_s24be", 2).tolist() == [[2**23 - 1, -(2**23)], [1, -1]]
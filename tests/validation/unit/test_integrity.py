@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+from types import SimpleNamespace
+
+import Engine.frame_diff
+import Engine.integrity
+from Engine.integrity import check_st20p_integrity, match_frames
+
+SRC = [f"frame{i}" for i in range(10)]
+
+
+def test_exact() -> None:
+    report = match_frames(SRC, SRC)
+    assert report.matched == 10
+    assert report.corrupted == report.dropped == report.duplicated == report.reordered == []
+    assert report.truncated == 0
+
+
+def test_drops_and_truncation() -> None:
+    report = match_frames(SRC, SRC[:3] + SRC[5:8])
+    assert report.dropped == [3, 4]
+    assert report.bursts == [(3, 2)]
+    assert report.truncated == 2
+
+
+def test_corrupted_counted_once() -> None:
+    out = SRC[:3] + ["bad", "bad"] + SRC[5:9] + ["bad"]
+    report = match_frames(SRC, out)
+    assert report.corrupted == [3, 4, 9]
+    assert report.corrupted_src == [3, 4, 9]
+    assert report.dropped == []
+    assert report.truncated == 0
+    assert report.matched + len(report.corrupted) == len(SRC)
+
+
+def test_inserted_corrupted_frame() -> None:
+    report = match_frames(SRC, SRC[:3] + ["bad"] + SRC[3:])
+    assert report.corrupted == [3]
+    assert report.matched == 10
+    assert report.dropped == report.duplicated == []
+
+
+def test_duplicated_and_reordered() -> None:
+    out = SRC[:4] + [SRC[2]] + SRC[5:7] + [SRC[4]] + SRC[7:]
+    report = match_frames(SRC, out)
+    assert report.duplicated == [4]
+    assert report.reordered == [7]
+    assert report.dropped == []
+
+
+def test_corruption_map_uses_the_verdict_report(monkeypatch) -> None:
+    reports = []
+
+    def match(src: list, out: list):
+        reports.append(match_frames(src, out))
+        return reports[-1]
+
+    located = []
+
+    def locate(src_url: str, out_url: str, out_frame: int, src_frame: int, *media) -> SimpleNamespace:
+        located.append((out_frame, src_frame))
+        return SimpleNamespace(summary=lambda: "")
+
+    monkeypatch.setattr(Engine.integrity, "match_frames", match)
+    monkeypatch.setattr(Engine.integrity, "calculate_cached_chunk_hashes", lambda url, size: SRC)
+    monkeypatch.setattr(Engine.integrity, "calculate_chunk_hashes", lambda url, size: SRC[:4] + ["bad"] + SRC[5:])
+    monkeypatch.setattr(Engine.frame_diff, "locate_corruption", locate)
+    assert not check_st20p_integrity("src.yuv", "out.yuv", 16, media_info={"width": 4, "height": 2})
+    assert len(reports) == 1
+    assert located == [(4, 4)]
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from Engine.latency import LATENCY_RECORD, LatencyHistogram, LatencyReport, read_latency_records
+
+
+@pytest.mark.parametrize("significant_figures", [2, 3])
+def test_percentiles_within_precision(significant_figures: int) -> None:
+    values = np.random.default_rng(0).lognormal(mean=11, sigma=1.5, size=100_000).astype(np.int64) + 1
+    histogram = LatencyHistogram(significant_figures)
+    histogram.record(values[:50_000])
+    histogram.record(values[50_000:])
+    assert histogram.total == len(values)
+    assert histogram.min == values.min()
+    assert histogram.max == values.max()
+    assert histogram.mean == pytest.approx(values.mean())
+    ordered = np.sort(values)
+    for percentile in (50, 90, 99, 99.9, 100):
+        exact = ordered[math.ceil(Fraction(str(percentile)) * len(values) / 100) - 1]
+        assert histogram.percentile(percentile) == pytest.approx(exact, rel=10**-significant_figures)
+
+
+def test_empty_histogram() -> None:
+    histogram = LatencyHistogram()
+    histogram.record(np.array([], dtype=np.int64))
+    assert histogram.percentile(99) == 0
+    assert histogram.summary()["count"] == 0
+
+
+def test_summary_in_microseconds() -> None:
+    histogram = LatencyHistogram()
+    histogram.record(np.array([1000, 2000, 3000]))
+    summary = histogram.summary()
+    assert summary["min_us"] == 1.0
+    assert summary["max_us"] == 3.0
+    assert summary["p50_us"] == 2.0
+
+
+def test_report_lost_and_reordered(tmp_path) -> None:
+    records = np.zeros(5, dtype=LATENCY_RECORD)
+    records["seq"] = [1, 2, 4, 3, 6]
+    records["tx_ns"] = 1_000_000
+    records["rx_ns"] = 1_050_000
+    path = tmp_path / "latency.bin"
+    path.write_bytes(records.tobytes() + b"\0" * 7)  # a record cut off at the end
+    read = read_latency_records(path)
+    assert len(read) == 5
+    report = LatencyReport(read, expected_frames=7)
+    assert report.lost == 2
+    assert report.reordered == 1
+    assert report.summary()["p50_us"] == 50.0
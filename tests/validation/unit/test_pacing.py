@@ -0,0 +1,72 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+from types import SimpleNamespace
+
+import pytest
+
+import Engine.execute
+from Engine.engine_mcm import check_pacing, tx_options, tx_pacing
+
+REPORT = (
+    "[TX] Pacing: {frames} frames in 4.980 s, {fps:.3f} fps achieved, target {target:.3f} fps, "
+    "{missed} deadlines missed, max lateness 0.084 ms"
+)
+
+
+def fake_tx(*lines: str):
+    text = "\n".join(["[TX] Sending frames", *lines, "[TX] Shutting down connection"])
+    return SimpleNamespace(log=SimpleNamespace(text=lambda: text))
+
+
+@pytest.fixture
+def failures(monkeypatch) -> list:
+    failed = []
+    monkeypatch.setattr(Engine.execute, "log_fail", failed.append)
+    monkeypatch.setattr(Engine.execute, "log_info", lambda msg: None)
+    return failed
+
+
+def test_report_is_parsed() -> None:
+    tx = fake_tx(
+        REPORT.format(frames=10, fps=0, target=0, missed=0),
+        REPORT.format(frames=250, fps=50, target=50, missed=1),  # the last report counts
+    )
+    assert tx_pacing(tx) == {
+        "frames": 250.0, "seconds": 4.98, "fps": 50.0, "target": 50.0, "missed": 1.0, "max_late_ms": 0.084
+    }
+    assert tx_pacing(fake_tx()) is None
+
+
+@pytest.mark.parametrize(
+    "line, rate",
+    [
+        (REPORT.format(frames=250, fps=49.9, target=50, missed=2), 50),
+        (REPORT.format(frames=250, fps=59.94, target=59.94, missed=0), 59.94),
+        (REPORT.format(frames=1000, fps=5000, target=0, missed=0), 0),  # as fast as possible
+        (REPORT.format(frames=1, fps=1, target=50, missed=1), None),  # too short to judge
+        (None, 50),  # no report
+    ],
+)
+def test_pacing_kept(failures: list, line: str, rate: float) -> None:
+    assert check_pacing(fake_tx(line) if line else fake_tx(), rate)
+    assert failures == []
+
+
+@pytest.mark.parametrize(
+    "line, rate, failure",
+    [
+        (REPORT.format(frames=250, fps=50, target=25, missed=0), 50, "paced at 25.000 fps instead of 50.000 fps"),
+        (REPORT.format(frames=250, fps=47, target=50, missed=0), 50, "achieved 47.00 fps of the 50.00 fps target"),
+        (REPORT.format(frames=250, fps=50, target=50, missed=3), None, "missed 3 of 250 frame deadlines"),
+    ],
+)
+def test_pacing_failures(failures: list, line: str, rate: float, failure: str) -> None:
+    assert not check_pacing(fake_tx(line), rate)
+    assert [message.partition("TxApp ")[2] for message in failures] == [failure]
+
+
+def test_tx_options() -> None:
+    assert tx_options() == ""
+    assert tx_options(latency=True, rate=0) == "-l -r 0 "
+    assert tx_options(rate=59.94) == "-r 59.94 "
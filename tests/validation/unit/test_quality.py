@@ -0,0 +1,23 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import numpy as np
+
+from Engine.integrity import calculate_yuv_frame_size
+from Engine.quality import check_st22_quality
+
+WIDTH, HEIGHT, FORMAT = 64, 32, "yuv422p10le"
+
+
+def test_identical_frames_pass(tmp_path) -> None:
+    size = calculate_yuv_frame_size(WIDTH, HEIGHT, FORMAT)
+    frames = np.random.default_rng(0).integers(0, 1024, size * 3 // 2, dtype=np.uint16).tobytes()
+    (tmp_path / "src.yuv").write_bytes(frames)
+    (tmp_path / "out.yuv").write_bytes(frames)
+    assert check_st22_quality(str(tmp_path / "src.yuv"), str(tmp_path / "out.yuv"), WIDTH, HEIGHT, FORMAT)
+
+
+def test_source_shorter_than_a_frame_fails(tmp_path) -> None:
+    (tmp_path / "src.yuv").write_bytes(bytes(100))
+    (tmp_path / "out.yuv").write_bytes(bytes(100))
+    assert not check_st22_quality(str(tmp_path / "src.yuv"), str(tmp_path / "out.yuv"), WIDTH, HEIGHT, FORMAT)
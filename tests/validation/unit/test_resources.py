@@ -0,0 +1,70 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import math
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import Engine.resources
+from Engine.resources import METRICS, ProcessSeries, ResourceSampler, format_summary, read_proc
+
+
+def sample(**values) -> dict:
+    return {**dict.fromkeys(METRICS, 0.0), **values}
+
+
+def test_summary_of_counters_and_gauges() -> None:
+    series = ProcessSeries(42, "/usr/local/bin/media_proxy -t 8002")
+    series.add(10.0, sample(cpu_s=1.0, voluntary_ctxt_switches=100, rss_kb=1000, threads=4))
+    series.add(10.5, sample(cpu_s=1.4, voluntary_ctxt_switches=150, rss_kb=3000, threads=6))
+    series.add(11.0, sample(cpu_s=1.5, voluntary_ctxt_switches=160, rss_kb=math.nan, threads=6))
+    summary = series.summary()
+    assert summary["name"] == "media_proxy"
+    assert summary["samples"] == 3
+    assert summary["seconds"] == 1.0
+    assert summary["cpu_s"] == 0.5
+    assert summary["voluntary_ctxt_switches"] == 60
+    assert summary["cpu_mean_pct"] == 50.0
+    assert summary["cpu_peak_pct"] == 80.0
+    assert summary["rss_kb_mean"] == 2000.0  # the NaN sample is left out
+    assert summary["rss_kb_peak"] == 3000
+    assert summary["threads_peak"] == 6
+    assert "media_proxy (PID 42): CPU 0.50s" in format_summary(summary)
+
+
+def test_summary_of_single_and_no_samples() -> None:
+    series = ProcessSeries(42, "RxApp")
+    assert series.summary() == {"pid": 42, "name": "RxApp", "samples": 0}
+    series.add(1.0, sample(cpu_s=2.0))
+    summary = series.summary()
+    assert summary["cpu_mean_pct"] == 0.0
+    assert summary["cpu_peak_pct"] == 0.0
+    assert format_summary(summary) == "RxApp (PID 42): 1 samples"
+
+
+def test_read_proc_of_own_process() -> None:
+    own = read_proc(os.getpid())
+    assert set(own) == set(METRICS)
+    assert own["cpu_s"] >= 0
+    assert own["threads"] >= 1
+    assert own["rss_kb"] > 0
+
+
+def test_sampler_follows_running_processes(monkeypatch) -> None:
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    running = [SimpleNamespace(process=child, command=f"{sys.executable} -c sleep")]
+    monkeypatch.setattr(Engine.resources, "get_orchestrator", lambda: SimpleNamespace(running=lambda: running))
+    try:
+        sampler = ResourceSampler()
+        sampler.sample()
+        sampler.sample()
+        child.kill()
+        child.wait()
+        sampler.sample()  # the ended process is skipped, not an error
+    finally:
+        child.kill()
+    [summary] = sampler.summaries()
+    assert summary["pid"] == child.pid
+    assert summary["samples"] == 2
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import math
+
+import pytest
+
+from Engine.scaling import ScalingCase, ScalingStep, StreamResult, find_knee
+
+
+@pytest.mark.parametrize("limit", [1, 2, 20, 32])
+def test_knee_of_every_capacity(limit: int) -> None:
+    for capacity in range(limit + 1):
+        calls = []
+
+        def holds(streams: int) -> bool:
+            assert 1 <= streams <= limit
+            calls.append(streams)
+            return streams <= capacity
+
+        assert find_knee(holds, limit) == capacity
+        assert len(calls) == len(set(calls))  # no step runs twice
+        assert len(calls) <= 2 * math.ceil(math.log2(limit)) + 1
+
+
+def test_stream_loss() -> None:
+    assert StreamResult(100, 99, 59.9).loss == 0.01
+    assert StreamResult(100, 101, 60).loss == 0.0  # a frame counted twice is no loss
+    assert StreamResult(0, 0, 0).loss == 1.0  # nothing sent
+
+
+def test_step_holds_within_rate_tolerance_and_loss_limit() -> None:
+    def step(*streams: StreamResult) -> ScalingStep:
+        return ScalingStep(60, 1_000_000, list(streams), 5.0, 2.5)
+
+    assert step(StreamResult(300, 300, 60), StreamResult(300, 297, 57)).holds()
+    assert not step(StreamResult(300, 300, 60), StreamResult(300, 300, 56.9)).holds()
+    assert not step(StreamResult(300, 296, 60)).holds()
+    full = step(StreamResult(300, 300, 60), StreamResult(300, 300, 60))
+    assert full.gbps == pytest.approx(0.96)
+    assert full.proxy_cpu_pct == 50.0
+    assert full.to_dict()["streams"] == 2
+
+
+def test_case_capacity_and_steps() -> None:
+    case = ScalingCase("scaling-mpg-1080p", {"fps": 60})
+    for streams in (4, 1, 2):
+        case.add(ScalingStep(60, 1, [StreamResult(300, 300, 60)] * streams, 5.0, 1.0))
+    case.capacity = 4
+    result = case.to_dict()
+    assert result["capacity"] == 4
+    assert [step["streams"] for step in result["steps"]] == [1, 2, 4]
@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import os
+
+import pytest
+
+import Engine.testapp_build
+from Engine.testapp_build import DIGEST_FILE, _foreign_cache, build_testapp, inputs_digest
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A build tree with TestApp sources, an SDK header and a libmcm_dp.so, with the build commands recorded."""
+    source = tmp_path / "tests" / "tools" / "TestApp"
+    (source / "src").mkdir(parents=True)
+    (source / "CMakeLists.txt").write_text("project(TestApp C)\n")
+    (source / "src" / "mcm.c").write_text("int main(void) { return 0; }\n")
+    (tmp_path / "sdk" / "include").mkdir(parents=True)
+    (tmp_path / "sdk" / "include" / "mesh_dp.h").write_text("#pragma once\n")
+    library = tmp_path / "libmcm_dp.so"
+    library.write_bytes(b"\x7fELF")
+    monkeypatch.setattr(Engine.testapp_build, "find_library", lambda: str(library))
+    commands = []
+
+    def run(command: list, cwd: str) -> None:
+        commands.append(command[0])
+        if command[0] == "make":
+            for app in ("TxApp", "RxApp"):
+                open(os.path.join(cwd, app), "w").close()
+
+    monkeypatch.setattr(Engine.testapp_build, "_run", run)
+    return tmp_path, commands
+
+
+def test_digest_depends_on_contents_names_and_recipe(tmp_path) -> None:
+    first, second = tmp_path / "a.c", tmp_path / "b.c"
+    first.write_text("a")
+    second.write_text("b")
+    digest = inputs_digest([str(first), str(second)], "cmake ..")
+    assert inputs_digest([str(first), str(second)], "cmake ..") == digest
+    assert inputs_digest([str(second), str(first)], "cmake ..") != digest
+    assert inputs_digest([str(first), str(second)], "cmake .. -DX=1") != digest
+    second.write_text("c")
+    assert inputs_digest([str(first), str(second)], "cmake ..") != digest
+
+
+def test_foreign_cache(tmp_path) -> None:
+    build = tmp_path / "build"
+    build.mkdir()
+    assert not _foreign_cache(str(build))
+    (build / "CMakeCache.txt").write_text(f"CMAKE_HOME_DIRECTORY:INTERNAL={tmp_path}\n")
+    assert not _foreign_cache(str(build))
+    (build / "CMakeCache.txt").write_text("CMAKE_HOME_DIRECTORY:INTERNAL=/elsewhere/TestApp\n")
+    assert _foreign_cache(str(build))
+
+
+def test_build_skipped_until_inputs_change(tree) -> None:
+    build, commands = tree
+    assert build_testapp(str(build))
+    assert commands == ["cmake", "make"]
+    assert not build_testapp(str(build))
+    assert build_testapp(str(build), force=True)
+    (build / "libmcm_dp.so").write_bytes(b"\x7fELF2")
+    assert build_testapp(str(build))
+    os.unlink(build / "tests" / "tools" / "TestApp" / "build" / "RxApp")
+    assert build_testapp(str(build))
+    assert commands.count("make") == 4
+
+
+def test_failed_build_is_not_up_to_date(tree, monkeypatch) -> None:
+    build, _ = tree
+    assert build_testapp(str(build))
+    (build / "tests" / "tools" / "TestApp" / "src" / "mcm.c").write_text("syntax error\n")
+
+    def fail(command: list, cwd: str) -> None:
+        raise RuntimeError("make failed")
+
+    monkeypatch.setattr(Engine.testapp_build, "_run", fail)
+    with pytest.raises(RuntimeError):
+        build_testapp(str(build))
+    assert not os.path.exists(build / "tests" / "tools" / "TestApp" / "build" / DIGEST_FILE)
+
+
+def test_copied_tree_is_configured_again(tree) -> None:
+    build, _ = tree
+    path = build / "tests" / "tools" / "TestApp" / "build"
+    path.mkdir()
+    (path / "CMakeFiles").mkdir()
+    (path / "CMakeCache.txt").write_text("CMAKE_HOME_DIRECTORY:INTERNAL=/elsewhere/TestApp\n")
+    assert build_testapp(str(build))
+    assert not (path / "CMakeCache.txt").exists()
+    assert not (path / "CMakeFiles").exists()
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import time
+
+import pytest
+
+from Engine.text_integrity import match_text, write_messages
+
+LINES = b"".join(b"line %d of the source text\n" % i for i in range(20000))
+
+
+@pytest.mark.parametrize("offset", [1, 1000, 12345])
+def test_offset(offset: int) -> None:
+    report = match_text(LINES, LINES[offset:])
+    assert report.unmatched == []
+    assert report.reordered == 0
+    assert report.gaps == [(0, offset)]
+    assert report.repeats == []
+
+
+@pytest.mark.parametrize("offset", [1, 3, 8, 13])
+def test_periodic(offset: int) -> None:
+    src = b"abcdefgh" * 10000
+    report = match_text(src, src[offset:])
+    assert report.unmatched == []
+    assert report.matched == len(src) - offset
+
+
+@pytest.mark.parametrize("size", [64, 1000])
+def test_repeated_message_with_gap(size: int) -> None:
+    message = bytes(33 + (i * 37 + 11) % 94 for i in range(size - 1)) + b"\n"
+    src = message * (4_000_000 // size)
+    gap = len(src) // 3 + 5
+    start = time.perf_counter()
+    report = match_text(src, src[:gap] + src[gap + 100 :])
+    assert time.perf_counter() - start < 10  # linear: well under a second here, minutes when quadratic
+    assert report.unmatched == []
+    assert report.repeats == []
+    if size > 100:
+        assert report.gaps == [(gap, gap + 100)]
+    else:  # the data after the gap matches the source 100 - size bytes on as well, the rest is missing at the end
+        assert report.gaps == [(gap, gap + 100 - size), (len(src) - size, len(src))]
+
+
+def test_short_messages(tmp_path) -> None:
+    path = tmp_path / "messages.txt"
+    write_messages(path, 2000, 4, 30)
+    messages = path.read_bytes().splitlines(keepends=True)
+    out = b"".join(message for i, message in enumerate(messages) if i % 7)
+    report = match_text(b"".join(messages), out)
+    assert report.unmatched == []
+    assert len(report.gaps) == len(range(0, len(messages), 7))
+    assert report.reordered == 0
+
+
+def test_drops() -> None:
+    out = LINES[:5000] + LINES[5100:200000] + LINES[200003:]
+    report = match_text(LINES, out)
+    assert report.unmatched == []
+    assert [end - first for first, end in report.gaps] == [100, 3]  # the 3 bytes may shift over equal ones
+
+
+def test_corrupted_bytes() -> None:
+    out = bytearray(LINES)
+    for position in (10, 5000, 5001, 300000):
+        out[position] ^= 0x55
+    report = match_text(LINES, bytes(out))
+    assert report.unmatched == [(10, 11), (5000, 5002), (300000, 300001)]
+
+
+def test_repeat_and_reorder() -> None:
+    out = LINES[:2000] + LINES[1000:3000] + LINES[10000:11000] + LINES[5000:6000]
+    report = match_text(LINES, out)
+    assert report.unmatched == []
+    assert report.repeats == [(1000, 2000)]
+    assert report.reordered == 2
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright 2024-2025 Intel Corporation
+# Media Communications Mesh
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import Engine.workspace
+from Engine.const import MEDIA_PROXY_SDK_PORT
+from Engine.workspace import (PROXY_SLOTS, RDMA_FIRST_PORT, ProxyPorts, Workspace, lease,
+                              lease_proxy_ports)
+
+
+@pytest.fixture(autouse=True)
+def lease_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Engine.workspace, "LEASE_DIR", str(tmp_path / "leases"))
+    monkeypatch.setattr(Engine.workspace, "WORKSPACE_DIR", str(tmp_path / "workspaces"))
+    return tmp_path / "leases"
+
+
+def test_leases_are_exclusive_and_reused() -> None:
+    first, second = lease("pool", 3), lease("pool", 3)
+    assert (first.slot, second.slot) == (0, 1)
+    first.release()
+    first.release()  # a second release is harmless
+    assert lease("pool", 3).slot == 0
+    assert lease("pool", 3).slot == 2
+    with pytest.raises(RuntimeError, match="All 3 slots of pool are in use"):
+        lease("pool", 3)
+
+
+def test_rejected_slot_is_not_held() -> None:
+    assert lease("pool", 3, usable=lambda slot: slot != 0).slot == 1
+    assert lease("pool", 3).slot == 0
+
+
+def test_lease_held_by_another_process(lease_dir) -> None:
+    lease("pool", 1).release()  # creates the lock file
+    holder = subprocess.Popen(
+        [sys.executable, "-c", "import fcntl, os, sys, time; fd = os.open(sys.argv[1], os.O_RDWR); "
+         "fcntl.flock(fd, fcntl.LOCK_EX); print(flush=True); time.sleep(30)", str(lease_dir / "pool.0.lock")],
+        stdout=subprocess.PIPE,
+    )
+    try:
+        holder.stdout.readline()
+        assert lease("pool", 2).slot == 1
+    finally:
+        holder.kill()
+        holder.wait()
+    assert lease("pool", 2).slot == 0  # released by the kernel when the holder died
+
+
+def test_proxy_ports() -> None:
+    assert ProxyPorts(0).sdk == MEDIA_PROXY_SDK_PORT
+    ranges = []
+    for slot in range(PROXY_SLOTS):
+        first, last = map(int, ProxyPorts(slot).rdma.split("-"))
+        ranges.append((first, last))
+    assert ranges[0][0] == RDMA_FIRST_PORT
+    assert all(a[1] < b[0] for a, b in zip(ranges, ranges[1:]))
+    assert ranges[-1][1] <= 9999
+    assert len({port for slot in range(PROXY_SLOTS) for port in ProxyPorts(slot).tcp_ports()}) == 3 * PROXY_SLOTS
+
+
+def test_lease_proxy_ports_skips_busy_ports() -> None:
+    busy = set(ProxyPorts(0).tcp_ports())
+    held, ports = lease_proxy_ports(lambda port: port not in busy)
+    assert held.slot == ports.slot == 1
+    assert lease_proxy_ports(lambda port: True)[1].slot == 0
+
+
+def test_workspace_urns_and_ports() -> None:
+    first, second = Workspace("test_a[mpg]"), Workspace("test_b")
+    assert first.mpg_urn() == "ipv4:224.0.0.1:9003"
+    assert second.mpg_urn() == "ipv4:224.0.0.1:9005"
+    assert first.st2110_port() == "9002"
+    assert second.st2110_port() == "9004"
+
+    client = SimpleNamespace(apiConnectionString=f"Server=127.0.0.1; Port={MEDIA_PROXY_SDK_PORT}")
+    second.proxy = ProxyPorts(2)
+    second.bind_client(client)
+    assert client.apiConnectionString == f"Server=127.0.0.1; Port={MEDIA_PROXY_SDK_PORT + 2}"
+
+    first.release()
+    assert Workspace("test_c").mpg_urn() == "ipv4:224.0.0.1:9003"
+    second.release()